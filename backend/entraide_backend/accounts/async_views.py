@@ -0,0 +1,37 @@
+from asgiref.sync import sync_to_async
+from cloudinary import uploader
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from api.async_auth import async_login_required
+from .models import User
+from .serializers import UserProfileSerializer
+
+
+@csrf_exempt
+@require_POST
+@async_login_required
+async def upload_profile_picture(request):
+    """
+    Upload a new profile picture for the current user.
+
+    Expects multipart form data with a `profile_picture` file. The Cloudinary
+    upload runs in a worker thread so it does not hold the event loop; only the
+    final single-column UPDATE touches the database.
+    """
+    picture = request.FILES.get('profile_picture')
+    if picture is None:
+        return JsonResponse({'detail': 'No file provided.'}, status=400)
+
+    field = User._meta.get_field('profile_picture')
+    resource = await sync_to_async(uploader.upload_resource, thread_sensitive=False)(
+        picture, type=field.type, resource_type=field.resource_type
+    )
+
+    user = request.user
+    user.profile_picture = resource
+    await sync_to_async(user.save)(update_fields=['profile_picture', 'updated_at'])
+
+    data = await sync_to_async(lambda: UserProfileSerializer(user).data)()
+    return JsonResponse(data)
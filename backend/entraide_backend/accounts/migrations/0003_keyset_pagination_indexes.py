@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_arabic_first_name_user_arabic_last_name'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at', 'id'], name='user_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='scope_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
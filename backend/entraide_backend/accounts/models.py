@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from cloudinary.models import CloudinaryField
 
 
@@ -72,6 +75,17 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Bumped whenever the role, supervised centers or taught groups change;
+    # access tokens carrying an older value are rejected (see api.scope)
+    scope_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # full-text search over Latin and Arabic names, maintained by PostgreSQL
+    search_vector = models.GeneratedField(
+        expression=SearchVector('first_name', 'last_name', 'Arabic_first_name', 'arabic_last_name', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     # set email as the username field
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name', 'role']  # required fields
@@ -79,6 +93,33 @@ class User(AbstractUser):
     # use custom user manager
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination order (see UserViewSet.cursor_ordering)
+            models.Index(fields=['-created_at', 'id'], name='user_created_at_id_idx'),
+            # Search (api.filters.TrigramSearchFilter and the admin): icontains compiles
+            # to UPPER(col) LIKE UPPER('%term%'), which these trigram indexes serve.
+            GinIndex(fields=['search_vector'], name='user_search_vector_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm_idx'),
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='user_first_name_trgm_idx'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='user_last_name_trgm_idx'),
+            GinIndex(OpClass(Upper('Arabic_first_name'), name='gin_trgm_ops'), name='user_ar_first_name_trgm_idx'),
+            GinIndex(OpClass(Upper('arabic_last_name'), name='gin_trgm_ops'), name='user_ar_last_name_trgm_idx'),
+            GinIndex(OpClass(Upper('phone_number'), name='gin_trgm_ops'), name='user_phone_number_trgm_idx'),
+            GinIndex(OpClass(Upper('CIN_id'), name='gin_trgm_ops'), name='user_cin_id_trgm_idx'),
+        ]
+
     def __str__(self):
         return f'{self.first_name} {self.last_name} - ({self.get_role_display()})'
 
+    def save(self, *args, **kwargs):
+        # scope_version is only bumped in the database (api.scope.invalidate_scope),
+        # so saving an instance loaded earlier must not write its stale value back
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated and field.name != 'scope_version'
+            ]
+        super().save(*args, **kwargs)
+
@@ -0,0 +1,13 @@
+from api.projections import Computed, Projection, file_url
+from .models import UserRole
+
+ROLE_LABELS = dict(UserRole.choices)
+
+# UserProfileSerializer
+user_profile_projection = Projection(
+    'id', 'email', 'username', 'first_name', 'last_name', 'role', 'date_joined', 'is_active',
+    'birth_date', 'birth_city', 'Arabic_first_name', 'arabic_last_name', 'CIN_id', 'phone_number', 'address',
+    'city', 'created_at', 'updated_at',
+    profile_picture=Computed(file_url, 'profile_picture'),
+    role_display=Computed(lambda role: ROLE_LABELS.get(role, role), 'role'),
+)
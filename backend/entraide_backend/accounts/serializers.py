@@ -1,11 +1,12 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the User model.
     
@@ -229,10 +230,13 @@ class UserProfileSerializer(UserSerializer):
             dict: The serialized representation with role_display and profile_picture URL added
         """
         representation = super().to_representation(instance)
-        representation['role_display'] = instance.get_role_display()
+        if 'role' in representation:
+            representation['role_display'] = instance.get_role_display()
         # Explicitly set profile_picture to its URL if it exists
-        if instance.profile_picture and hasattr(instance.profile_picture, 'url'):
-            representation['profile_picture'] = instance.profile_picture.url
-        else:
-            representation['profile_picture'] = None # Or an empty string, depending on frontend expectation
+        # (unless a sparse fieldset left it out)
+        if 'profile_picture' in representation:
+            if instance.profile_picture and hasattr(instance.profile_picture, 'url'):
+                representation['profile_picture'] = instance.profile_picture.url
+            else:
+                representation['profile_picture'] = None # Or an empty string, depending on frontend expectation
         return representation
\ No newline at end of file
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import UserViewSet
+from .async_views import upload_profile_picture
 
 # Generated by Copilot
 router = DefaultRouter()
 router.register('users', UserViewSet)
 
 urlpatterns = [
+    path('users/me/picture/', upload_profile_picture, name='user-profile-picture'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
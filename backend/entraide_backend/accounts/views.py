@@ -4,6 +4,9 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from api.tokens import ScopedRefreshToken
+from api.user_cache import invalidate_cached_user
+from api.mixins import SparseFieldsetViewMixin
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer, UserProfileSerializer
 from api.permissions import IsAdmin, IsCenterSupervisor, IsAssociationSupervisor, IsTrainer, IsStudent, IsAdminOrCenterSupervisor
@@ -11,7 +14,7 @@ from api.permissions import IsAdmin, IsCenterSupervisor, IsAssociationSupervisor
 User = get_user_model()
 
 # Generated by Copilot
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling user operations.
     
@@ -41,6 +44,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('-created_at', 'id')  # used by ?pagination=cursor
     
     def get_queryset(self):
         """
@@ -130,7 +134,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = ScopedRefreshToken.for_user(user)
             
             return Response({
                 'user': serializer.data,
@@ -207,6 +211,7 @@ class UserViewSet(viewsets.ModelViewSet):
             if refresh_token:
                 token = RefreshToken(refresh_token)
                 token.blacklist()
+                invalidate_cached_user(request.user.pk)
                 return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
             return Response({"detail": "Refresh token is required."}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -0,0 +1,47 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+
+def _authenticate(request):
+    """
+    Run the configured DRF authentication classes against a plain Django request.
+
+    Returns the authenticated user or None.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except exceptions.AuthenticationFailed:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+async def aauthenticate(request):
+    """Async-safe wrapper around the DRF authentication classes (may hit the database)."""
+    return await sync_to_async(_authenticate)(request)
+
+
+def async_login_required(view_func):
+    """
+    Decorator for async Django views that need an authenticated API user.
+
+    Uses the same authentication classes as the REST API so a Bearer token
+    valid for `/api/...` ViewSets is valid here too.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        user = await aauthenticate(request)
+        if user is None or not user.is_active:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401
+            )
+        request.user = user
+        return await view_func(request, *args, **kwargs)
+    return wrapper
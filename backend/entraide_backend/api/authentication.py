@@ -0,0 +1,44 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .scope import SCOPE_VERSION_CLAIM
+from .user_cache import get_cached_user
+
+
+class ScopedJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` with a cached user lookup (`api.user_cache`) and a
+    check that the token's scope claims are current.
+
+    The user comes from the process-local or shared cache instead of one
+    query per request; it is invalidated when the user is saved, changes
+    password, is deactivated or logs out, and when their scope changes.
+
+    The token's `scope_version` must match the user's, which is bumped
+    whenever their role, centers or groups change. Otherwise the token is
+    rejected and the client refreshes it to get the current scope.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        version = validated_token.get(SCOPE_VERSION_CLAIM)
+        if version is not None and version != getattr(user, 'scope_version', version):
+            raise InvalidToken(_("Token scope is out of date, refresh it"))
+        return user
@@ -0,0 +1,20 @@
+import time
+
+from django.db.backends.postgresql import base
+
+from api import metrics
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's PostgreSQL backend, counting how long each connection takes to
+    get: a new connection without pooling, a checkout (waits included) from
+    the pool with `OPTIONS['pool']`. Reported by `api.metrics.report()`.
+    """
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        metrics.incr(f'db.{self.alias}.checkouts')
+        metrics.incr(f'db.{self.alias}.checkout_ms', (time.perf_counter() - started) * 1000)
+        return connection
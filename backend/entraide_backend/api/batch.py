@@ -0,0 +1,115 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = '/api/batch/'
+
+
+def batch_setting(name, default):
+    return getattr(settings, 'API_BATCH', {}).get(name, default)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=100)
+    url = serializers.CharField(max_length=2000)
+
+    def validate_url(self, value):
+        path = urlsplit(value).path
+        if not path.startswith('/api/') or path.startswith(BATCH_PATH):
+            raise serializers.ValidationError("Only /api/ endpoints other than the batch endpoint can be batched")
+        return value
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """`{"requests": [{"id": "me", "url": "/api/accounts/users/me/"}, ...], "parallel": false}`"""
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        limit = batch_setting('MAX_REQUESTS', 20)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} requests per batch")
+        return value
+
+
+def build_subrequest(request, url):
+    """
+    A GET `HttpRequest` for `url` that carries the caller's headers and is
+    already authenticated as the caller: DRF honours `_force_auth_user`
+    and `_force_auth_token`, so the token is not decoded again and the user
+    is not fetched again.
+    """
+    parts = urlsplit(url)
+    subrequest = HttpRequest()
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = parts.path
+    subrequest.META = {
+        key: value for key, value in request.META.items()
+        if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE', 'wsgi.input')
+    }
+    subrequest.META.update({'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query})
+    subrequest.GET = QueryDict(parts.query)
+    subrequest.COOKIES = request.COOKIES
+    subrequest.user = request.user
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def _response_body(response):
+    if hasattr(response, 'data'):
+        return response.data  # DRF response: skip rendering and re-parsing
+    if getattr(response, 'streaming', False):
+        return None
+    if 'json' in response.get('Content-Type', ''):
+        return json.loads(response.content)
+    return response.content.decode(response.charset or 'utf-8', errors='replace')
+
+
+def run_subrequest(request, item):
+    """Resolve and call the view for one batch item. Returns `{id, status, body}`."""
+    result = {'id': item.get('id', item['url'])}
+    try:
+        match = resolve(urlsplit(item['url']).path)
+    except Resolver404:
+        return {**result, 'status': 404, 'body': {'detail': 'Not found.'}}
+    if iscoroutinefunction(match.func):
+        return {**result, 'status': 400, 'body': {'detail': 'Async endpoints cannot be batched.'}}
+    try:
+        response = match.func(build_subrequest(request, item['url']), *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batch sub-request %s failed", item['url'])
+        return {**result, 'status': 500, 'body': {'detail': 'Internal server error.'}}
+    return {**result, 'status': response.status_code, 'body': _response_body(response)}
+
+
+def _run_in_worker(request, item):
+    try:
+        return run_subrequest(request, item)
+    finally:
+        # Worker threads open their own connections; do not leak them
+        connections.close_all()
+
+
+def run_batch(request, items, parallel=False):
+    """
+    Run GET sub-requests under the caller's authentication, in order.
+
+    Sequential batches share the request's database connection. `parallel`
+    runs them on a pool of `API_BATCH['MAX_WORKERS']` threads, each with its
+    own connection, which only pays off when the sub-requests are slow.
+    """
+    if not parallel or len(items) == 1:
+        return [run_subrequest(request, item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(batch_setting('MAX_WORKERS', 4), len(items))) as pool:
+        return list(pool.map(lambda item: _run_in_worker(request, item), items))
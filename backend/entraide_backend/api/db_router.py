@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+# None outside reporting code; inside it, {'pinned': bool}
+_replica_reads = ContextVar('replica_reads', default=None)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is no replica."""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Send reads made in this block to the replica. The first write pins the
+    rest of the block to the primary, so it reads what it just wrote.
+    """
+    token = _replica_reads.set({'pinned': False})
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_reads(func):
+    """Decorator form of `read_from_replica`."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with read_from_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Everything goes to `default` except reads made inside
+    `read_from_replica()` (reporting and analytics endpoints, see
+    `api.mixins.ReplicaReadMixin`), which go to the replica until the block
+    writes anything. Without a replica alias configured this is a no-op.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _replica_reads.get()
+        if state is None or state['pinned']:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _replica_reads.get()
+        if state is not None:
+            state['pinned'] = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary's schema through replication
+        return db != replica_alias()
@@ -0,0 +1,154 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q, Value, FloatField
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Coalesce, Greatest
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+# Text search configuration used for name vectors: no stemming or stop words,
+# which suits personal names in both Latin and Arabic script.
+SEARCH_CONFIG = 'simple'
+SEARCH_VECTOR_FIELD = 'search_vector'
+
+
+def prefix_search_query(terms, config=SEARCH_CONFIG):
+    """
+    Build a `SearchQuery` matching every term as a word prefix (`'term':*`),
+    so partial words typed by the user still hit the full-text index.
+    """
+    lexemes = []
+    for term in terms:
+        term = term.replace('\\', '\\\\').replace("'", "''")
+        lexemes.append(f"'{term}':*")
+    return SearchQuery(' & '.join(lexemes), config=config, search_type='raw')
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for `SearchFilter` backed by PostgreSQL indexes.
+
+    Uses the view's `search_fields` like `SearchFilter`, but:
+    - Fields on a related model (e.g. `user__first_name`) are matched in a
+      subquery on that model (`user_id IN (SELECT ...)`), so each table's
+      pg_trgm GIN indexes can serve the `icontains` lookups instead of an OR
+      across a join forcing a sequential scan.
+    - Models with a `search_vector` column are also matched on whole words.
+    - Results are annotated with `search_rank` (trigram word similarity plus
+      full-text rank) and ordered by it unless the client passed `?ordering=`.
+      List it after `OrderingFilter` so the rank is the primary sort key.
+
+    Search fields with a lookup prefix (`^`, `=`, `@`, `$`) or that traverse a
+    to-many relation fall back to the stock `SearchFilter` behaviour.
+    """
+    rank_annotation = 'search_rank'
+
+    def split_search_field(self, queryset, search_field):
+        """
+        Return `(relation_path, model, field_name)` for a search field, or None
+        if it cannot be matched in a subquery.
+        """
+        if search_field[0] in self.lookup_prefixes:
+            return None
+        parts = search_field.split(LOOKUP_SEP)
+        model = queryset.model
+        try:
+            for part in parts[:-1]:
+                field = model._meta.get_field(part)
+                if not field.concrete or not (field.many_to_one or field.one_to_one):
+                    return None
+                model = field.related_model
+            model._meta.get_field(parts[-1])
+        except FieldDoesNotExist:
+            return None
+        return LOOKUP_SEP.join(parts[:-1]), model, parts[-1]
+
+    def has_search_vector(self, model):
+        try:
+            model._meta.get_field(SEARCH_VECTOR_FIELD)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def build_match(self, model, field_names, term):
+        condition = reduce(
+            operator.or_,
+            (Q(**{f'{name}__icontains': term}) for name in field_names)
+        )
+        if self.has_search_vector(model):
+            condition |= Q(**{SEARCH_VECTOR_FIELD: SearchQuery(term, config=SEARCH_CONFIG)})
+        return condition
+
+    def build_rank(self, groups, term):
+        scores = []
+        for path, (model, field_names) in groups.items():
+            prefix = f'{path}{LOOKUP_SEP}' if path else ''
+            scores.extend(TrigramWordSimilarity(term, f'{prefix}{name}') for name in field_names)
+            if self.has_search_vector(model):
+                scores.append(SearchRank(F(f'{prefix}{SEARCH_VECTOR_FIELD}'), SearchQuery(term, config=SEARCH_CONFIG)))
+        score = Greatest(*scores) if len(scores) > 1 else scores[0]
+        return Coalesce(score, Value(0.0), output_field=FloatField())
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        groups = {}
+        for search_field in search_fields:
+            split = self.split_search_field(queryset, str(search_field))
+            if split is None:
+                return super().filter_queryset(request, queryset, view)
+            path, model, field_name = split
+            groups.setdefault(path, (model, []))[1].append(field_name)
+
+        conditions = []
+        for term in search_terms:
+            term_condition = Q()
+            for path, (model, field_names) in groups.items():
+                match = self.build_match(model, field_names, term)
+                if path:
+                    term_condition |= Q(**{
+                        f'{path}{LOOKUP_SEP}in': model._default_manager.filter(match).values('pk')
+                    })
+                else:
+                    term_condition |= match
+            conditions.append(term_condition)
+        queryset = queryset.filter(reduce(operator.and_, conditions))
+
+        rank = reduce(operator.add, (self.build_rank(groups, term) for term in search_terms))
+        queryset = queryset.annotate(**{self.rank_annotation: rank})
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            existing_ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by(f'-{self.rank_annotation}', *existing_ordering)
+        return queryset
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    `?search=` filter that only matches the model's `search_vector` column.
+
+    For models with large text columns (lesson content) where `icontains`
+    would read every row. Every term must match as a word prefix; results are
+    annotated with `search_rank` and ordered by it unless `?ordering=` is given.
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        query = prefix_search_query(search_terms)
+        queryset = queryset.filter(**{SEARCH_VECTOR_FIELD: query}).annotate(**{
+            self.rank_annotation: SearchRank(F(SEARCH_VECTOR_FIELD), query)
+        })
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            existing_ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by(f'-{self.rank_annotation}', *existing_ordering)
+        return queryset
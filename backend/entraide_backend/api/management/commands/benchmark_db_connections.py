@@ -0,0 +1,83 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from api import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the database side of a worker's request cycle (request_started, one query, request_finished) "
+        "with a new connection per request and with the configured connection reuse or pool, and compare "
+        "latency and connection checkouts (each one a new connection unless pooled)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests to simulate in each mode")
+        parser.add_argument('--database', default='default', help="Database alias to benchmark")
+
+    @contextmanager
+    def settings_dict(self, connection, **overrides):
+        """Run the block with a modified copy of the alias's settings, on a fresh connection."""
+        original = connection.settings_dict
+        connection.close()
+        connection.settings_dict = {**original, **overrides}
+        try:
+            yield
+        finally:
+            connection.close()
+            connection.settings_dict = original
+
+    def run(self, alias, requests):
+        User = get_user_model()
+        checkouts = f'db.{alias}.checkouts'
+        before = metrics.snapshot().get(checkouts, 0)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            # A typical request's first query: fetching the authenticated user
+            User.objects.using(alias).only('id', 'role').order_by('id').first()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            'mean': statistics.fmean(timings),
+            'p50': timings[len(timings) // 2],
+            'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            'checkouts': metrics.snapshot().get(checkouts, 0) - before,
+        }
+
+    def handle(self, *args, **options):
+        alias, requests = options['database'], options['requests']
+        if requests < 1:
+            raise CommandError("--requests must be positive")
+        if alias not in connections:
+            raise CommandError(f"Unknown database alias {alias!r}")
+        connection = connections[alias]
+        configured = connection.settings_dict
+        pool = configured['OPTIONS'].get('pool')
+        mode = 'pool' if pool else f"CONN_MAX_AGE={configured['CONN_MAX_AGE']}"
+
+        options_without_pool = {key: value for key, value in configured['OPTIONS'].items() if key != 'pool'}
+        with self.settings_dict(connection, CONN_MAX_AGE=0, OPTIONS=options_without_pool):
+            results = [('new connection per request', self.run(alias, requests))]
+        with self.settings_dict(connection):
+            results.append((f'configured ({mode})', self.run(alias, requests)))
+
+        self.stdout.write(f"{requests} requests per mode on {alias!r}")
+        self.stdout.write(f"{'Mode':<40} {'mean':>9} {'p50':>9} {'p95':>9} {'checkouts':>10}")
+        for label, result in results:
+            self.stdout.write(
+                f"{label:<40} {result['mean']:>6.2f} ms {result['p50']:>6.2f} ms "
+                f"{result['p95']:>6.2f} ms {result['checkouts']:>10}"
+            )
+        if pool:
+            self.stdout.write(f"Pool options: {pool}")
+            # Connections actually opened by the pool are in connections_num
+            self.stdout.write(f"Pool stats: {connection.pool.get_stats()}")
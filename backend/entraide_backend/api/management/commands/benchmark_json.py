@@ -0,0 +1,69 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from courses.models import Course
+from courses.serializers import CourseSerializer
+from schedule.models import SessionInstance
+from schedule.serializers import SessionInstanceSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize real session instance and course payloads, then compare the time spent rendering and "
+        "parsing them with DRF's stdlib JSON renderer/parser and with the orjson-backed ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help="Rows of each model to serialize")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per payload; the best one is kept")
+        parser.add_argument('--copies', type=int, default=1,
+                            help="Replicate each payload this many times to benchmark larger responses")
+
+    def payloads(self, limit, copies):
+        sessions = SessionInstance.objects.select_related(
+            'schedule_template__trainer', 'schedule_template__room', 'custom_trainer', 'custom_room'
+        ).order_by('id')[:limit]
+        courses = Course.objects.prefetch_related('units__sections__lessons').order_by('id')[:limit]
+        yield 'SessionInstanceSerializer', SessionInstanceSerializer(sessions, many=True).data * copies
+        yield 'CourseSerializer', CourseSerializer(courses, many=True).data * copies
+
+    def best_of(self, repeat, func):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1 or options['repeat'] < 1 or options['copies'] < 1:
+            raise CommandError("--limit, --repeat and --copies must be positive")
+        if orjson is None:
+            self.stderr.write("orjson is not installed: both renderers use the stdlib json module")
+
+        for name, data in self.payloads(options['limit'], options['copies']):
+            if not data:
+                self.stdout.write(f"{name}: no rows to serialize, skipped")
+                continue
+            stdlib, fast = JSONRenderer(), FastJSONRenderer()
+            body = stdlib.render(data)
+            if fast.render(data) != body:
+                raise CommandError(f"{name}: the renderers disagree on this payload")
+
+            render_std = self.best_of(options['repeat'], lambda: stdlib.render(data))
+            render_fast = self.best_of(options['repeat'], lambda: fast.render(data))
+            parse_std = self.best_of(options['repeat'], lambda: JSONParser().parse(io.BytesIO(body)))
+            parse_fast = self.best_of(options['repeat'], lambda: FastJSONParser().parse(io.BytesIO(body)))
+
+            self.stdout.write(f"{name}: {len(data)} objects, {len(body) / 1024:.1f} KiB")
+            for step, std, fast_ms in (('render', render_std, render_fast), ('parse', parse_std, parse_fast)):
+                self.stdout.write(
+                    f"  {step:<7} stdlib={std:.2f}ms fast={fast_ms:.2f}ms "
+                    f"saved={std - fast_ms:.2f}ms ({std / fast_ms if fast_ms else 0:.1f}x)"
+                )
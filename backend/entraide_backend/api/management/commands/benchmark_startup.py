@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter, like a newly forked worker importing the app.
+CHILD = '''
+import importlib, json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.conf import settings
+from django.urls import get_resolver
+importlib.import_module(settings.ROOT_URLCONF)
+get_resolver().url_patterns  # imports every included app urls and views module
+urls_done = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'setup_ms': (setup_done - started) * 1000,
+    'urls_ms': (urls_done - setup_done) * 1000,
+    'rss_mb': rss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    'modules': len(sys.modules),
+    'loaded': sorted(name for name in sys.argv[1:] if name in sys.modules),
+}))
+'''
+
+# Imported only by the code paths that need them; none should be loaded at startup
+HEAVY_MODULES = ('pandas', 'numpy', 'requests', 'openpyxl')
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker startup: django.setup() and URL-conf import time, peak RSS and which heavy optional "
+        "dependencies got imported, over several fresh interpreters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to start; medians are reported")
+        parser.add_argument('--max-ms', type=float, help="Fail if the median setup + URL-conf time exceeds this")
+        parser.add_argument('--max-rss-mb', type=float, help="Fail if the median peak RSS exceeds this")
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError("--runs must be positive")
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+        results = []
+        for _ in range(options['runs']):
+            completed = subprocess.run(
+                [sys.executable, '-c', CHILD, *HEAVY_MODULES], cwd=settings.BASE_DIR, env=env,
+                capture_output=True, text=True,
+            )
+            if completed.returncode:
+                raise CommandError(f"Startup failed:\n{completed.stderr}")
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        def median(key):
+            return statistics.median(result[key] for result in results)
+
+        total = median('setup_ms') + median('urls_ms')
+        rss = median('rss_mb')
+        loaded = sorted({name for result in results for name in result['loaded']})
+        self.stdout.write(f"Runs:            {len(results)}")
+        self.stdout.write(f"django.setup():  {median('setup_ms'):.0f} ms")
+        self.stdout.write(f"URL conf:        {median('urls_ms'):.0f} ms")
+        self.stdout.write(f"Total:           {total:.0f} ms")
+        self.stdout.write(f"Peak RSS:        {rss:.1f} MB per worker")
+        self.stdout.write(f"Modules:         {median('modules'):.0f}")
+        self.stdout.write(f"Heavy imports:   {', '.join(loaded) or 'none'}")
+
+        failures = []
+        if options['max_ms'] is not None and total > options['max_ms']:
+            failures.append(f"startup took {total:.0f} ms (max {options['max_ms']:.0f} ms)")
+        if options['max_rss_mb'] is not None and rss > options['max_rss_mb']:
+            failures.append(f"peak RSS is {rss:.1f} MB (max {options['max_rss_mb']:.1f} MB)")
+        if failures:
+            raise CommandError("; ".join(failures))
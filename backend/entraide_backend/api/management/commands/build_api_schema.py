@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.schema import artifact_path, write_artifact
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema and write it, stamped with the code version, to API_SCHEMA['PATH']. "
+        "Run it at deploy so no worker introspects the API on its first /swagger.json request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Where to write the artifact (default: API_SCHEMA['PATH'])")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        path, version = write_artifact(options['output'] or artifact_path())
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote the schema for code version {version} to {path} "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        ))
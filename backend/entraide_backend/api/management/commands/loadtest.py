@@ -0,0 +1,68 @@
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent GET requests at a running server and report throughput and latency. "
+        "Run it once against the WSGI server and once against the ASGI server to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="Full URL to hit, e.g. http://localhost:8000/api/courses/lessons/1/pdf/")
+        parser.add_argument('--concurrency', type=int, default=50, help="Number of concurrent connections")
+        parser.add_argument('--requests', type=int, default=500, help="Total number of requests")
+        parser.add_argument('--token', help="JWT access token sent as `Authorization: Bearer <token>`")
+        parser.add_argument('--timeout', type=float, default=60.0, help="Per-request timeout in seconds")
+
+    def handle(self, *args, **options):
+        url = options['url']
+        concurrency = options['concurrency']
+        total = options['requests']
+        if concurrency < 1 or total < 1:
+            raise CommandError("--concurrency and --requests must be positive")
+
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f"Bearer {options['token']}"
+
+        local = threading.local()
+
+        def fire(_):
+            # One keep-alive session per worker thread, like a browser connection.
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            started = time.perf_counter()
+            try:
+                status = session.get(url, headers=headers, timeout=options['timeout']).status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fire, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        statuses = Counter(status for status, _ in results)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(f"URL:          {url}")
+        self.stdout.write(f"Concurrency:  {concurrency}")
+        self.stdout.write(f"Requests:     {total} in {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+        self.stdout.write(
+            f"Latency (ms): mean={statistics.mean(latencies) * 1000:.1f} "
+            f"p50={percentile(0.50):.1f} p95={percentile(0.95):.1f} "
+            f"p99={percentile(0.99):.1f} max={latencies[-1] * 1000:.1f}"
+        )
+        self.stdout.write("Statuses:     " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
@@ -0,0 +1,63 @@
+import os
+import threading
+from collections import Counter
+
+# Process-local counters: each worker reports its own, with its pid, and a
+# scraper sums them. Cheap enough to bump on every request.
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot():
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def hit_rate(counters, prefix):
+    """Share of `<prefix>.*_hit` among all `<prefix>.*` lookups, or None before any lookup."""
+    hits = sum(value for name, value in counters.items() if name.startswith(f'{prefix}.') and name.endswith('_hit'))
+    total = sum(value for name, value in counters.items() if name.startswith(f'{prefix}.'))
+    return round(hits / total, 4) if total else None
+
+
+def database_stats(counters):
+    """
+    Per alias: connections obtained by this process and their average
+    checkout time (`api.backends.postgresql`), plus the psycopg pool's own
+    statistics (size, waiting requests, wait times) when pooling is on.
+    """
+    from django.db import connections
+
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        checkouts = counters.get(f'db.{alias}.checkouts', 0)
+        checkout_ms = counters.get(f'db.{alias}.checkout_ms', 0)
+        pool = connection.pool if connection.settings_dict['OPTIONS'].get('pool') else None
+        stats[alias] = {
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'checkouts': checkouts,
+            'avg_checkout_ms': round(checkout_ms / checkouts, 3) if checkouts else None,
+            'pool': pool.get_stats() if pool is not None else None,
+        }
+    return stats
+
+
+def report():
+    counters = snapshot()
+    return {
+        'pid': os.getpid(),
+        'counters': counters,
+        'hit_rates': {'auth_user_cache': hit_rate(counters, 'auth_user_cache')},
+        'databases': database_stats(counters),
+    }
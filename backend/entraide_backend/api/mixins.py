@@ -0,0 +1,276 @@
+from django.db import transaction
+from django.db.models import Case, Prefetch, Value, When
+from django.db.models.constants import LOOKUP_SEP
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .db_router import read_from_replica
+
+
+class ReorderSerializer(serializers.Serializer):
+    parent = serializers.IntegerField()
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        if len(value) != len(set(value)):
+            raise serializers.ValidationError("ids must not contain duplicates")
+        return value
+
+
+class ReorderMixin:
+    """
+    Adds a `reorder` action to a ViewSet whose model has an `order` field that
+    is unique per parent (`reorder_parent_field`).
+
+    `POST .../reorder/` with `{"parent": <id>, "ids": [<child ids in the new
+    order>]}` sets `order` to each id's index in a single `UPDATE ... CASE`.
+    The `(parent, order)` unique constraint must be DEFERRABLE INITIALLY
+    DEFERRED so the intermediate states of the statement do not collide.
+    `ids` must list every child of the parent exactly once.
+    """
+    reorder_parent_field = None
+
+    def after_reorder(self, parent_id):
+        """Hook for denormalized data that depends on the order."""
+
+    @action(detail=False, methods=['post'], serializer_class=ReorderSerializer)
+    def reorder(self, request):
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        parent_id = serializer.validated_data['parent']
+        ids = serializer.validated_data['ids']
+
+        model = self.get_queryset().model
+        children = model._default_manager.filter(**{f'{self.reorder_parent_field}_id': parent_id})
+        with transaction.atomic():
+            current = set(children.select_for_update().values_list('id', flat=True))
+            if current != set(ids):
+                return Response(
+                    {'error': 'ids must list every child of the parent exactly once',
+                     'missing': sorted(current - set(ids)), 'unknown': sorted(set(ids) - current)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            updated = children.update(
+                order=Case(*[When(pk=pk, then=Value(index)) for index, pk in enumerate(ids)]),
+                updated_at=timezone.now()
+            )
+            self.after_reorder(parent_id)
+        return Response({'reordered': updated})
+
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def parse_field_paths(value):
+    """`"id,rooms.name,rooms.equipments"` -> `{'id': {}, 'rooms': {'name': {}, 'equipments': {}}}`"""
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def sparse_fieldset_requested(request):
+    return (
+        request is not None and request.method in SAFE_METHODS
+        and (FIELDS_QUERY_PARAM in request.query_params or EXPAND_QUERY_PARAM in request.query_params)
+    )
+
+
+def _nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Lets clients of a read serializer choose its fields with `?fields=` and
+    `?expand=` (comma-separated, dots for nested fields):
+
+    - Without either parameter every field is returned, as before.
+    - `?fields=id,name,rooms.name` returns only the listed fields. A nested
+      field listed without sub-fields is returned whole.
+    - `?expand=rooms` adds nested fields. Without `?fields=` the response
+      holds every plain field plus the expanded nested ones, so nested
+      serializers (and `Meta.expandable_fields`, for method fields that
+      serialize relations) are skipped unless asked for.
+
+    Fields that are not requested are removed before serialization, so their
+    nested serializers never run. Only applies to GET/HEAD/OPTIONS requests;
+    nested serializers need the mixin too for dotted paths to reach them.
+    """
+
+    def _sparse_selection(self):
+        if hasattr(self, '_sparse'):
+            return self._sparse
+        root = self.root
+        if root is not self and not (isinstance(root, serializers.ListSerializer) and self.parent is root):
+            return None
+        request = self.context.get('request')
+        if not sparse_fieldset_requested(request):
+            return None
+        only = request.query_params.get(FIELDS_QUERY_PARAM)
+        return (
+            parse_field_paths(only) if only is not None else None,
+            parse_field_paths(request.query_params.get(EXPAND_QUERY_PARAM)),
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self._sparse_selection()
+        if selection is None:
+            return fields
+        only, expand = selection
+        expandable = set(getattr(getattr(self, 'Meta', None), 'expandable_fields', ()))
+        for name in list(fields):
+            nested = _nested_serializer(fields[name])
+            if only is not None:
+                keep = name in only or name in expand
+            else:
+                keep = name in expand or (nested is None and name not in expandable)
+            if not keep:
+                del fields[name]
+            elif nested is not None:
+                if only is not None and name in only:
+                    nested._sparse = (only[name], expand.get(name, {})) if only[name] else None
+                else:
+                    nested._sparse = (None, expand.get(name, {}))
+        return fields
+
+
+def serializer_relation_paths(serializer, prefix=''):
+    """
+    Relation paths (`rooms__equipments__name`, ...) the serializer's fields
+    read, following `source` and nested serializers. `Meta.field_relations`
+    names the relations read by method fields.
+    """
+    paths = set()
+    relations = getattr(getattr(serializer, 'Meta', None), 'field_relations', {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        paths.update(prefix + path for path in relations.get(name, ()))
+        nested = _nested_serializer(field)
+        if field.source == '*':
+            if nested is not None:
+                paths |= serializer_relation_paths(nested, prefix)
+            continue
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            continue  # Reads the local `<name>_id` column only
+        path = prefix + LOOKUP_SEP.join(field.source_attrs)
+        paths.add(path)
+        if nested is not None:
+            paths |= serializer_relation_paths(nested, path + LOOKUP_SEP)
+    return paths
+
+
+def _select_related_paths(tree, prefix=''):
+    for name, subtree in tree.items():
+        if subtree:
+            yield from _select_related_paths(subtree, f'{prefix}{name}{LOOKUP_SEP}')
+        else:
+            yield prefix + name
+
+
+def trim_related(queryset, paths):
+    """
+    Drop the `select_related`/`prefetch_related` lookups no field in `paths`
+    reads; a lookup that is only needed up to a point is shortened to it.
+    """
+    def needed(lookup):
+        parts = lookup.split(LOOKUP_SEP)
+        for length in range(len(parts), 0, -1):
+            candidate = LOOKUP_SEP.join(parts[:length])
+            if any(path == candidate or path.startswith(candidate + LOOKUP_SEP) for path in paths):
+                return candidate
+        return None
+
+    prefetches = []
+    # Django keeps the pending lookups on the queryset; there is no public getter
+    for lookup in queryset._prefetch_related_lookups:
+        if isinstance(lookup, Prefetch):
+            if needed(lookup.prefetch_to):
+                prefetches.append(lookup)
+            continue
+        kept = needed(lookup)
+        if kept:
+            prefetches.append(kept)
+    queryset = queryset.prefetch_related(None).prefetch_related(*dict.fromkeys(prefetches))
+
+    select = queryset.query.select_related
+    if isinstance(select, dict):
+        kept = {needed(lookup) for lookup in _select_related_paths(select)} - {None}
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*kept)
+    return queryset
+
+
+class SparseFieldsetViewMixin:
+    """
+    ViewSet side of `SparseFieldsetSerializerMixin`: when the client asks for
+    a sparse fieldset, relations the trimmed serializer no longer reads are
+    dropped from the queryset's `select_related`/`prefetch_related`, so the
+    query count shrinks with the payload.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if sparse_fieldset_requested(self.request):
+            queryset = trim_related(queryset, serializer_relation_paths(self.get_serializer()))
+        return queryset
+
+
+class ProjectionViewMixin:
+    """
+    Serves read-only list actions from a `values_list()` projection
+    (`api.projections.Projection`) instead of the serializer.
+
+    `projections` maps action names to projections producing the same JSON
+    as the action's serializer. `list` uses its projection automatically
+    (pagination included); custom actions call `get_projection()` and
+    return `projection.apply(queryset)` rows. Requests with `?fields=` or
+    `?expand=` keep using the serializer.
+    """
+    projections = {}
+
+    def get_projection(self):
+        if sparse_fieldset_requested(self.request):
+            return None
+        return self.projections.get(self.action)
+
+    def list(self, request, *args, **kwargs):
+        projection = self.get_projection()
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+        rows = projection.apply(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(rows))
+
+
+class ReplicaReadMixin:
+    """
+    Runs the actions named in `replica_actions` (reports, statistics,
+    dashboards) under `api.db_router.read_from_replica`: their reads go to
+    the read replica when one is configured, and a write sends the rest of
+    the request back to the primary.
+    """
+    replica_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        if action not in self.replica_actions:
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica():
+            return super().dispatch(request, *args, **kwargs)
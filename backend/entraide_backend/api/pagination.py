@@ -0,0 +1,159 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination on a fixed, stable ordering.
+
+    The ordering comes from the view's `cursor_ordering` (e.g. `('-created_at', 'id')`)
+    and ignores `?ordering=`. Its last field must be unique and none may be null.
+    Unlike DRF's `CursorPagination`, which keys on the first field only and steps
+    over ties with an OFFSET, the cursor holds the values of every ordering field
+    and pages with a composite keyset condition, ``(date, id) > (%s, %s)`` spelled
+    per direction. Every page is a single indexed range scan with no OFFSET and no
+    COUNT(*), however many rows share a date.
+    """
+    def get_ordering(self, request, queryset, view):
+        return tuple(view.cursor_ordering)
+
+    def keyset_filter(self, ordering, position):
+        """Rows strictly after `position` in `ordering`."""
+        condition = None
+        for spec, value in reversed(list(zip(ordering, position))):
+            field = spec.lstrip('-')
+            after = Q(**{f"{field}__{'lt' if spec.startswith('-') else 'gt'}": value})
+            condition = after if condition is None else after | (Q(**{field: value}) & condition)
+        # The redundant bound on the first field lets the planner start an index range scan there
+        first = ordering[0].lstrip('-')
+        bound = Q(**{f"{first}__{'lte' if ordering[0].startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, current_position = (False, None) if self.cursor is None else self.cursor[1:]
+
+        ordering = tuple(
+            field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering
+        ) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self.keyset_filter(ordering, current_position))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether a page follows this one
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = current_position is not None, has_following
+        else:
+            self.has_next, self.has_previous = has_following, current_position is not None
+        # Positions of the page's edges, so the links never overlap or skip a row
+        if self.page:
+            self.next_position = self._get_position_from_instance(self.page[-1], self.ordering)
+            self.previous_position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            self.has_next = self.has_previous = False
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'), keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            position = tuple(tokens['p'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {'p': list(cursor.position)}
+        if cursor.reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            return tuple(str(instance[field]) for field in fields)
+        return tuple(str(getattr(instance, field)) for field in fields)
+
+
+class OptInCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination by default, keyset (cursor) pagination on request.
+
+    Clients opt in with `?pagination=cursor` on the first request and then follow
+    the `next`/`previous` links. Cursor responses have no `count`, so infinite-scroll
+    clients skip the COUNT(*) query entirely. Views that do not declare a
+    `cursor_ordering` always use page numbers.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_pagination_class = KeysetCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request, view):
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if view is not None and self.use_cursor(request, view):
+            self.cursor_paginator = self.cursor_pagination_class()
+            self.cursor_paginator.page_size = self.page_size
+            self.cursor_paginator.page_size_query_param = self.page_size_query_param
+            self.cursor_paginator.max_page_size = self.max_page_size
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'cursor_ordering', None):
+            parameters += self.cursor_pagination_class().get_schema_operation_parameters(view)
+        return parameters
@@ -0,0 +1,140 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import ValuesListIterable
+from django.utils.functional import cached_property
+
+
+def file_url(value):
+    """URL of a Cloudinary/file column, like the serializers' `.url` handling."""
+    return value.url if value and hasattr(value, 'url') else None
+
+
+class Computed:
+    """A value computed in Python from other columns of the same row: `func(*sources)`."""
+
+    def __init__(self, func, *sources):
+        self.func = func
+        self.sources = sources
+
+
+class Nested:
+    """
+    The object behind the forward relation `relation`, shaped by another
+    `Projection` and read from the same row (joined). `None` when the
+    relation is null.
+    """
+
+    def __init__(self, relation, projection):
+        self.relation = relation
+        self.projection = projection
+
+
+class Related:
+    """
+    The object behind `relation`, serialized by its existing serializer once
+    per distinct object in the response. Meant for relations with a handful
+    of distinct values per response, like the session of an attendance
+    sheet, whose full nested shape is not worth spelling out as columns.
+    """
+
+    def __init__(self, relation, serializer_class, queryset=None):
+        self.relation = relation
+        self.serializer_class = serializer_class
+        self.queryset = queryset
+
+    def serialize(self, ids):
+        if not ids:
+            return {}
+        queryset = self.queryset if self.queryset is not None else self.serializer_class.Meta.model._default_manager
+        objects = list(queryset.filter(pk__in=ids))
+        data = self.serializer_class(objects, many=True).data
+        return {obj.pk: item for obj, item in zip(objects, data)}
+
+
+class _Plan:
+    """The `values_list()` columns of a projection and how to read them back."""
+
+    def __init__(self):
+        self.columns = []
+        self.positions = {}
+        self.related = {}
+
+    def column(self, lookup):
+        if lookup not in self.positions:
+            self.positions[lookup] = len(self.columns)
+            self.columns.append(lookup)
+        return self.positions[lookup]
+
+    def reader(self, spec, prefix):
+        if isinstance(spec, str):
+            index = self.column(prefix + spec)
+            return lambda row, related: row[index]
+        if isinstance(spec, Nested):
+            index = self.column(prefix + spec.relation)
+            read = spec.projection.reader(self, f'{prefix}{spec.relation}{LOOKUP_SEP}')
+            return lambda row, related: None if row[index] is None else read(row, related)
+        if isinstance(spec, Related):
+            index = self.column(prefix + spec.relation)
+            self.related.setdefault(spec, set()).add(index)
+            return lambda row, related: related[spec].get(row[index])
+        if isinstance(spec, Computed):
+            readers = [self.reader(source, prefix) for source in spec.sources]
+            return lambda row, related: spec.func(*(read(row, related) for read in readers))
+        if hasattr(spec, 'resolve_expression'):
+            if prefix:
+                raise ImproperlyConfigured("Expressions can only be used at the top level of a projection")
+            index = len(self.columns)
+            self.columns.append(spec)
+            return lambda row, related: row[index]
+        raise ImproperlyConfigured(f"Unsupported projection column {spec!r}")
+
+
+class Projection:
+    """
+    Declarative `values_list()` version of a read serializer.
+
+    Each output key maps to a model lookup (`'center__name'`), a query
+    expression, a `Nested` projection, a `Related` serialized object or a
+    `Computed` value; positional names are lookups with the same key::
+
+        Projection('id', 'email', full_name=Computed(join, 'first_name', 'last_name'))
+
+    `apply(queryset)` returns a queryset that yields one dict per row with
+    the serializer's keys and values: no model instances or serializer
+    fields are built, and the dicts go straight to the renderer. Key order
+    may differ from the serializer's.
+    """
+
+    def __init__(self, *fields, **columns):
+        self.columns = {name: name for name in fields}
+        self.columns.update(columns)
+
+    def reader(self, plan, prefix=''):
+        readers = [(key, plan.reader(spec, prefix)) for key, spec in self.columns.items()]
+        return lambda row, related: {key: read(row, related) for key, read in readers}
+
+    @cached_property
+    def iterable_class(self):
+        plan = _Plan()
+        read = self.reader(plan)
+
+        class ProjectionIterable(ValuesListIterable):
+            columns = plan.columns
+
+            def __iter__(self):
+                rows = list(super().__iter__())
+                related = {
+                    spec: spec.serialize({row[index] for row in rows for index in indexes} - {None})
+                    for spec, indexes in plan.related.items()
+                }
+                for row in rows:
+                    yield read(row, related)
+
+        return ProjectionIterable
+
+    def apply(self, queryset):
+        iterable_class = self.iterable_class
+        queryset = queryset.prefetch_related(None).values_list(*iterable_class.columns)
+        # Same hook values()/values_list() use; it survives slicing and pagination
+        queryset._iterable_class = iterable_class
+        return queryset
@@ -0,0 +1,40 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib renderer is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` backed by orjson.
+
+    Output is byte for byte what DRF's renderer produces with the default
+    `COMPACT_JSON`/`UNICODE_JSON` settings: types orjson does not handle the
+    DRF way (datetimes, `Decimal`, lazy translation strings, querysets...) go
+    through DRF's own encoder. Falls back to the stdlib renderer when orjson
+    is not installed, for indented output (the browsable API), when those
+    settings are changed, and for values orjson rejects such as integers
+    wider than 64 bits.
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict javascript subset, like JSONRenderer
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
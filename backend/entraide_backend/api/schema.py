@@ -0,0 +1,118 @@
+import hashlib
+import importlib
+import json
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+ARTIFACT_FORMAT = 1
+
+_schemas = {}  # code version -> openapi.Swagger
+_documents = {}  # code version -> (body, etag)
+_lock = threading.Lock()
+
+
+def schema_setting(name, default):
+    return getattr(settings, 'API_SCHEMA', {}).get(name, default)
+
+
+def artifact_path():
+    return Path(schema_setting('PATH', Path(settings.BASE_DIR) / 'openapi.json'))
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    `API_SCHEMA['VERSION']` when the deployment sets one (a release tag or
+    commit), otherwise a hash of the project apps' Python sources. Either
+    way it only changes when the code does.
+    """
+    version = schema_setting('VERSION', None)
+    if version:
+        return str(version)
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(app.path).resolve() for app in apps.get_app_configs()}
+    roots.add(Path(importlib.import_module(settings.ROOT_URLCONF).__file__).resolve().parent)
+    digest = hashlib.sha256()
+    for root in sorted(root for root in roots if root.is_relative_to(base_dir)):
+        for path in sorted(root.rglob('*.py')):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class CachedSchemaGenerator(OpenAPISchemaGenerator):
+    """
+    Introspects the API once per code version instead of on every request.
+
+    Public schemas are generated without a request, so they hold no `host`
+    or `schemes` and the UIs use the host the page was loaded from.
+    """
+
+    def get_schema(self, request=None, public=False):
+        if not public:
+            return super().get_schema(request, public)
+        version = code_version()
+        schema = _schemas.get(version)
+        if schema is None:
+            with _lock:
+                schema = _schemas.get(version)
+                if schema is None:
+                    schema = _schemas[version] = super().get_schema(None, True)
+        return schema
+
+
+def build_schema():
+    """The public schema as compact JSON bytes."""
+    generator = CachedSchemaGenerator(swagger_settings.DEFAULT_INFO)
+    return OpenAPICodecJson(validators=[]).encode(generator.get_schema(public=True))
+
+
+def write_artifact(path=None):
+    """Write the schema of the current code version to `path`. Returns `(path, version)`."""
+    path = Path(path or artifact_path())
+    version = code_version()
+    schema = json.loads(build_schema())
+    path.write_text(
+        json.dumps({'format': ARTIFACT_FORMAT, 'version': version, 'schema': schema}, ensure_ascii=False),
+        encoding='utf-8',
+    )
+    return path, version
+
+
+def _read_artifact(version):
+    try:
+        artifact = json.loads(artifact_path().read_bytes())
+    except (OSError, ValueError):
+        return None
+    if artifact.get('format') != ARTIFACT_FORMAT or artifact.get('version') != version:
+        return None  # built for other code: ignore it
+    return json.dumps(artifact['schema'], ensure_ascii=False).encode()
+
+
+def schema_document():
+    """
+    `(body, etag)` of the JSON schema for the running code version.
+
+    Read from the artifact written at deploy by `build_api_schema` when it
+    matches this version, generated otherwise; either way once per process.
+    """
+    version = code_version()
+    document = _documents.get(version)
+    if document is None:
+        body = _read_artifact(version) or build_schema()
+        document = _documents[version] = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    return document
+
+
+def clear_schema_cache():
+    with _lock:
+        _schemas.clear()
+        _documents.clear()
+    code_version.cache_clear()
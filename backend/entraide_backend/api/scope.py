@@ -0,0 +1,143 @@
+from django.db.models import F
+from django.utils.functional import cached_property
+
+from .user_cache import invalidate_cached_user
+
+SCOPE_CLAIMS = ('role', 'center_ids', 'group_ids')
+SCOPE_VERSION_CLAIM = 'scope_version'
+
+
+class Scope:
+    """
+    What a user's role-based querysets filter on: their role, the ids of the
+    centers they supervise and the ids of the groups they teach.
+
+    One instance is built per request (`get_scope`) and answers every scope
+    question of that request: `filter()` narrows a queryset and `allows()`
+    checks an instance from its foreign key ids, without a query. Admin
+    access stays with the callers, which differ on `role` vs `is_staff`.
+    """
+
+    def __init__(self, role, center_ids=(), group_ids=(), user_id=None):
+        self.role = role
+        self.center_ids = list(center_ids)
+        self.group_ids = list(group_ids)
+        self.user_id = user_id
+
+    @classmethod
+    def for_user(cls, user):
+        """Read the scope from the database (two queries)."""
+        from centers.models import Center
+        from teachers.models import Teacher
+
+        return cls(
+            getattr(user, 'role', None),
+            Center.objects.filter(supervisor=user).values_list('id', flat=True),
+            Teacher.groups.through.objects.filter(teacher__user=user).values_list('group_id', flat=True),
+            user.pk,
+        )
+
+    @classmethod
+    def from_token(cls, token, user_id=None):
+        """The scope embedded in an access token, or None for tokens issued without it."""
+        if token is None or any(claim not in token for claim in SCOPE_CLAIMS):
+            return None
+        return cls(token['role'], token['center_ids'], token['group_ids'], user_id)
+
+    def as_claims(self):
+        return {'role': self.role, 'center_ids': self.center_ids, 'group_ids': self.group_ids}
+
+    @cached_property
+    def center_id_set(self):
+        return frozenset(self.center_ids)
+
+    @cached_property
+    def group_id_set(self):
+        return frozenset(self.group_ids)
+
+    def has_center(self, center_id):
+        return center_id in self.center_id_set
+
+    def has_group(self, group_id):
+        return group_id in self.group_id_set
+
+    def filter_centers(self, queryset, lookup='center'):
+        """Rows whose `lookup` is a supervised center, whatever the role."""
+        if not self.center_ids:
+            return queryset.none()
+        return queryset.filter(**{f'{lookup}__in': self.center_ids})
+
+    def filter_groups(self, queryset, lookup='group'):
+        """Rows whose `lookup` is a taught group, whatever the role."""
+        if not self.group_ids:
+            return queryset.none()
+        return queryset.filter(**{f'{lookup}__in': self.group_ids})
+
+    def filter(self, queryset, center='center', group=None, own=None):
+        """
+        Rows visible to a non-admin user: center supervisors see their
+        centers (`center` lookup), trainers their groups (`group` lookup,
+        when given), and other roles the rows whose `own` lookup is
+        themselves. Without a matching lookup, nothing.
+        """
+        if self.role == 'center_supervisor':
+            return self.filter_centers(queryset, center)
+        if self.role == 'trainer' and group:
+            return self.filter_groups(queryset, group)
+        if own:
+            return queryset.filter(**{own: self.user_id})
+        return queryset.none()
+
+    def allows(self, obj, center='center', group=None, own=None):
+        """`filter()` for one instance: checks its foreign key ids, no query."""
+        if self.role == 'center_supervisor':
+            return self.has_center(_field_value(obj, center))
+        if self.role == 'trainer' and group:
+            return self.has_group(_field_value(obj, group))
+        if own:
+            return _field_value(obj, own) == self.user_id
+        return False
+
+    @cached_property
+    def student_ids(self):
+        """Ids of the students this user sees (one query, on first use)."""
+        from students.models import Student
+
+        return frozenset(self.filter(Student.objects, group='group', own='user').values_list('id', flat=True))
+
+
+def _field_value(obj, name):
+    """`obj.<name>_id` for a foreign key (or `obj.pk`), without loading the related object."""
+    if name == 'pk':
+        return obj.pk
+    return getattr(obj, obj._meta.get_field(name).attname)
+
+
+def scope_claims(user):
+    """JWT claims describing `user`'s scope, stamped with its `scope_version`."""
+    return {**Scope.for_user(user).as_claims(), SCOPE_VERSION_CLAIM: user.scope_version}
+
+
+def get_scope(request):
+    """
+    The scope of the request's user, from the access token claims when they
+    are there (no query) or from the database otherwise, e.g. for tokens
+    issued before the claims existed or forced authentication. Memoized on
+    the request, so views and permission classes share it.
+    """
+    scope = getattr(request, '_scope', None)
+    if scope is None:
+        scope = Scope.from_token(request.auth, request.user.pk) or Scope.for_user(request.user)
+        request._scope = scope
+    return scope
+
+
+def invalidate_scope(user_ids):
+    """Bump `scope_version` so access tokens issued to these users are rejected."""
+    from accounts.models import User
+
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        User.objects.filter(pk__in=user_ids).update(scope_version=F('scope_version') + 1)
+        for user_id in user_ids:
+            invalidate_cached_user(user_id)
@@ -0,0 +1,96 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from centers.models import Center, Group
+from teachers.models import Teacher
+from .scope import invalidate_scope
+from .user_cache import invalidate_cached_user
+
+# Scope invalidation: whatever changes a user's role, supervised centers or
+# taught groups bumps their `scope_version`, so access tokens carrying the
+# old scope claims stop being accepted. Queryset `update()`s bypass these
+# signals and must call `invalidate_scope` themselves.
+
+
+def _previous(instance, field, update_fields):
+    """The stored value of `field` before this save, or None for new rows."""
+    if instance._state.adding or (update_fields is not None and field not in update_fields):
+        return getattr(instance, field)
+    return type(instance).objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Covers profile edits, password changes and deactivation
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._previous_role = _previous(instance, 'role', update_fields)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and not created and getattr(instance, '_previous_role', instance.role) != instance.role:
+        invalidate_scope([instance.pk])
+        instance.refresh_from_db(fields=['scope_version'])
+
+
+@receiver(pre_save, sender=Center)
+def center_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._previous_supervisor_id = _previous(instance, 'supervisor_id', update_fields)
+
+
+@receiver(post_save, sender=Center)
+def center_saved(sender, instance, created=False, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_supervisor_id', instance.supervisor_id)
+    if not raw and (created or previous != instance.supervisor_id):
+        invalidate_scope([previous, instance.supervisor_id])
+
+
+@receiver(post_delete, sender=Center)
+def center_deleted(sender, instance, **kwargs):
+    invalidate_scope([instance.supervisor_id])
+
+
+@receiver(pre_save, sender=Teacher)
+def teacher_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._previous_user_id = _previous(instance, 'user_id', update_fields)
+
+
+@receiver(post_save, sender=Teacher)
+def teacher_saved(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_user_id', instance.user_id)
+    if not raw and previous != instance.user_id:
+        invalidate_scope([previous, instance.user_id])
+
+
+@receiver(post_delete, sender=Teacher)
+def teacher_deleted(sender, instance, **kwargs):
+    invalidate_scope([instance.user_id])
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    invalidate_scope(instance.teachers.values_list('user_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Teacher.groups.through)
+def teacher_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # `instance` is a group; its teachers are gone after the clear
+        instance._cleared_teacher_user_ids = list(instance.teachers.values_list('user_id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_scope([instance.user_id])
+    elif action == 'post_clear':
+        invalidate_scope(getattr(instance, '_cleared_teacher_user_ids', ()))
+    else:
+        invalidate_scope(Teacher.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
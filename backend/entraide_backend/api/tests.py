@@ -1,3 +1,654 @@
-from django.test import TestCase
+import datetime
+import importlib.util
+import io
+import json
+import logging
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.conf import settings
+from django.test.utils import CaptureQueriesContext
+from drf_yasg.generators import OpenAPISchemaGenerator
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from api import metrics
+from api.authentication import ScopedJWTAuthentication
+from api.db_router import ReplicaRouter, read_from_replica, replica_alias
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.schema import CachedSchemaGenerator, clear_schema_cache, code_version, write_artifact
+from api.scope import Scope
+from api.tokens import ScopedRefreshToken
+from api import user_cache
+from api.user_cache import clear_local_user_cache, get_cached_user
+from attendance.models import Attendance_record
+from attendance.serializers import AttendanceRecordSerializer
+from centers.models import Center, Room, Equipment, Group
+from centers.serializers import GroupSerializer
+from programs.models import TrainingCourse, TrainingPrograme
+from schedule.models import Schedule_session, SessionInstance
+from schedule.serializers import TrainerSerializer
+from students.models import Student
+from students.serializers import StudentSerializer
+from teachers.models import Teacher
+
+User = get_user_model()
+
+
+class OptInCursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password', first_name='A', last_name='D', role='admin'
+        )
+        for i in range(24):
+            User.objects.create_user(
+                email=f'user{i}@example.com', password=None, first_name='U', last_name=str(i)
+            )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get('/api/accounts/users/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 25)
+
+    def walk(self, url, link='next'):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertFalse([q for q in queries if 'OFFSET' in q['sql'] or 'COUNT(' in q['sql']])
+            pages.append([row['id'] for row in response.data['results']])
+            last, url = response, response.data[link]
+        return pages, last
+
+    def test_cursor_pagination_walks_every_row_once_without_count(self):
+        # The users endpoint uses the default page size (10)
+        pages, _ = self.walk('/api/accounts/users/?pagination=cursor')
+        seen = [pk for page in pages for pk in page]
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sorted(seen), sorted(User.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_cursor_pagination_keys_on_every_ordering_field(self):
+        # Every row ties on created_at: only the id tells pages apart
+        User.objects.update(created_at=timezone.now())
+        pages, last = self.walk('/api/accounts/users/?pagination=cursor')
+        forward = [pk for page in pages for pk in page]
+        self.assertEqual(forward, list(User.objects.order_by('-created_at', 'id').values_list('id', flat=True)))
+        backward, _ = self.walk(last.data['previous'], link='previous')
+        self.assertEqual([pk for page in reversed(backward) for pk in page], forward[:-len(pages[-1])])
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ('garbage', 'cD1hYmMmcD0x'):  # 'p=abc&p=1'
+            response = self.client.get('/api/accounts/users/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='admin@example.com', password=None, first_name='A', last_name='D', role='admin'
+        ))
+        for i in range(3):
+            center = Center.objects.create(name=f'Center {i}', description='d', city=f'City {i}')
+            room = Room.objects.create(name=f'Room {i}', description='d', type='lab', capacity=20, center=center)
+            Equipment.objects.create(name=f'PC {i}', description='d', condition='good', quantity=10,
+                                     center=center, room=room)
+            Group.objects.create(name=f'Group {i}', center=center)
+
+    def test_full_representation_by_default(self):
+        response = self.client.get('/api/centers-app/centers/')
+        center = response.data['results'][0]
+        self.assertIn('rooms', center)
+        self.assertIn('equipments', center['rooms'][0])
+
+    def test_fields_skip_unrequested_relations(self):
+        with self.assertNumQueries(2):  # count + centers, no prefetches
+            response = self.client.get('/api/centers-app/centers/?fields=id,name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+        with self.assertNumQueries(3):  # + rooms, without rooms__equipments
+            response = self.client.get('/api/centers-app/centers/?fields=id,rooms.name')
+        self.assertEqual(response.data['results'][0]['rooms'], [{'name': 'Room 0'}])
+
+    def test_expand_adds_nested_fields_to_plain_ones(self):
+        response = self.client.get('/api/centers-app/centers/?expand=groups')
+        center = response.data['results'][0]
+        self.assertIn('city', center)
+        self.assertNotIn('rooms', center)
+        self.assertEqual([group['name'] for group in center['groups']], ['Group 0'])
+
+
+class BatchTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password=None, first_name='A', last_name='D', role='admin'
+        )
+        Center.objects.create(name='Center', description='d', city='Larache')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+
+    def test_sub_requests_share_one_authentication(self):
+        with mock.patch.object(ScopedJWTAuthentication, 'get_user', autospec=True,
+                               side_effect=ScopedJWTAuthentication.get_user) as get_user:
+            response = self.client.post('/api/batch/', {'requests': [
+                {'id': 'me', 'url': '/api/accounts/users/me/'},
+                {'id': 'centers', 'url': '/api/centers-app/centers/?fields=id,name'},
+                {'url': '/api/nothing-here/'},
+            ]}, format='json')
+        self.assertEqual(get_user.call_count, 1)
+        me, centers, missing = response.data['responses']
+        self.assertEqual((me['id'], me['status'], me['body']['email']), ('me', 200, 'admin@example.com'))
+        self.assertEqual(centers['body']['results'][0], {'id': Center.objects.get().id, 'name': 'Center'})
+        self.assertEqual((missing['id'], missing['status']), ('/api/nothing-here/', 404))
+
+    def test_only_api_get_requests_are_accepted(self):
+        response = self.client.post('/api/batch/', {'requests': [{'url': '/api/batch/'}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.client.credentials()
+        response = self.client.post('/api/batch/', {'requests': [{'url': '/api/accounts/users/me/'}]}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class FastJSONTests(APITestCase):
+    data = {
+        'at': datetime.datetime(2025, 3, 1, 8, 30, 15, 120000, tzinfo=datetime.timezone.utc),
+        'local': timezone.localtime(timezone.now()),
+        'naive': datetime.datetime(2025, 3, 1, 8, 30),
+        'day': datetime.date(2025, 3, 1),
+        'time': datetime.time(9, 15),
+        'duration': datetime.timedelta(minutes=90),
+        'score': Decimal('12.50'),
+        'label': gettext_lazy('Active'),
+        'nested': [{1: 'é', 'text': 'line\u2028break\u2029'}, (1, 2.5, None, True)],
+    }
+
+    def test_renderer_matches_drf_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+        self.assertIn(b'\\u2028', FastJSONRenderer().render(self.data))
+
+    def test_indented_and_oversized_values_fall_back_to_stdlib(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, 'application/json; indent=2'),
+            JSONRenderer().render(self.data, 'application/json; indent=2'),
+        )
+        self.assertEqual(FastJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_parser_round_trip_and_errors(self):
+        body = JSONRenderer().render(self.data)
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"a": '))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+
+    def test_api_uses_fast_renderer_and_parser(self):
+        admin = User.objects.create_user(
+            email='admin@example.com', password='password', first_name='A', last_name='D', role='admin'
+        )
+        self.client.force_authenticate(user=admin)
+        response = self.client.post(
+            '/api/batch/', b'{"requests": [{"url": "/api/accounts/users/me/"}]}', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.json()['responses'][0]['body']['email'], 'admin@example.com')
+
+
+class ProjectionTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password', first_name='A', last_name='D', role='admin'
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.center = Center.objects.create(name='Larache', description='d')
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        trainer = User.objects.create_user(
+            email='trainer@example.com', password=None, first_name='T', last_name='R', role='trainer'
+        )
+        course = TrainingCourse.objects.create(
+            program=program, center=self.center, trainer=trainer, academic_year='2024-2025'
+        )
+        group = Group.objects.create(name='G1', description='d', center=self.center)
+        room = Room.objects.create(name='R1', description='d', type='classroom', capacity=20, center=self.center)
+        Equipment.objects.create(
+            name='Projector', description='d', condition='good', quantity=1, center=self.center, room=room
+        )
+        self.template = Schedule_session.objects.create(
+            day='Monday', start_time=datetime.time(9), end_time=datetime.time(11), training_course=course,
+            trainer=trainer, room=room, group=group, academic_year='2024-2025'
+        )
+        self.instance = SessionInstance.objects.create(
+            schedule_template=self.template, specific_date=datetime.date(2025, 3, 3), custom_room=room
+        )
+        for i in range(6):
+            user = User.objects.create_user(
+                email=f'student{i}@example.com', password=None, first_name='S', last_name=str(i),
+                Arabic_first_name='سارة' if i % 2 else None
+            )
+            student = Student.objects.create(
+                user=user, exam_id=f'C1/{i:03}/24', center=self.center, program=program, group=group if i % 2 else None,
+                academic_year='2024-2025', joining_date=datetime.date(2024, 9, 1)
+            )
+            Attendance_record.objects.create(
+                student=student, date=datetime.date(2025, 3, 3), session_instance=self.instance,
+                status='present' if i % 3 else 'absent'
+            )
+
+    def serialized(self, serializer_class, queryset):
+        return json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data))
+
+    def test_trainers_and_groups_by_center_match_serializers(self):
+        response = self.client.get('/api/schedule/api/sessions/trainers_by_center/', {'center_id': self.center.id})
+        self.assertEqual(response.json(), self.serialized(TrainerSerializer, User.objects.filter(role='trainer')))
+        response = self.client.get('/api/schedule/api/sessions/groups_by_center/', {'center_id': self.center.id})
+        self.assertEqual(response.json(), self.serialized(GroupSerializer, Group.objects.all()))
+
+    def test_student_directory_matches_serializer(self):
+        response = self.client.get('/api/students/students/', {'page_size': 100})
+        self.assertEqual(response.json()['count'], 6)
+        self.assertEqual(
+            response.json()['results'], self.serialized(StudentSerializer, Student.objects.order_by('-created_at'))
+        )
+        response = self.client.get('/api/students/students/', {'pagination': 'cursor', 'page_size': 4})
+        self.assertEqual(len(response.json()['results']), 4)
+        self.assertEqual(len(self.client.get(response.json()['next']).json()['results']), 2)
+
+    def test_attendance_by_session_matches_serializer_in_constant_queries(self):
+        url = '/api/attendance/api/records/by_session/'
+        params = {'date': '2025-03-03', 'session_instance_id': self.instance.id}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        expected = self.serialized(AttendanceRecordSerializer, Attendance_record.objects.order_by('id'))
+        self.assertEqual(sorted(response.json(), key=lambda row: row['id']), expected)
+        self.assertEqual(response.json()[0]['effective_session']['id'], self.instance.id)
+
+        # The session is serialized once per response, not once per record
+        student = Student.objects.first()
+        Attendance_record.objects.filter(student=student).update(date=datetime.date(2025, 3, 4))
+        Attendance_record.objects.filter(date=datetime.date(2025, 3, 3)).delete()
+        Attendance_record.objects.create(
+            student=student, date=datetime.date(2025, 3, 3), session_instance=self.instance, status='present'
+        )
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(len(self.client.get(url, params).json()), 1)
+
+    def test_sparse_fieldsets_bypass_the_projection(self):
+        response = self.client.get('/api/students/students/', {'fields': 'id,exam_id'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'exam_id'})
+
+
+class ScopeClaimsTests(APITestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user(
+            email='sup@example.com', password='password', first_name='S', last_name='U', role='center_supervisor'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com', password='password', first_name='O', last_name='T', role='center_supervisor'
+        )
+        self.center = Center.objects.create(name='Larache', description='d', city='Larache', supervisor=self.supervisor)
+        self.center2 = Center.objects.create(name='Tanger', description='d', city='Tanger')
+        Room.objects.create(name='R1', description='d', type='classroom', capacity=20, center=self.center)
+        Room.objects.create(name='R2', description='d', type='classroom', capacity=20, center=self.center2)
+
+    def login(self, email):
+        response = self.client.post('/api/token/', {'email': email, 'password': 'password'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def rooms(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get('/api/centers-app/rooms/')
+
+    def test_access_token_carries_scope_claims(self):
+        token = AccessToken(self.login('sup@example.com')['access'])
+        self.assertEqual(token['role'], 'center_supervisor')
+        self.assertEqual(token['center_ids'], [self.center.id])
+        self.assertEqual(token['group_ids'], [])
+        self.assertEqual(token['scope_version'], 1)  # bumped when the center was assigned
+
+    def test_scoped_querysets_use_claims_without_looking_up_centers(self):
+        access = self.login('sup@example.com')['access']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.rooms(access)
+        self.assertEqual([room['name'] for room in response.data['results']], ['R1'])
+        self.assertFalse([q for q in queries if 'FROM "centers_center"' in q['sql']])
+
+    def test_supervisor_change_invalidates_tokens_until_refresh(self):
+        tokens = self.login('sup@example.com')
+        self.center2.supervisor = self.supervisor
+        self.center2.save()
+        self.assertEqual(self.rooms(tokens['access']).status_code, 401)
+
+        self.client.credentials()
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        access = response.data['access']
+        self.assertEqual(sorted(AccessToken(access)['center_ids']), sorted([self.center.id, self.center2.id]))
+        self.assertEqual(len(self.rooms(access).data['results']), 2)
+
+    def test_unrelated_saves_keep_tokens_valid(self):
+        tokens = self.login('sup@example.com')
+        self.center.name = 'Larache 2'
+        self.center.save()
+        self.supervisor.first_name = 'Sam'
+        self.supervisor.save()
+        self.assertEqual(self.rooms(tokens['access']).status_code, 200)
+
+    def test_role_and_group_changes_bump_scope_version(self):
+        teacher = Teacher.objects.create(
+            user=self.other, center=self.center2, program=TrainingPrograme.objects.create(name='P', duration_years=1),
+            contarct_with='entraide', contract_start_date=datetime.date(2024, 9, 1),
+            contract_end_date=datetime.date(2025, 6, 30)
+        )
+        group = Group.objects.create(name='G1', description='d', center=self.center2)
+        versions = [User.objects.get(pk=self.other.pk).scope_version]
+        teacher.groups.add(group)
+        versions.append(User.objects.get(pk=self.other.pk).scope_version)
+        group.teachers.clear()
+        versions.append(User.objects.get(pk=self.other.pk).scope_version)
+        self.other.role = 'trainer'
+        self.other.save()
+        versions.append(User.objects.get(pk=self.other.pk).scope_version)
+        self.assertEqual(versions, [0, 1, 2, 3])
+        self.assertEqual(self.other.scope_version, 3)
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': tempfile.mkdtemp(prefix='auth-user-cache-'),
+}})
+class AuthUserCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local_user_cache()
+        metrics.reset()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password', first_name='A', last_name='D', role='admin'
+        )
+        self.tokens = self.client.post(
+            '/api/token/', {'email': 'admin@example.com', 'password': 'password'}, format='json'
+        ).data
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+
+    def user_queries(self, url='/api/accounts/users/me/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q for q in queries if 'FROM "accounts_user"' in q['sql']]
+
+    def test_repeated_requests_do_not_query_the_user(self):
+        self.assertTrue(self.user_queries())
+        self.assertFalse(self.user_queries())
+        clear_local_user_cache()  # another worker: served from the shared cache
+        self.assertFalse(self.user_queries())
+        self.assertEqual(
+            {name: value for name, value in metrics.snapshot().items() if name.startswith('auth_user_cache.')},
+            {'auth_user_cache.miss': 1, 'auth_user_cache.local_hit': 1, 'auth_user_cache.shared_hit': 1},
+        )
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        self.user_queries()
+        self.admin.first_name = 'Alice'
+        self.admin.save()
+        self.assertEqual(self.client.get('/api/accounts/users/me/').data['first_name'], 'Alice')
+
+    def test_password_change_and_deactivation_invalidate_the_cache(self):
+        self.user_queries()
+        response = self.client.post(
+            '/api/accounts/users/change_password/', {'old_password': 'password', 'new_password': 'Other-pass-123'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.user_queries())
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertEqual(self.client.get('/api/accounts/users/me/').status_code, 401)
+
+    def test_logout_invalidates_the_cache(self):
+        self.user_queries()
+        response = self.client.post('/api/accounts/users/logout/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.user_queries())
+
+    def test_invalidation_repeats_after_commit(self):
+        stale = pickle.dumps(self.admin)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.admin.is_active = False
+            self.admin.save()
+            # A concurrent request still sees the committed row and caches it
+            # under the version the save just bumped
+            version = cache.get(user_cache._version_key(self.admin.pk))
+            cache.set(user_cache._user_key(self.admin.pk, version), stale)
+            user_cache._remember_locally(self.admin.pk, time.monotonic() + 5, stale)
+        self.assertTrue(callbacks)
+        self.assertEqual(self.client.get('/api/accounts/users/me/').status_code, 401)
+
+    def test_shared_level_is_skipped_with_a_process_local_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.user_queries()
+            clear_local_user_cache()  # another worker: nothing shared to read
+            self.assertTrue(self.user_queries())
+
+    @override_settings(AUTH_USER_CACHE={'LOCAL_TTL': 5, 'LOCAL_MAX_ENTRIES': 2, 'SHARED_TTL': 0})
+    def test_local_cache_is_bounded(self):
+        users = [
+            User.objects.create_user(email=f'u{n}@example.com', password=None, first_name='U', last_name='N')
+            for n in range(3)
+        ]
+        for user in users:
+            get_cached_user(user.pk)
+        self.assertEqual(sorted(user_cache._local), [users[1].pk, users[2].pk])
+
+    def test_metrics_report_the_hit_rate(self):
+        self.user_queries()
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.data['hit_rates']['auth_user_cache'], 0.5)
+        self.client.force_authenticate(User.objects.create_user(
+            email='s@example.com', password=None, first_name='S', last_name='T', role='student'
+        ))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+
+class ScopeServiceTests(APITestCase):
+    def setUp(self):
+        self.program = TrainingPrograme.objects.create(name='P', duration_years=1)
+        self.center = Center.objects.create(name='Larache', description='d', city='Larache')
+        self.center2 = Center.objects.create(name='Tanger', description='d', city='Tanger')
+        self.group = Group.objects.create(name='G1', description='d', center=self.center)
+        self.group2 = Group.objects.create(name='G2', description='d', center=self.center)
+        self.students = []
+        for i, (center, group) in enumerate([(self.center, self.group), (self.center, self.group2), (self.center2, None)]):
+            user = User.objects.create_user(
+                email=f's{i}@example.com', password=None, first_name='S', last_name=str(i), role='student'
+            )
+            self.students.append(Student.objects.create(
+                user=user, exam_id=f'C/{i:03}/24', center=center, program=self.program, group=group,
+                academic_year='2024-2025', joining_date=datetime.date(2024, 9, 1)
+            ))
+
+    def test_filter_and_allows_agree_per_role(self):
+        scopes = {
+            'center_supervisor': Scope('center_supervisor', [self.center.id], []),
+            'trainer': Scope('trainer', [], [self.group.id]),
+            'student': Scope('student', user_id=self.students[2].user_id),
+            'association_supervisor': Scope('association_supervisor', user_id=None),
+        }
+        expected = {
+            'center_supervisor': {self.students[0].id, self.students[1].id},
+            'trainer': {self.students[0].id},
+            'student': {self.students[2].id},
+            'association_supervisor': set(),
+        }
+        for role, scope in scopes.items():
+            with self.subTest(role=role):
+                visible = set(scope.filter(Student.objects.all(), group='group', own='user').values_list('id', flat=True))
+                self.assertEqual(visible, expected[role])
+                self.assertEqual(scope.student_ids, expected[role])
+                with self.assertNumQueries(0):
+                    allowed = {s.id for s in self.students if scope.allows(s, group='group', own='user')}
+                self.assertEqual(allowed, expected[role])
+
+    def test_object_permission_checks_centers_without_queries(self):
+        supervisor = User.objects.create_user(
+            email='sup@example.com', password=None, first_name='S', last_name='U', role='center_supervisor'
+        )
+        self.center.supervisor = supervisor
+        self.center.save()
+        room = Room.objects.create(name='R1', description='d', type='classroom', capacity=20, center=self.center)
+        other = Room.objects.create(name='R2', description='d', type='classroom', capacity=20, center=self.center2)
+        access = ScopedRefreshToken.for_user(User.objects.get(pk=supervisor.pk)).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(f'/api/centers-app/rooms/{room.id}/').status_code, 200)
+            self.assertEqual(self.client.get(f'/api/centers-app/rooms/{other.id}/').status_code, 404)
+            self.assertEqual(self.client.get(f'/api/centers-app/groups/{self.group.id}/').status_code, 200)
+        # Scope from the token claims, permission from the foreign key ids
+        self.assertFalse([q for q in queries if 'FROM "centers_center"' in q['sql']])
+
+
+class CachedSchemaTests(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = f'{directory.name}/openapi.json'
+        settings_override = override_settings(API_SCHEMA={'PATH': self.path, 'VERSION': 'v-test', 'MAX_AGE': 600})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+        # drf_yasg warns about views that need a user to build their queryset
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_schema_is_generated_once_and_served_with_cache_headers(self):
+        with mock.patch.object(OpenAPISchemaGenerator, 'get_schema', autospec=True,
+                               side_effect=OpenAPISchemaGenerator.get_schema) as get_schema:
+            first = self.client.get('/swagger.json')
+            second = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=first['ETag'])
+            self.client.get('/swagger/')
+            self.client.get('/redoc/')
+            self.client.get('/swagger.yaml')
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('/batch/', json.loads(first.content)['paths'])
+        self.assertIn('max-age=600', first['Cache-Control'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_artifact_is_used_only_for_its_code_version(self):
+        write_artifact()
+        clear_schema_cache()
+        with mock.patch.object(CachedSchemaGenerator, 'get_schema') as get_schema:
+            response = self.client.get('/swagger.json')
+        get_schema.assert_not_called()
+        self.assertIn('/batch/', json.loads(response.content)['paths'])
+
+        clear_schema_cache()
+        with override_settings(API_SCHEMA={'PATH': self.path, 'VERSION': 'v-next'}):
+            self.assertEqual(code_version(), 'v-next')
+            with mock.patch.object(OpenAPISchemaGenerator, 'get_schema', autospec=True,
+                                   side_effect=OpenAPISchemaGenerator.get_schema) as get_schema:
+                self.client.get('/swagger.json')
+            self.assertEqual(get_schema.call_count, 1)
+
+
+class StartupBenchmarkTests(TestCase):
+    def test_heavy_dependencies_are_not_imported_at_startup(self):
+        out = io.StringIO()
+        call_command('benchmark_startup', runs=1, stdout=out)
+        heavy = next(line for line in out.getvalue().splitlines() if line.startswith('Heavy imports:'))
+        for module in ('pandas', 'numpy'):
+            self.assertNotIn(module, heavy)
+        self.assertIn('Peak RSS:', out.getvalue())
+
+
+class ReplicaRoutingTests(APITestCase):
+    databases = {'default', 'replica'} if 'replica' in settings.DATABASES else {'default'}
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password=None, first_name='A', last_name='D', role='admin'
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_router_reads_from_replica_until_the_first_write(self):
+        router = ReplicaRouter()
+        with mock.patch('api.db_router.replica_alias', return_value='replica'):
+            self.assertIsNone(router.db_for_read(Attendance_record))
+            with read_from_replica():
+                self.assertEqual(router.db_for_read(Attendance_record), 'replica')
+                self.assertIsNone(router.db_for_write(Attendance_record))
+                self.assertIsNone(router.db_for_read(Attendance_record))
+            with read_from_replica():
+                self.assertEqual(router.db_for_read(Attendance_record), 'replica')
+            self.assertFalse(router.allow_migrate('replica', 'attendance'))
+            self.assertTrue(router.allow_migrate('default', 'attendance'))
+
+    def test_only_reporting_actions_read_from_replica(self):
+        params = {'start_date': '2025-03-01', 'end_date': '2025-03-31'}
+        with mock.patch('api.db_router.replica_alias', side_effect=replica_alias) as alias:
+            self.assertEqual(self.client.get('/api/attendance/api/records/', params).status_code, 200)
+            self.assertEqual(alias.call_count, 0)
+            response = self.client.get('/api/attendance/api/records/stats/', params)
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(alias.call_count, 0)
+
+    def test_reporting_queries_run_on_the_replica_connection(self):
+        if 'replica' not in settings.DATABASES:
+            self.skipTest("No replica configured (set DB_REPLICA_NAME or DB_REPLICA_HOST)")
+        params = {'start_date': '2025-03-01', 'end_date': '2025-03-31'}
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            self.client.get('/api/attendance/api/records/', params)
+            self.assertFalse(replica_queries)
+            self.client.get('/api/attendance/api/records/stats/', params)
+        self.assertTrue([q for q in replica_queries if 'attendance_attendance_record' in q['sql']])
+
+
+class DatabaseConnectionTests(TransactionTestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_benchmark_compares_new_connections_with_reuse(self):
+        out = io.StringIO()
+        call_command('benchmark_db_connections', requests=5, stdout=out)
+        rows = {line.split('  ')[0]: line.split()[-1] for line in out.getvalue().splitlines()[2:4]}
+        self.assertEqual(rows['new connection per request'], '5')
+        if not connection.settings_dict['OPTIONS'].get('pool'):
+            self.assertEqual(int(next(value for label, value in rows.items() if label.startswith('configured'))), 1)
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], settings.DATABASES['default']['CONN_MAX_AGE'])
+
+    def test_pooling_without_psycopg3_fails_with_a_clear_error(self):
+        if importlib.util.find_spec('psycopg') and importlib.util.find_spec('psycopg_pool'):
+            self.skipTest("psycopg 3 and its pool are installed")
+        completed = subprocess.run(
+            [sys.executable, '-c', 'import django; django.setup()'], cwd=settings.BASE_DIR,
+            env={**os.environ, 'DB_POOL': '1', 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE},
+            capture_output=True, text=True,
+        )
+        self.assertNotEqual(completed.returncode, 0)
+        self.assertIn('ImproperlyConfigured: DB_POOL=1 needs psycopg 3', completed.stderr)
+
+    def test_metrics_report_counts_connection_checkouts(self):
+        connection.close()
+        User.objects.exists()
+        databases = metrics.report()['databases']
+        self.assertEqual(databases['default']['checkouts'], 1)
+        self.assertIsNotNone(databases['default']['avg_checkout_ms'])
+        self.assertEqual(databases['default']['conn_max_age'], connection.settings_dict['CONN_MAX_AGE'])
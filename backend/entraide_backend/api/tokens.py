@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .scope import scope_claims
+
+
+class ScopedRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user's scope claims (role,
+    supervised center ids, taught group ids, scope version), read from the
+    database each time an access token is issued, i.e. at login and on
+    refresh. Refreshing is therefore how a client picks up a scope change.
+    """
+    _user = None
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token._user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = self._user or get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: self.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is not None:
+            access.payload.update(scope_claims(user))
+        return access
+
+
+class ScopedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ScopedRefreshToken
+
+
+class ScopedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ScopedRefreshToken
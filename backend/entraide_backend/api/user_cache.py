@@ -0,0 +1,118 @@
+import pickle
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+
+from . import metrics
+
+# user id -> (expires at, pickled user)
+_local = {}
+_local_lock = threading.Lock()
+
+
+def user_cache_setting(name, default):
+    return getattr(settings, 'AUTH_USER_CACHE', {}).get(name, default)
+
+
+def _shared_ttl():
+    """
+    `SHARED_TTL`, or 0 when the default cache is Django's per-process
+    LocMemCache: a version bumped there is invisible to the other workers,
+    which would keep serving their shared entry for the whole TTL.
+    """
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return 0
+    return user_cache_setting('SHARED_TTL', 300)
+
+
+def _remember_locally(user_id, expires, data):
+    """Keep at most `LOCAL_MAX_ENTRIES` users: expired ones go first, then the oldest."""
+    limit = user_cache_setting('LOCAL_MAX_ENTRIES', 1000)
+    with _local_lock:
+        _local.pop(user_id, None)
+        if len(_local) >= limit:
+            now = time.monotonic()
+            for key in [key for key, entry in _local.items() if entry[0] <= now]:
+                del _local[key]
+            while len(_local) >= limit:
+                del _local[next(iter(_local))]
+        _local[user_id] = (expires, data)
+
+
+def _version_key(user_id):
+    return f'auth-user-version:{user_id}'
+
+
+def _user_key(user_id, version):
+    return f'auth-user:{user_id}:{version}'
+
+
+def get_cached_user(user_id):
+    """
+    The `User` with this id for request authentication, or None.
+
+    Looked up in a process-local cache (`LOCAL_TTL` seconds), then in the
+    shared Django cache under the user's current version (`SHARED_TTL`
+    seconds, skipped when that cache is process-local), then in the database. Each call returns a fresh unpickled
+    instance, so requests never share one object. `invalidate_cached_user`
+    bumps the version, which makes every process's shared entry unreachable;
+    other processes may serve their local copy for up to `LOCAL_TTL`.
+    """
+    local_ttl = user_cache_setting('LOCAL_TTL', 5)
+    shared_ttl = _shared_ttl()
+    now = time.monotonic()
+
+    entry = _local.get(user_id)
+    if entry is not None and entry[0] > now:
+        metrics.incr('auth_user_cache.local_hit')
+        return pickle.loads(entry[1])
+
+    version = cache.get(_version_key(user_id), 0) if shared_ttl > 0 else 0
+    data = cache.get(_user_key(user_id, version)) if shared_ttl > 0 else None
+    if data is not None:
+        metrics.incr('auth_user_cache.shared_hit')
+    else:
+        metrics.incr('auth_user_cache.miss')
+        user = get_user_model()._default_manager.filter(pk=user_id).first()
+        if user is None:
+            return None
+        data = pickle.dumps(user)
+        if shared_ttl > 0:
+            cache.set(_user_key(user_id, version), data, shared_ttl)
+    if local_ttl > 0:
+        _remember_locally(user_id, now + local_ttl, data)
+    return pickle.loads(data)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Forget the cached user, here and (through its version) in every process.
+
+    Inside a transaction this runs again once it commits: until then other
+    requests still read the old row, and one of them may have cached it
+    under the version bumped here.
+    """
+    _invalidate(user_id)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _invalidate(user_id))
+
+
+def _invalidate(user_id):
+    with _local_lock:
+        _local.pop(user_id, None)
+    key = _version_key(user_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted between add() and incr()
+        cache.set(key, 1, None)
+
+
+def clear_local_user_cache():
+    with _local_lock:
+        _local.clear()
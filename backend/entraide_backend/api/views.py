@@ -1,9 +1,18 @@
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from . import metrics
+from .batch import BatchRequestSerializer, run_batch
+from .permissions import IsAdmin
+from .schema import schema_document, schema_setting
 
 # Generated by Copilot
 class DecoratedTokenObtainPairView(TokenObtainPairView):
@@ -142,3 +151,79 @@ class DecoratedTokenRefreshView(TokenRefreshView):
         Get a new access token using a valid refresh token.
         """
         return super().post(request, *args, **kwargs)
+
+
+class BatchView(APIView):
+    """
+    Runs several GET API requests in one round-trip, under the caller's
+    authentication.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="""
+        ## Batch endpoint
+
+        Runs up to 20 GET requests to other `/api/` endpoints and returns their
+        results in order. The token is checked once for the whole batch.
+
+        ### Request Format
+        ```json
+        {
+            "requests": [
+                {"id": "me", "url": "/api/accounts/users/me/"},
+                {"id": "groups", "url": "/api/centers-app/groups/?fields=id,name"}
+            ],
+            "parallel": false
+        }
+        ```
+
+        ### Response Format
+        ```json
+        {
+            "responses": [
+                {"id": "me", "status": 200, "body": {...}},
+                {"id": "groups", "status": 200, "body": {...}}
+            ]
+        }
+        ```
+
+        A failing sub-request only affects its own entry. `parallel` runs the
+        sub-requests in a thread pool.
+        """,
+        request_body=BatchRequestSerializer,
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = run_batch(
+            request, serializer.validated_data['requests'], parallel=serializer.validated_data['parallel']
+        )
+        return Response({'responses': responses})
+
+
+
+class MetricsView(APIView):
+    """
+    Counters of the worker process that served the request, such as the
+    authenticated-user cache hit rate. Admin only.
+    """
+    permission_classes = [IsAdmin]
+
+    @swagger_auto_schema(operation_description="Process-local counters and cache hit rates of this worker.")
+    def get(self, request):
+        return Response(metrics.report())
+
+
+@require_safe
+@condition(etag_func=lambda request: schema_document()[1])
+def schema_json(request):
+    """
+    The OpenAPI schema as JSON, built once per code version (see
+    `api.schema`). Clients may cache it for `API_SCHEMA['MAX_AGE']` seconds
+    and revalidate it with its ETag.
+    """
+    body, _ = schema_document()
+    response = HttpResponse(body, content_type='application/json')
+    patch_cache_control(response, public=True, max_age=schema_setting('MAX_AGE', 3600))
+    return response
@@ -1,21 +1,22 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from .models import Association
 from accounts.models import User # Make sure User model is imported
 from centers.models import Center # Import Center model directly
 
 # Serializer for representing supervisor details
-class SupervisorRepresentationSerializer(serializers.ModelSerializer):
+class SupervisorRepresentationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'first_name', 'last_name', 'email'] # Remove arabic fields that don't exist
 
 # Serializer for representing center details within association
-class CenterRepresentationSerializer(serializers.ModelSerializer):
+class CenterRepresentationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Center # Use the imported model directly
         fields = ['id', 'name', 'city', 'phone_number', 'is_active', 'is_verified']
 
-class AssociationSerializer(serializers.ModelSerializer):
+class AssociationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     supervisor = SupervisorRepresentationSerializer(read_only=True)
     centers = CenterRepresentationSerializer(many=True, read_only=True) # Add centers relationship
     logo_url = serializers.SerializerMethodField()
@@ -1,10 +1,11 @@
 from django.shortcuts import render
 from rest_framework import viewsets
+from api.mixins import SparseFieldsetViewMixin
 from .models import Association
 from .serializers import AssociationSerializer
 
 # Create your views here.
 
-class AssociationViewSet(viewsets.ModelViewSet):
+class AssociationViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Association.objects.all()
     serializer_class = AssociationSerializer
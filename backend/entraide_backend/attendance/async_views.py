@@ -0,0 +1,97 @@
+import csv
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from api.async_auth import async_login_required
+from api.db_router import replica_reads
+from .models import Attendance_record
+
+
+class _Echo:
+    """File-like object whose write() just returns the line, for streaming csv.writer output."""
+    def write(self, value):
+        return value
+
+
+EXPORT_COLUMNS = [
+    ('date', 'Date'),
+    ('student__exam_id', 'Exam ID'),
+    ('student__user__first_name', 'First Name'),
+    ('student__user__last_name', 'Last Name'),
+    ('student__group__name', 'Group'),
+    ('status', 'Status'),
+    ('notes', 'Notes'),
+]
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+@replica_reads
+def _fetch_chunk(queryset, last_key):
+    """Fetch the next chunk of rows after `last_key` (keyset on date, id)."""
+    if last_key is not None:
+        last_date, last_id = last_key
+        queryset = queryset.filter(Q(date__gt=last_date) | Q(date=last_date, id__gt=last_id))
+    fields = [field for field, _ in EXPORT_COLUMNS]
+    return list(queryset.order_by('date', 'id').values_list('id', *fields)[:EXPORT_CHUNK_SIZE])
+
+
+async def _stream_rows(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([label for _, label in EXPORT_COLUMNS])
+    last_key = None
+    while True:
+        chunk = await sync_to_async(_fetch_chunk)(queryset, last_key)
+        for row in chunk:
+            yield writer.writerow(row[1:])
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            break
+        last_key = (chunk[-1][1], chunk[-1][0])
+
+
+@require_GET
+@async_login_required
+async def export_attendance_csv(request):
+    """
+    Stream attendance records for a date range as CSV.
+
+    Query params: `start_date`, `end_date` (YYYY-MM-DD, required), and
+    optionally `student_id` or `group_id`. Trainers only get records of
+    their own sessions, like `AttendanceRecordViewSet`.
+    """
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    if not start_date or not end_date:
+        return JsonResponse({'error': 'start_date and end_date are required'}, status=400)
+    try:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format'}, status=400)
+
+    queryset = Attendance_record.objects.filter(date__range=[start_date, end_date])
+
+    if getattr(request.user, 'role', None) == 'trainer':
+        queryset = queryset.filter(
+            Q(session_template__trainer_id=request.user.id) |
+            Q(session_instance__schedule_template__trainer_id=request.user.id)
+        )
+
+    student_id = request.GET.get('student_id')
+    group_id = request.GET.get('group_id')
+    if student_id:
+        queryset = queryset.filter(student_id=student_id)
+    elif group_id:
+        queryset = queryset.filter(student__group_id=group_id)
+
+    response = StreamingHttpResponse(
+        _stream_rows(queryset),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="attendance_{start_date}_{end_date}.csv"'
+    return response
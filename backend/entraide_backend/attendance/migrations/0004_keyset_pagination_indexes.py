@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_alter_attendance_record_unique_together'),
+        ('schedule', '0002_alter_schedule_session_options_and_more'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance_record',
+            index=models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+        ),
+    ]
@@ -29,6 +29,10 @@ class Attendance_record(models.Model):
             ['student', 'session_instance', 'date'],
             ['student', 'session_template', 'date'],
         ]
+        indexes = [
+            # Keyset pagination order (see AttendanceRecordViewSet.cursor_ordering)
+            models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+        ]
 
     def clean(self):
         """Ensure either session_template or session_instance is provided, not both"""
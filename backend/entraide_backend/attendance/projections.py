@@ -0,0 +1,26 @@
+from api.projections import Computed, Nested, Projection, Related
+from schedule.models import Schedule_session, SessionInstance
+from schedule.serializers import ScheduleSessionSerializer, SessionInstanceSerializer
+from students.projections import student_projection
+
+# A sheet's records share one session: serialize it once per response
+session_template = Related(
+    'session_template', ScheduleSessionSerializer,
+    Schedule_session.objects.select_related('trainer', 'room', 'group', 'training_course'),
+)
+session_instance = Related(
+    'session_instance', SessionInstanceSerializer,
+    SessionInstance.objects.select_related('schedule_template', 'custom_trainer', 'custom_room'),
+)
+
+# AttendanceRecordSerializer
+attendance_record_projection = Projection(
+    'id', 'date', 'student', 'session_template', 'session_instance', 'status', 'notes', 'created_at', 'edited_at',
+    student_details=Nested('student', student_projection),
+    session_template_details=session_template,
+    session_instance_details=session_instance,
+    effective_session=Computed(
+        lambda instance, template: instance if instance is not None else template,
+        session_instance, session_template,
+    ),
+)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from .models import Attendance_record
 from students.models import Student
 from schedule.models import Schedule_session, SessionInstance
@@ -6,7 +7,7 @@ from schedule.serializers import ScheduleSessionSerializer, SessionInstanceSeria
 from students.serializers import StudentSerializer
 
 
-class AttendanceRecordSerializer(serializers.ModelSerializer):
+class AttendanceRecordSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Main serializer for attendance records"""
     student_details = StudentSerializer(source='student', read_only=True)
     session_template_details = ScheduleSessionSerializer(source='session_template', read_only=True)
@@ -22,6 +23,9 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
             'status', 'notes', 'effective_session',
             'created_at', 'edited_at'
         ]
+        # Serialized nested session, only returned by ?expand= once ?fields=/?expand= is used
+        expandable_fields = ['effective_session']
+        field_relations = {'effective_session': ['session_instance', 'session_template']}
         
     def get_effective_session(self, obj):
         """Get the effective session (instance or template)"""
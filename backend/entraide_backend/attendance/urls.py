@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import AttendanceRecordViewSet
+from .async_views import export_attendance_csv
 
 router = DefaultRouter()
 router.register(r'records', AttendanceRecordViewSet, basename='attendance-records')
 
 urlpatterns = [
+    path('api/records/export/', export_attendance_csv, name='attendance-records-export'),
     path('api/', include(router.urls)),
 ] 
\ No newline at end of file
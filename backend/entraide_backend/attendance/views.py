@@ -4,11 +4,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from api.mixins import ProjectionViewMixin, ReplicaReadMixin, SparseFieldsetViewMixin
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Case, When, IntegerField
 from datetime import datetime, timedelta
 
 from .models import Attendance_record
+from .projections import attendance_record_projection
 from .serializers import (
     AttendanceRecordSerializer, CreateAttendanceRecordSerializer,
     BulkAttendanceSerializer, AttendanceReportSerializer,
@@ -20,7 +22,7 @@ from centers.models import Group
 from accounts.models import User
 
 
-class AttendanceRecordViewSet(viewsets.ModelViewSet):
+class AttendanceRecordViewSet(ReplicaReadMixin, SparseFieldsetViewMixin, ProjectionViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing attendance records
     """
@@ -29,6 +31,9 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['student', 'date', 'status', 'session_template', 'session_instance']
+    cursor_ordering = ('date', 'id')  # used by ?pagination=cursor
+    projections = {'by_session': attendance_record_projection}
+    replica_actions = ('stats', 'student_stats', 'report')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -147,6 +152,9 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
                 'error': 'Either session_instance_id or session_template_id is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        projection = self.get_projection()
+        if projection is not None:
+            return Response(list(projection.apply(queryset)))
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
@@ -0,0 +1,4 @@
+from api.projections import Projection
+
+# GroupSerializer
+group_projection = Projection('id', 'name', 'description', 'center', 'created_at', 'updated_at')
@@ -1,15 +1,16 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from .models import Center, Room, Equipment, Group
 from associations.models import Association # Assuming AssociationSerializer might be needed or for type hinting
 # If you have an AssociationSerializer and want to use it for nested representation:
 # from associations.serializers import AssociationSerializer
 
-class EquipmentSerializer(serializers.ModelSerializer):
+class EquipmentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Equipment
         fields = '__all__'
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     equipments = EquipmentSerializer(many=True, read_only=True) # Nested equipment for reads
     picture_url = serializers.SerializerMethodField() # Added for full picture URL
 
@@ -23,12 +24,12 @@ class RoomSerializer(serializers.ModelSerializer):
             return obj.picture.url
         return None
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = '__all__'
 
-class CenterSerializer(serializers.ModelSerializer):
+class CenterSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     rooms = RoomSerializer(many=True, read_only=True) # Nested rooms for reads
     groups = GroupSerializer(many=True, read_only=True) # Nested groups for reads
     
@@ -4,6 +4,8 @@ from .models import Center, Room, Equipment, Group
 from .serializers import CenterSerializer, RoomSerializer, EquipmentSerializer, GroupSerializer
 from django_filters.rest_framework import DjangoFilterBackend # For filtering
 from rest_framework.filters import SearchFilter, OrderingFilter
+from api.mixins import SparseFieldsetViewMixin
+from api.scope import get_scope
 from .filters import CenterFilter # Added import
 
 # Create your views here.
@@ -31,22 +33,17 @@ class IsAdminOrCenterSupervisor(permissions.BasePermission):
         if request.user.is_staff: # Admin can do anything
             return True
         
-        # For Room, Equipment, Group, check if user is supervisor of the parent center
-        center = None
+        # Supervised center ids come from the request's scope (see api.scope):
+        # a set lookup on the foreign key id, without loading center.supervisor
+        scope = get_scope(request)
         if isinstance(obj, Center):
-            return obj.supervisor == request.user
-        elif isinstance(obj, Room):
-            center = obj.center
-        elif isinstance(obj, Equipment):
-            center = obj.center # Equipment is directly linked to a center as per models.py
-        elif isinstance(obj, Group):
-            center = obj.center
-        
-        if center:
-            return center.supervisor == request.user
+            return scope.has_center(obj.pk)
+        elif isinstance(obj, (Room, Equipment, Group)):
+            # Equipment is directly linked to a center as per models.py
+            return scope.has_center(obj.center_id)
         return False
 
-class CenterViewSet(viewsets.ModelViewSet):
+class CenterViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Center.objects.prefetch_related(
         'rooms__equipments', # For RoomSerializer nesting and room_equipment_condition filter
         'groups', 
@@ -86,17 +83,8 @@ class CenterViewSet(viewsets.ModelViewSet):
             if user.role == 'admin':
                 return base_queryset.all()
             elif user.role == 'center_supervisor':
-                # Ensure the user object might have supervised_centers (e.g., they are not an AnonymousUser)
-                # and the related manager exists.
-                if hasattr(user, 'supervised_centers') and user.supervised_centers is not None:
-                    return user.supervised_centers.prefetch_related(
-                        'rooms__equipments',
-                        'groups',
-                        'association',
-                        # 'supervisor' is already part of the user.supervised_centers context
-                        'equipments'
-                    ).all()
-                return Center.objects.none()
+                # Supervised center ids come from the token's scope claims (see api.scope)
+                return get_scope(self.request).filter_centers(base_queryset, 'pk')
             else:
                 # Other authenticated roles might not see any centers by default
                 return Center.objects.none()
@@ -110,7 +98,7 @@ class CenterViewSet(viewsets.ModelViewSet):
     # we'll likely need a custom FilterSet class. I'll add a placeholder for now.
     # We can create a filters.py file for this.
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
     permission_classes = [IsAdminOrCenterSupervisor]
@@ -129,11 +117,10 @@ class RoomViewSet(viewsets.ModelViewSet):
         if user.is_staff: # Admin sees all
             return Room.objects.all()
         # Center supervisor sees rooms in their supervised centers
-        if hasattr(user, 'supervised_centers'):
-             return Room.objects.filter(center__in=user.supervised_centers.all())
-        return Room.objects.none() # No access if not admin or supervisor of any center
+        # (no supervised centers: no access)
+        return get_scope(self.request).filter_centers(Room.objects.all())
 
-class EquipmentViewSet(viewsets.ModelViewSet):
+class EquipmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Equipment.objects.all()
     serializer_class = EquipmentSerializer
     permission_classes = [IsAdminOrCenterSupervisor]
@@ -151,11 +138,9 @@ class EquipmentViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_staff:
             return Equipment.objects.all()
-        if hasattr(user, 'supervised_centers'):
-            return Equipment.objects.filter(center__in=user.supervised_centers.all())
-        return Equipment.objects.none()
+        return get_scope(self.request).filter_centers(Equipment.objects.all())
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [IsAdminOrCenterSupervisor]
@@ -170,6 +155,4 @@ class GroupViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_staff:
             return Group.objects.all()
-        if hasattr(user, 'supervised_centers'):
-            return Group.objects.filter(center__in=user.supervised_centers.all())
-        return Group.objects.none()
+        return get_scope(self.request).filter_centers(Group.objects.all())
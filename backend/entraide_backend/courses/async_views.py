@@ -0,0 +1,43 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, Http404
+from django.views.decorators.http import require_GET
+
+from api.async_auth import async_login_required
+from .models import Lesson
+
+
+def _fetch_pdf(url):
+    import requests  # only needed here; keeps it out of worker startup
+
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+@require_GET
+@async_login_required
+async def lesson_pdf_proxy(request, pk):
+    """
+    Async version of `LessonViewSet.pdf_proxy`.
+
+    The upstream Cloudinary fetch runs in a worker thread, so under ASGI a slow
+    download no longer blocks the process from serving other requests.
+    """
+    lesson = await Lesson.objects.filter(pk=pk).afirst()
+    if lesson is None or lesson.lesson_type != 'pdf' or not lesson.pdf_file:
+        raise Http404("PDF file not found")
+
+    from requests import RequestException
+
+    try:
+        content = await sync_to_async(_fetch_pdf, thread_sensitive=False)(lesson.pdf_file.url)
+    except RequestException as e:
+        raise Http404(f"Could not fetch PDF file: {str(e)}")
+
+    pdf_response = HttpResponse(content, content_type='application/pdf')
+    pdf_response['Content-Disposition'] = f'inline; filename="{lesson.title}.pdf"'
+    pdf_response['X-Frame-Options'] = 'SAMEORIGIN'
+    pdf_response['Access-Control-Allow-Origin'] = '*'
+    pdf_response['Access-Control-Allow-Methods'] = 'GET'
+    pdf_response['Access-Control-Allow-Headers'] = 'Authorization, Content-Type'
+    return pdf_response
@@ -0,0 +1,267 @@
+import gzip
+import hashlib
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, connection, transaction
+from django.utils import timezone
+
+from programs.models import TrainingPrograme
+from .models import Course, Unit, Section, Lesson, Practice, Question, QuestionOption
+from .outline import rebuild_course_outline
+from .search import update_lesson_search_vectors
+
+BUNDLE_VERSION = 1
+BUNDLE_CHUNK_SIZE = 2000
+
+# (record type, model, parent record type, parent field, lookup from the
+# course, ordering). Levels are written and read in this order, so a record's
+# parent is always imported before it. Orderings only use `order` fields
+# (unique among siblings), which makes the archive independent of row ids.
+LEVELS = [
+    ('course', Course, None, None, 'pk', ()),
+    ('unit', Unit, 'course', 'course', 'course', ('order',)),
+    ('section', Section, 'unit', 'unit', 'unit__course', ('unit__order', 'order')),
+    ('lesson', Lesson, 'section', 'section', 'section__unit__course',
+     ('section__unit__order', 'section__order', 'order')),
+    ('practice', Practice, 'section', 'section', 'section__unit__course',
+     ('section__unit__order', 'section__order')),
+    ('question', Question, 'practice', 'practice', 'practice__section__unit__course',
+     ('practice__section__unit__order', 'practice__section__order', 'order')),
+    ('option', QuestionOption, 'question', 'question', 'question__practice__section__unit__course',
+     ('question__practice__section__unit__order', 'question__practice__section__order', 'question__order',
+      'order')),
+]
+
+# Content carried by the archive. Computed columns (outline totals, search
+# vectors, practice statistics) are rebuilt on import.
+BUNDLE_FIELDS = {
+    Course: ['name', 'description', 'cover_image', 'is_active', 'order'],
+    Unit: ['name', 'description', 'order'],
+    Section: ['name', 'description', 'about', 'order'],
+    Lesson: ['title', 'lesson_type', 'text_content', 'video_url', 'pdf_file', 'external_url', 'order',
+             'duration_minutes'],
+    Practice: ['instructions'],
+    Question: ['question_text', 'question_type', 'points', 'order', 'explanation'],
+    QuestionOption: ['option_text', 'is_correct', 'order'],
+}
+
+
+class BundleError(ValueError):
+    """The archive is malformed, truncated or cannot be imported here."""
+
+
+def _dump(record):
+    return json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode() + b'\n'
+
+
+def iter_bundle_lines(course):
+    """
+    JSON lines of a course bundle, streamed level by level.
+
+    The first line describes the bundle. Then there is one
+    `{"type", "ref", "parent", "fields"}` record per node. `ref` numbers
+    nodes per type from 1, and `parent` is the parent's `ref`. The last line
+    holds the record counts and the SHA-256 of the node lines. That hash only
+    depends on content, so the same course gives the same hash on any
+    deployment.
+    """
+    yield _dump({
+        'type': 'bundle', 'version': BUNDLE_VERSION, 'course': course.name, 'program': course.program.name,
+        'exported_at': timezone.now(),
+    })
+    digest = hashlib.sha256()
+    refs = {}
+    counts = {}
+    for record_type, model, parent_type, parent_field, lookup, ordering in LEVELS:
+        fields = BUNDLE_FIELDS[model]
+        prepare = [model._meta.get_field(name).get_prep_value for name in fields]
+        parent_refs = refs.get(parent_type)
+        columns = ['id', f'{parent_field}_id'] if parent_field else ['id']
+        rows = (
+            model.objects.filter(**{lookup: course.pk}).order_by(*ordering, 'id')
+            .values_list(*columns, *fields).iterator(chunk_size=BUNDLE_CHUNK_SIZE)
+        )
+        level_refs = refs[record_type] = {}
+        for ref, row in enumerate(rows, start=1):
+            level_refs[row[0]] = ref
+            values = row[len(columns):]
+            line = _dump({
+                'type': record_type,
+                'ref': ref,
+                'parent': parent_refs[row[1]] if parent_field else None,
+                'fields': {name: prep(value) for name, prep, value in zip(fields, prepare, values)},
+            })
+            digest.update(line)
+            yield line
+        counts[record_type] = len(level_refs)
+    yield _dump({'type': 'end', 'counts': counts, 'sha256': digest.hexdigest()})
+
+
+def iter_gzip(chunks, level=6):
+    """Gzip-compress an iterable of bytes as a stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_course_bundle(course):
+    """The gzip-compressed bundle of `course`, as a stream of bytes chunks."""
+    return iter_gzip(iter_bundle_lines(course))
+
+
+def _iter_records(fileobj):
+    """Decompress and parse an archive line by line."""
+    fileobj.seek(0)
+    try:
+        with gzip.open(fileobj, 'rb') as lines:
+            for line in lines:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise BundleError("Every bundle line must be a JSON object")
+                yield line, record
+    except BundleError:
+        raise
+    except (OSError, EOFError, ValueError) as exc:
+        raise BundleError(f"Unreadable bundle: {exc}") from exc
+
+
+def read_bundle_header(fileobj):
+    """
+    Check an archive end to end in one streaming pass and return
+    `(header, trailer)`. Raises `BundleError` if the hash does not match.
+    """
+    digest = hashlib.sha256()
+    header = trailer = None
+    for line, record in _iter_records(fileobj):
+        if header is None:
+            if record.get('type') != 'bundle' or record.get('version') != BUNDLE_VERSION:
+                raise BundleError("Not a course bundle, or an unsupported version")
+            if not isinstance(record.get('course'), str) or not isinstance(record.get('program'), str):
+                raise BundleError("The bundle header needs course and program names")
+            header = record
+        elif record.get('type') == 'end':
+            trailer = record
+        elif trailer is not None:
+            raise BundleError("Records found after the end of the bundle")
+        else:
+            digest.update(line)
+    if trailer is None:
+        raise BundleError("Bundle is truncated")
+    if trailer.get('sha256') != digest.hexdigest():
+        raise BundleError("Bundle content does not match its hash")
+    if not isinstance(trailer.get('counts'), dict):
+        raise BundleError("The bundle trailer needs record counts")
+    return header, trailer
+
+
+def _check_record(record):
+    """Raise `BundleError` unless a node record has the shape `iter_bundle_lines` writes."""
+    if not isinstance(record.get('ref'), int) or not isinstance(record.get('fields'), dict):
+        raise BundleError(f"{record['type']} records need an integer ref and a fields object")
+    if record['type'] != 'course' and not isinstance(record.get('parent'), int):
+        raise BundleError(f"{record['type']} {record['ref']} needs an integer parent")
+
+
+def import_course_bundle(fileobj, program=None, name=None):
+    """
+    Import a course bundle from a seekable binary file.
+
+    The archive is read twice, both times as a stream: once to check its
+    hash, then to insert nodes level by level in batches of
+    `BUNDLE_CHUNK_SIZE`. Only the ref to new id maps are kept in memory.
+    The course stores the bundle's hash in `content_hash`, so importing the
+    same content again returns the existing course without writing
+    anything.
+
+    `program` defaults to the program with the exported program's name;
+    `name` overrides the course name.
+    Returns `(course, created, counts)`.
+    """
+    header, trailer = read_bundle_header(fileobj)
+    existing = Course.objects.filter(content_hash=trailer['sha256']).first()
+    if existing is not None:
+        return existing, False, trailer['counts']
+
+    if program is None:
+        program = TrainingPrograme.objects.filter(name=header['program']).first()
+        if program is None:
+            raise BundleError(f"No program named {header['program']!r}; choose one explicitly")
+    name = name or header['course']
+    if Course.objects.filter(name=name).exists():
+        raise BundleError(f"A course named {name!r} already exists; choose another name")
+
+    levels = {level[0]: level for level in LEVELS}
+    new_ids = {}
+    counts = {}
+    batch = []
+    batch_type = None
+
+    def flush():
+        if not batch:
+            return
+        _, model, parent_type, parent_field, _, _ = levels[batch_type]
+        parent_ids = new_ids.get(parent_type, {})
+        rows = []
+        for record in batch:
+            fields = {name: record['fields'].get(name) for name in BUNDLE_FIELDS[model]}
+            if parent_field:
+                try:
+                    fields[f'{parent_field}_id'] = parent_ids[record['parent']]
+                except KeyError:
+                    raise BundleError(f"{batch_type} {record['ref']} refers to a missing {parent_type}")
+            else:
+                fields.update(name=name, program=program, content_hash=trailer['sha256'])
+            rows.append(model(**{key: value for key, value in fields.items() if value is not None}))
+        try:
+            created = model.objects.bulk_create(rows)
+        except (ValueError, TypeError, ValidationError) as exc:
+            raise BundleError(f"Invalid {batch_type} values: {exc}") from exc
+        level_ids = new_ids.setdefault(batch_type, {})
+        for record, row in zip(batch, created):
+            level_ids[record['ref']] = row.pk
+        counts[batch_type] = counts.get(batch_type, 0) + len(created)
+        batch.clear()
+
+    order = [level[0] for level in LEVELS]
+    try:
+        with transaction.atomic():
+            for _, record in _iter_records(fileobj):
+                record_type = record.get('type')
+                if record_type in ('bundle', 'end'):
+                    continue
+                if not isinstance(record_type, str) or record_type not in levels:
+                    raise BundleError(f"Unknown record type {record_type!r}")
+                _check_record(record)
+                if batch_type is not None and order.index(record_type) < order.index(batch_type):
+                    raise BundleError(f"{record_type} records must come before {batch_type} records")
+                if record_type != batch_type or len(batch) >= BUNDLE_CHUNK_SIZE:
+                    flush()
+                    batch_type = record_type
+                batch.append(record)
+            flush()
+
+            course_ids = list(new_ids.get('course', {}).values())
+            if len(course_ids) != 1:
+                raise BundleError("A bundle must contain exactly one course")
+            course = Course.objects.get(pk=course_ids[0])
+            update_lesson_search_vectors(Lesson.objects.filter(section__unit__course=course))
+            rebuild_course_outline(course.pk)
+            # Sibling `order` constraints are deferred: check them here, not at the final commit
+            connection.check_constraints()
+    except (IntegrityError, DataError) as exc:
+        # A concurrent import of the same bundle, or of a course with the same name, committed first
+        existing = Course.objects.filter(content_hash=trailer['sha256']).first()
+        if existing is not None:
+            return existing, False, trailer['counts']
+        if Course.objects.filter(name=name).exists():
+            raise BundleError(f"A course named {name!r} already exists; choose another name") from exc
+        raise BundleError(f"Bundle cannot be imported: {exc}") from exc
+
+    course.refresh_from_db()
+    return course, True, counts
@@ -0,0 +1,76 @@
+from django.db import transaction
+
+from .models import Course, Unit, Section, Lesson, Practice, Question, QuestionOption
+from .outline import rebuild_course_outline
+
+CLONE_BATCH_SIZE = 1000
+
+
+def _clone_rows(model, source, parent_field, parent_map, reset=None):
+    """
+    Insert copies of `source` under their cloned parents with one
+    `bulk_create`, remapping `parent_field` through `parent_map`.
+
+    Rows are copied field by field, so Cloudinary fields keep pointing at the
+    same uploaded asset. Returns `{old_id: new_id}` for the next level.
+    """
+    rows = list(source.order_by('pk'))
+    old_ids = [row.pk for row in rows]
+    parent_attname = f'{parent_field}_id'
+    for row in rows:
+        row.pk = None
+        row._state.adding = True
+        setattr(row, parent_attname, parent_map[getattr(row, parent_attname)])
+        for name, value in (reset or {}).items():
+            setattr(row, name, value)
+    created = model.objects.bulk_create(rows, batch_size=CLONE_BATCH_SIZE)
+    return dict(zip(old_ids, (row.pk for row in created)))
+
+
+def clone_course(course, program, name):
+    """
+    Copy `course` with its units, sections, lessons, practices, questions and
+    options into `program` as a new course called `name`.
+
+    Runs in one transaction with one bulk insert per level; ids are remapped
+    in memory. Lessons keep their `search_vector` (the indexed text is copied
+    as is), practice statistics start at zero and progress or attempts are not
+    copied. The outline of the new course is built before returning.
+
+    Returns `(new_course, counts)` where `counts` holds the rows created per level.
+    """
+    in_course = {
+        Unit: {'course': course},
+        Section: {'unit__course': course},
+        Lesson: {'section__unit__course': course},
+        Practice: {'section__unit__course': course},
+        Question: {'practice__section__unit__course': course},
+        QuestionOption: {'question__practice__section__unit__course': course},
+    }
+    with transaction.atomic():
+        clone = Course.objects.create(
+            name=name, description=course.description, cover_image=course.cover_image,
+            is_active=course.is_active, order=course.order, program=program
+        )
+        units = _clone_rows(Unit, Unit.objects.filter(**in_course[Unit]), 'course', {course.pk: clone.pk})
+        sections = _clone_rows(Section, Section.objects.filter(**in_course[Section]), 'unit', units)
+        lessons = _clone_rows(Lesson, Lesson.objects.filter(**in_course[Lesson]), 'section', sections)
+        practices = _clone_rows(Practice, Practice.objects.filter(**in_course[Practice]), 'section', sections)
+        questions = _clone_rows(
+            Question, Question.objects.filter(**in_course[Question]), 'practice', practices,
+            reset={'attempt_count': 0, 'correct_count': 0}
+        )
+        options = _clone_rows(
+            QuestionOption, QuestionOption.objects.filter(**in_course[QuestionOption]), 'question', questions
+        )
+        rebuild_course_outline(clone.pk)
+
+    clone.refresh_from_db(fields=['lesson_count', 'total_minutes'])
+    return clone, {
+        'units': len(units),
+        'sections': len(sections),
+        'lessons': len(lessons),
+        'practices': len(practices),
+        'questions': len(questions),
+        'options': len(options),
+    }
@@ -0,0 +1,120 @@
+import threading
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, Value, When
+
+from .models import Question, QuestionOption, PracticeAttempt, PracticeAnswer
+
+# practice id -> (version, answer key). Per process; a stale entry is detected
+# by its version and rebuilt, so no cross-process invalidation is needed.
+_answer_keys = {}
+_answer_keys_lock = threading.Lock()
+
+
+def _normalize_text(value):
+    return ' '.join(str(value).split()).lower()
+
+
+def answer_key_version(practice_id):
+    """
+    Cheap fingerprint of a practice's questions and options: latest
+    `updated_at` of each plus their counts (which catch deletions).
+    """
+    state = Question.objects.filter(practice_id=practice_id).aggregate(
+        question_count=Count('id', distinct=True),
+        option_count=Count('options'),
+        question_updated=Max('updated_at'),
+        option_updated=Max('options__updated_at'),
+    )
+    return tuple(state[name] for name in ('question_count', 'option_count', 'question_updated', 'option_updated'))
+
+
+def build_answer_key(practice_id):
+    """
+    `{question_id: {'type', 'points', 'options', 'texts'}}` where `options` are
+    the correct option ids and `texts` their normalized texts (accepted short
+    answers).
+    """
+    key = {
+        question_id: {'type': question_type, 'points': points, 'options': set(), 'texts': set()}
+        for question_id, question_type, points in Question.objects.filter(
+            practice_id=practice_id
+        ).values_list('id', 'question_type', 'points')
+    }
+    correct = QuestionOption.objects.filter(
+        question__practice_id=practice_id, is_correct=True
+    ).values_list('question_id', 'id', 'option_text')
+    for question_id, option_id, option_text in correct:
+        key[question_id]['options'].add(option_id)
+        key[question_id]['texts'].add(_normalize_text(option_text))
+    return key
+
+
+def get_answer_key(practice_id):
+    """Answer key from the in-process cache, rebuilt when its version changes."""
+    version = answer_key_version(practice_id)
+    cached = _answer_keys.get(practice_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    key = build_answer_key(practice_id)
+    with _answer_keys_lock:
+        _answer_keys[practice_id] = (version, key)
+    return key
+
+
+def grade_answer(entry, options=(), text=''):
+    """
+    True if the answer is correct. Choice questions need exactly the set of
+    correct options; short answers must match one correct option's text.
+    """
+    if entry['type'] == 'short_answer':
+        return bool(text) and _normalize_text(text) in entry['texts']
+    return bool(entry['options']) and set(options) == entry['options']
+
+
+def submit_attempt(student, practice, answers):
+    """
+    Grade a practice attempt and store it.
+
+    `answers` maps question id -> `{'options': [...], 'text': ''}`; questions
+    left out count as wrong. The attempt and its answers are written with two
+    inserts, and every question's running `attempt_count`/`correct_count` is
+    bumped with a single UPDATE (which leaves `updated_at`, and therefore the
+    cached answer key, untouched).
+    """
+    key = get_answer_key(practice.pk)
+    unknown = set(answers) - set(key)
+    if unknown:
+        raise ValueError(f"Questions {sorted(unknown)} are not part of this practice")
+
+    rows = []
+    earned = total = 0
+    for question_id, entry in key.items():
+        answer = answers.get(question_id, {})
+        options = answer.get('options') or []
+        text = answer.get('text') or ''
+        is_correct = grade_answer(entry, options, text)
+        points = entry['points'] if is_correct else 0
+        earned += points
+        total += entry['points']
+        rows.append(PracticeAnswer(
+            question_id=question_id, selected_options=list(options), answer_text=text,
+            is_correct=is_correct, points=points
+        ))
+
+    correct_ids = [row.question_id for row in rows if row.is_correct]
+    with transaction.atomic():
+        attempt = PracticeAttempt.objects.create(
+            student=student, practice=practice, earned_points=earned, total_points=total,
+            score=(earned / total * 100) if total else 0
+        )
+        for row in rows:
+            row.attempt = attempt
+        PracticeAnswer.objects.bulk_create(rows)
+        Question.objects.filter(pk__in=list(key)).update(
+            attempt_count=F('attempt_count') + 1,
+            correct_count=F('correct_count') + Case(
+                When(pk__in=correct_ids, then=Value(1)), default=Value(0)
+            ),
+        )
+    return attempt, key
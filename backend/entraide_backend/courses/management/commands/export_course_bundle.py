@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.bundles import export_course_bundle
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Export a course tree to a gzip-compressed JSON-lines bundle."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course', type=int, help="Course id")
+        parser.add_argument('path', help="Output file, e.g. course.jsonl.gz")
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.select_related('program').get(pk=options['course'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course {options['course']} does not exist")
+        size = 0
+        with open(options['path'], 'wb') as archive:
+            for chunk in export_course_bundle(course):
+                archive.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {course.name} to {options['path']} ({size} bytes)"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.bundles import import_course_bundle, BundleError
+from programs.models import TrainingPrograme
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a course bundle written by export_course_bundle. "
+        "Importing the same content twice is a no-op."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Bundle file")
+        parser.add_argument('--program', type=int, help="TrainingPrograme id (default: program with the exported name)")
+        parser.add_argument('--name', help="Name of the imported course (default: the exported name)")
+
+    def handle(self, *args, **options):
+        program = None
+        if options['program']:
+            try:
+                program = TrainingPrograme.objects.get(pk=options['program'])
+            except TrainingPrograme.DoesNotExist:
+                raise CommandError(f"TrainingPrograme {options['program']} does not exist")
+        try:
+            with open(options['path'], 'rb') as archive:
+                course, created, counts = import_course_bundle(archive, program=program, name=options['name'])
+        except BundleError as exc:
+            raise CommandError(str(exc))
+
+        summary = ', '.join(f"{count} {record_type}s" for record_type, count in counts.items())
+        if created:
+            self.stdout.write(self.style.SUCCESS(f"Imported course {course.pk} ({course.name}): {summary}"))
+        else:
+            self.stdout.write(f"Already imported as course {course.pk} ({course.name}); nothing written")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.outline import rebuild_course_outline
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed lesson outline of every course (or of the given course ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids'] or Course.objects.values_list('id', flat=True)
+        for course_id in course_ids:
+            count = rebuild_course_outline(course_id)
+            self.stdout.write(f"Course {course_id}: {count} lessons")
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-19 17:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Backfill for existing lessons; same weights as courses.search.lesson_search_vector
+POPULATE_SEARCH_VECTOR = """
+UPDATE courses_lesson AS l SET search_vector =
+    setweight(to_tsvector('simple', COALESCE(l.title, '')), 'A')
+    || setweight(to_tsvector('simple', COALESCE(l.text_content, '')), 'B')
+    || setweight(to_tsvector('simple', COALESCE(s.description, '') || ' ' || COALESCE(s.about, '')), 'C')
+    || setweight(to_tsvector('simple', COALESCE((
+        SELECT string_agg(q.question_text, ' ')
+        FROM courses_question q
+        JOIN courses_practice p ON p.id = q.practice_id
+        WHERE p.section_id = l.section_id
+    ), '')), 'D')
+FROM courses_section AS s
+WHERE s.id = l.section_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_alter_course_program'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lesson_search_vector_idx'),
+        ),
+        migrations.RunSQL(POPULATE_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-19 17:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_lesson_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='correct_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='PracticeAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('earned_points', models.FloatField(default=0)),
+                ('total_points', models.FloatField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('practice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='courses.practice')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='practice_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PracticeAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_options', models.JSONField(blank=True, default=list)),
+                ('answer_text', models.TextField(blank=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('points', models.FloatField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_answers', to='courses.question')),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='courses.practiceattempt')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='practiceattempt',
+            index=models.Index(fields=['student', 'practice', '-created_at'], name='practice_attempt_student_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='practiceanswer',
+            unique_together={('attempt', 'question')},
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-19 17:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_outlines(apps, schema_editor):
+    """Same ordering as courses.outline.rebuild_course_outline."""
+    Course = apps.get_model('courses', 'Course')
+    Lesson = apps.get_model('courses', 'Lesson')
+    CourseOutlineEntry = apps.get_model('courses', 'CourseOutlineEntry')
+    for course_id in Course.objects.values_list('id', flat=True):
+        lessons = Lesson.objects.filter(section__unit__course_id=course_id).order_by(
+            'section__unit__order', 'section__unit_id', 'section__order', 'section_id', 'order', 'id'
+        ).values_list('id', 'section_id', 'section__unit_id', 'duration_minutes')
+        entries = []
+        cumulative = 0
+        for sequence, (lesson_id, section_id, unit_id, duration) in enumerate(lessons, start=1):
+            cumulative += duration or 0
+            entries.append(CourseOutlineEntry(
+                course_id=course_id, lesson_id=lesson_id, sequence=sequence,
+                path=f'{course_id}/{unit_id}/{section_id}/{lesson_id}',
+                duration_minutes=duration or 0, cumulative_minutes=cumulative,
+            ))
+        CourseOutlineEntry.objects.bulk_create(entries)
+        Course.objects.filter(pk=course_id).update(lesson_count=len(entries), total_minutes=cumulative)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_lesson_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='total_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='CourseOutlineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('path', models.CharField(max_length=100)),
+                ('duration_minutes', models.PositiveIntegerField(default=0)),
+                ('cumulative_minutes', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outline', to='courses.course')),
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='outline_entry', to='courses.lesson')),
+            ],
+            options={
+                'ordering': ['course', 'sequence'],
+                'unique_together': {('course', 'sequence')},
+            },
+        ),
+        migrations.RunPython(build_outlines, migrations.RunPython.noop),
+    ]
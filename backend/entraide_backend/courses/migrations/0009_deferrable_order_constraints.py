@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-19 17:56
+
+import django.db.models.constraints
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_course_outline'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='lesson',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='question',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='questionoption',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='section',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='unit',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='lesson',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('section', 'order'), name='lesson_section_order_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('practice', 'order'), name='question_practice_order_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='questionoption',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('question', 'order'), name='questionoption_question_order_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='section',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('unit', 'order'), name='section_unit_order_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='unit',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('course', 'order'), name='unit_course_order_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_deferrable_order_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_course_content_hash'),
+        ('programs', '0004_trainingcourse_academic_year'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='course',
+            constraint=models.UniqueConstraint(condition=models.Q(('content_hash', ''), _negated=True), fields=('content_hash',), name='course_content_hash_uniq'),
+        ),
+    ]
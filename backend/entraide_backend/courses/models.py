@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models import Deferrable, Q, UniqueConstraint
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from cloudinary.models import CloudinaryField
 from programs.models import TrainingPrograme
+from accounts.models import User
 
 
 class Course(models.Model):
@@ -12,6 +16,11 @@ class Course(models.Model):
     cover_image = CloudinaryField('image', blank=True, null=True)
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)  # For ordering courses
+    # Totals of the lesson outline (see CourseOutlineEntry)
+    lesson_count = models.PositiveIntegerField(default=0, editable=False)
+    total_minutes = models.PositiveIntegerField(default=0, editable=False)
+    # SHA-256 of the bundle this course was imported from (see courses.bundles)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
     program = models.ForeignKey(TrainingPrograme, on_delete=models.CASCADE, null=False, blank=False, related_name='courses_program')
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -19,6 +28,10 @@ class Course(models.Model):
 
     class Meta:
         ordering = ['order', 'name']
+        constraints = [
+            # One course per imported bundle, even when two imports race
+            UniqueConstraint(fields=['content_hash'], condition=~Q(content_hash=''), name='course_content_hash_uniq'),
+        ]
 
     def __str__(self):
         return self.name
@@ -38,7 +51,10 @@ class Unit(models.Model):
 
     class Meta:
         ordering = ['order', 'name']
-        unique_together = ['course', 'order']
+        constraints = [
+            # Deferred so `reorder` can permute orders in one UPDATE
+            UniqueConstraint(fields=['course', 'order'], name='unit_course_order_uniq', deferrable=Deferrable.DEFERRED),
+        ]
 
     def __str__(self):
         return f"{self.course.name} - {self.name}"
@@ -59,7 +75,10 @@ class Section(models.Model):
 
     class Meta:
         ordering = ['order', 'name']
-        unique_together = ['unit', 'order']
+        constraints = [
+            # Deferred so `reorder` can permute orders in one UPDATE
+            UniqueConstraint(fields=['unit', 'order'], name='section_unit_order_uniq', deferrable=Deferrable.DEFERRED),
+        ]
 
     def __str__(self):
         return f"{self.unit.name} - {self.name}"
@@ -88,18 +107,48 @@ class Lesson(models.Model):
     
     order = models.PositiveIntegerField(default=0)  # For ordering lessons
     duration_minutes = models.PositiveIntegerField(null=True, blank=True)  # Estimated time
+
+    # Full-text index over the lesson, its section and the section's practice
+    # questions; maintained by courses.signals (see courses.search)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', 'title']
-        unique_together = ['section', 'order']
+        constraints = [
+            # Deferred so `reorder` can permute orders in one UPDATE
+            UniqueConstraint(fields=['section', 'order'], name='lesson_section_order_uniq', deferrable=Deferrable.DEFERRED),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='lesson_search_vector_idx'),
+        ]
 
     def __str__(self):
         return f"{self.section.name} - {self.title}"
 
 
+class CourseOutlineEntry(models.Model):
+    """
+    Lessons of a course flattened in reading order (unit, section and lesson
+    `order`), rebuilt by courses.outline whenever the course tree changes
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='outline')
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='outline_entry')
+    sequence = models.PositiveIntegerField()  # 1-based position within the course
+    path = models.CharField(max_length=100)  # "<course>/<unit>/<section>/<lesson>" ids
+    duration_minutes = models.PositiveIntegerField(default=0)
+    cumulative_minutes = models.PositiveIntegerField(default=0)  # Up to and including this lesson
+
+    class Meta:
+        ordering = ['course', 'sequence']
+        unique_together = ['course', 'sequence']
+
+    def __str__(self):
+        return f"{self.course_id} #{self.sequence}: {self.path}"
+
+
 class Practice(models.Model):
     """
     Practice content for a section
@@ -130,17 +179,27 @@ class Question(models.Model):
     points = models.PositiveIntegerField(default=1)  # Points for this question
     order = models.PositiveIntegerField(default=0)  # For ordering questions
     explanation = models.TextField(blank=True)  # Explanation of the correct answer
+    # Running totals over graded practice attempts (see courses.grading)
+    attempt_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', 'id']
-        unique_together = ['practice', 'order']
+        constraints = [
+            # Deferred so `reorder` can permute orders in one UPDATE
+            UniqueConstraint(fields=['practice', 'order'], name='question_practice_order_uniq', deferrable=Deferrable.DEFERRED),
+        ]
 
     def __str__(self):
         return f"Q{self.order + 1}: {self.question_text[:50]}..."
 
+    @property
+    def correctness_rate(self):
+        return self.correct_count / self.attempt_count if self.attempt_count else None
+
 
 class QuestionOption(models.Model):
     """
@@ -156,7 +215,94 @@ class QuestionOption(models.Model):
 
     class Meta:
         ordering = ['order']
-        unique_together = ['question', 'order']
+        constraints = [
+            # Deferred so `reorder` can permute orders in one UPDATE
+            UniqueConstraint(fields=['question', 'order'], name='questionoption_question_order_uniq', deferrable=Deferrable.DEFERRED),
+        ]
 
     def __str__(self):
         return f"{self.question.question_text[:30]}... - Option {self.order + 1}: {self.option_text[:30]}..."
+
+
+class PracticeAttempt(models.Model):
+    """
+    A student's graded submission of a practice quiz
+    """
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='practice_attempts')
+    practice = models.ForeignKey(Practice, on_delete=models.CASCADE, related_name='attempts')
+    earned_points = models.FloatField(default=0)
+    total_points = models.FloatField(default=0)
+    score = models.FloatField(default=0)  # Percentage of total_points
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', 'practice', '-created_at'], name='practice_attempt_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.practice} ({self.score:.0f}%)"
+
+
+class PracticeAnswer(models.Model):
+    """
+    Graded answer to one question within a practice attempt
+    """
+    attempt = models.ForeignKey(PracticeAttempt, on_delete=models.CASCADE, related_name='answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='attempt_answers')
+    selected_options = models.JSONField(default=list, blank=True)  # QuestionOption ids (mcq/true_false)
+    answer_text = models.TextField(blank=True)  # short_answer
+    is_correct = models.BooleanField(default=False)
+    points = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ['attempt', 'question']
+
+    def __str__(self):
+        return f"{self.attempt} - Q{self.question_id}: {'correct' if self.is_correct else 'wrong'}"
+
+
+class LessonProgress(models.Model):
+    """
+    A student's progress on one lesson, written in bulk from buffered client
+    events (see courses.progress)
+    """
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lesson_progress')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='progress')
+    progress_percent = models.PositiveSmallIntegerField(default=0)  # Furthest point reached, 0-100
+    position_seconds = models.PositiveIntegerField(default=0)  # Last playback position (videos)
+    time_spent_seconds = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    first_opened_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['student', 'lesson']
+
+    def __str__(self):
+        return f"{self.student} - {self.lesson.title}: {self.progress_percent}%"
+
+
+class CourseProgress(models.Model):
+    """
+    Per-student course completion summary, recomputed for the affected
+    students whenever lesson progress is flushed
+    """
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='course_progress')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='progress')
+    completed_lessons = models.PositiveIntegerField(default=0)
+    total_lessons = models.PositiveIntegerField(default=0)
+    percent = models.FloatField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'course']
+
+    def __str__(self):
+        return f"{self.student} - {self.course.name}: {self.percent:.0f}%"
+
@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models import Q, Subquery
+
+from .models import Course, Lesson, CourseOutlineEntry
+
+OUTLINE_ORDERING = ('section__unit__order', 'section__unit_id', 'section__order', 'section_id', 'order', 'id')
+
+
+def rebuild_course_outline(course_id):
+    """
+    Rebuild the outline of one course: a single ordered read of its lessons,
+    then the entries are replaced with a bulk insert, all in one transaction
+    holding the course row's lock so concurrent rebuilds of the course run
+    one after the other. Entries its lessons still have in another course
+    (they were just moved here) are dropped; that course's own rebuild
+    renumbers it.
+    """
+    with transaction.atomic():
+        if not Course.objects.select_for_update().filter(pk=course_id).exists():
+            return 0  # deleted meanwhile: its entries went with it
+        lessons = Lesson.objects.filter(section__unit__course_id=course_id).order_by(*OUTLINE_ORDERING).values_list(
+            'id', 'section_id', 'section__unit_id', 'duration_minutes'
+        )
+        entries = []
+        cumulative = 0
+        for sequence, (lesson_id, section_id, unit_id, duration) in enumerate(lessons, start=1):
+            duration = duration or 0
+            cumulative += duration
+            entries.append(CourseOutlineEntry(
+                course_id=course_id, lesson_id=lesson_id, sequence=sequence,
+                path=f'{course_id}/{unit_id}/{section_id}/{lesson_id}',
+                duration_minutes=duration, cumulative_minutes=cumulative,
+            ))
+        CourseOutlineEntry.objects.filter(
+            Q(course_id=course_id) | Q(lesson_id__in=[entry.lesson_id for entry in entries])
+        ).delete()
+        CourseOutlineEntry.objects.bulk_create(entries)
+        Course.objects.filter(pk=course_id).update(lesson_count=len(entries), total_minutes=cumulative)
+    return len(entries)
+
+
+def schedule_outline_rebuild(*course_ids):
+    """
+    Rebuild these courses' outlines once the current transaction commits.
+
+    Ids scheduled during one transaction are collected and each course is
+    rebuilt once at commit, however many of its units, sections or lessons
+    were saved or cascade-deleted. Outside a transaction they are rebuilt
+    right away.
+    """
+    course_ids = {course_id for course_id in course_ids if course_id is not None}
+    if not course_ids:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        for course_id in sorted(course_ids):
+            rebuild_course_outline(course_id)
+        return
+    pending = getattr(connection, 'pending_outline_rebuilds', None)
+    # A rolled back savepoint discards the flush registered inside it: start over
+    if pending is None or not any(func == pending.flush for _, func, _ in connection.run_on_commit):
+        pending = connection.pending_outline_rebuilds = _PendingRebuilds(connection)
+        transaction.on_commit(pending.flush)
+    pending.course_ids.update(course_ids)
+
+
+class _PendingRebuilds:
+    def __init__(self, connection):
+        self.connection = connection
+        self.course_ids = set()
+
+    def flush(self):
+        if getattr(self.connection, 'pending_outline_rebuilds', None) is self:
+            del self.connection.pending_outline_rebuilds
+        for course_id in sorted(self.course_ids):
+            rebuild_course_outline(course_id)
+
+
+def lesson_neighbourhood(lesson_id):
+    """
+    The outline entries of a lesson and of the lessons right before and after
+    it, with their course, in one indexed query.
+    """
+    entry = CourseOutlineEntry.objects.filter(lesson_id=lesson_id)
+    sequence = Subquery(entry.values('sequence')[:1])
+    return list(
+        CourseOutlineEntry.objects.select_related('course', 'lesson')
+        .filter(
+            course_id=Subquery(entry.values('course_id')[:1]),
+            sequence__gte=sequence - 1,
+            sequence__lte=sequence + 1,
+        )
+        .order_by('sequence')
+    )
@@ -0,0 +1,224 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Lesson, LessonProgress, CourseProgress
+
+logger = logging.getLogger(__name__)
+
+# A single event can report at most this much time spent, so a client left
+# open (or a forged payload) cannot inflate time_spent_seconds.
+MAX_EVENT_ELAPSED_SECONDS = 300
+
+
+def buffer_setting(name, default):
+    return getattr(settings, 'LESSON_PROGRESS_BUFFER', {}).get(name, default)
+
+
+class ProgressBuffer:
+    """
+    In-process buffer of lesson progress events.
+
+    Events are coalesced per (student, lesson) as they arrive, so a video
+    heartbeat every few seconds becomes one row update per flush. The buffer
+    is flushed with one bulk upsert when it holds `MAX_PENDING` entries, when
+    `FLUSH_INTERVAL` seconds have passed since the last flush (checked on each
+    `add` and by a background timer), and at process exit.
+
+    Each worker process has its own buffer; flushes merge into the stored rows
+    under a row lock, so concurrent workers do not overwrite each other.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+        self.timer = None
+
+    def add(self, student_id, events):
+        """
+        Coalesce a batch of validated events for one student.
+
+        A flush that comes due here never fails the request: the events are
+        already buffered, and a client retrying would count `elapsed` twice.
+        The error is logged and the timer retries the flush.
+        """
+        now = timezone.now()
+        with self.lock:
+            for event in events:
+                self._merge((student_id, event['lesson']), {
+                    'progress': event.get('progress') or 0,
+                    'position': event.get('position'),
+                    'elapsed': min(event.get('elapsed') or 0, MAX_EVENT_ELAPSED_SECONDS),
+                    'completed': event['type'] == 'complete',
+                    'first_seen': now, 'last_seen': now,
+                })
+            due = (
+                len(self.pending) >= buffer_setting('MAX_PENDING', 1000)
+                or time.monotonic() - self.last_flush >= buffer_setting('FLUSH_INTERVAL', 5)
+            )
+        if due:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Lesson progress flush failed; retrying from the timer")
+        self.schedule()
+
+    def _merge(self, key, update):
+        """Fold `update` into the pending entry of `key`; `update` is the more recent one. Holds `self.lock`."""
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = self.pending[key] = {
+                'progress': 0, 'position': None, 'elapsed': 0,
+                'completed': False, 'first_seen': update['first_seen'], 'last_seen': update['last_seen'],
+            }
+        entry['progress'] = max(entry['progress'], update['progress'])
+        if update['position'] is not None:
+            entry['position'] = update['position']
+        entry['elapsed'] += update['elapsed']
+        entry['completed'] |= update['completed'] or entry['progress'] >= 100
+        entry['first_seen'] = min(entry['first_seen'], update['first_seen'])
+        entry['last_seen'] = max(entry['last_seen'], update['last_seen'])
+
+    def schedule(self):
+        """Make sure a timer will flush what is left once traffic stops."""
+        interval = buffer_setting('FLUSH_INTERVAL', 5)
+        if interval <= 0 or not self.pending or (self.timer is not None and self.timer.is_alive()):
+            return
+        self.timer = threading.Timer(interval, self.flush_in_background)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Lesson progress flush failed")
+        finally:
+            connection.close()
+            self.timer = None
+            self.schedule()  # retry what a failed flush put back, or what arrived meanwhile
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of rows upserted."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            return flush_progress(pending)
+        except Exception:
+            # Put the entries back so the next flush retries them. Entries
+            # that arrived meanwhile are newer: merge the failed ones under them.
+            with self.lock:
+                newer, self.pending = self.pending, pending
+                for key, entry in newer.items():
+                    self._merge(key, entry)
+            raise
+
+
+def flush_progress(pending):
+    """
+    Merge coalesced entries into `LessonProgress` with one bulk upsert, then
+    refresh the `CourseProgress` summary of the affected students.
+    """
+    lesson_courses = dict(
+        Lesson.objects.filter(pk__in={lesson_id for _, lesson_id in pending})
+        .values_list('id', 'section__unit__course_id')
+    )
+    pending = {key: entry for key, entry in pending.items() if key[1] in lesson_courses}
+    if not pending:
+        return 0
+    student_ids = {student_id for student_id, _ in pending}
+
+    with transaction.atomic():
+        stored = {
+            (row.student_id, row.lesson_id): row
+            for row in LessonProgress.objects.select_for_update().filter(
+                student_id__in=student_ids, lesson_id__in={lesson_id for _, lesson_id in pending}
+            )
+        }
+        rows = []
+        for (student_id, lesson_id), entry in pending.items():
+            row = stored.get((student_id, lesson_id)) or LessonProgress(
+                student_id=student_id, lesson_id=lesson_id, first_opened_at=entry['first_seen']
+            )
+            row.progress_percent = min(max(row.progress_percent, entry['progress']), 100)
+            if entry['position'] is not None:
+                row.position_seconds = entry['position']
+            row.time_spent_seconds += entry['elapsed']
+            if entry['completed'] and row.completed_at is None:
+                row.completed_at = entry['last_seen']
+                row.progress_percent = 100
+            row.last_seen_at = entry['last_seen']
+            rows.append(row)
+        LessonProgress.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student', 'lesson'],
+            update_fields=['progress_percent', 'position_seconds', 'time_spent_seconds',
+                           'completed_at', 'last_seen_at'],
+        )
+        refresh_course_progress({
+            (student_id, lesson_courses[lesson_id]) for student_id, lesson_id in pending
+        })
+    return len(rows)
+
+
+def refresh_course_progress(pairs):
+    """
+    Recompute `CourseProgress` for the given (student_id, course_id) pairs with
+    two aggregate queries and one bulk upsert.
+    """
+    if not pairs:
+        return
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+    totals = dict(
+        Lesson.objects.filter(section__unit__course_id__in=course_ids)
+        .values('section__unit__course_id')
+        .annotate(total=Count('id'))
+        .values_list('section__unit__course_id', 'total')
+    )
+    done = {
+        (student_id, course_id): (completed, last_activity)
+        for student_id, course_id, completed, last_activity in LessonProgress.objects.filter(
+            student_id__in=student_ids, lesson__section__unit__course_id__in=course_ids
+        ).values('student_id', 'lesson__section__unit__course_id').annotate(
+            completed=Count('id', filter=Q(completed_at__isnull=False)),
+            last_activity=Max('last_seen_at'),
+        ).values_list('student_id', 'lesson__section__unit__course_id', 'completed', 'last_activity')
+    }
+    summaries = []
+    for student_id, course_id in pairs:
+        completed, last_activity = done.get((student_id, course_id), (0, None))
+        total = totals.get(course_id, 0)
+        summaries.append(CourseProgress(
+            student_id=student_id, course_id=course_id, completed_lessons=completed,
+            total_lessons=total, percent=round(completed / total * 100, 2) if total else 0,
+            last_activity_at=last_activity,
+        ))
+    CourseProgress.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['student', 'course'],
+        update_fields=['completed_lessons', 'total_lessons', 'percent', 'last_activity_at', 'updated_at'],
+    )
+
+
+progress_buffer = ProgressBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        progress_buffer.flush()
+    except Exception:
+        logger.exception("Lesson progress flush at exit failed")
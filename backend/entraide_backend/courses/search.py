@@ -0,0 +1,42 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery
+
+from api.filters import SEARCH_CONFIG
+from .models import Lesson, Section, Question
+
+
+def lesson_search_vector():
+    """
+    Weighted `tsvector` expression for a lesson row:
+    A = title, B = text content, C = section description/about,
+    D = question text of the section's practice.
+
+    Section and question text are pulled in with correlated subqueries so the
+    expression can be used in a single `UPDATE ... SET search_vector = ...`.
+    """
+    section = Section.objects.filter(pk=OuterRef('section_id'))
+    questions = (
+        Question.objects
+        .filter(practice__section_id=OuterRef('section_id'))
+        .values('practice__section_id')
+        .annotate(text=StringAgg('question_text', delimiter=' '))
+        .values('text')
+    )
+    return (
+        SearchVector('title', config=SEARCH_CONFIG, weight='A')
+        + SearchVector('text_content', config=SEARCH_CONFIG, weight='B')
+        + SearchVector(
+            Subquery(section.values('description')[:1]),
+            Subquery(section.values('about')[:1]),
+            config=SEARCH_CONFIG, weight='C'
+        )
+        + SearchVector(Subquery(questions[:1]), config=SEARCH_CONFIG, weight='D')
+    )
+
+
+def update_lesson_search_vectors(lessons=None):
+    """Recompute `search_vector` for the given lessons (default: all) in one UPDATE."""
+    if lessons is None:
+        lessons = Lesson.objects.all()
+    return lessons.update(search_vector=lesson_search_vector())
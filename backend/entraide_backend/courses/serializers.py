@@ -1,23 +1,43 @@
 from rest_framework import serializers
-from .models import Course, Unit, Section, Lesson, Practice, Question, QuestionOption
+from api.mixins import SparseFieldsetSerializerMixin
+from rest_framework.validators import UniqueValidator
+from programs.models import TrainingPrograme
+from .models import (
+    Course, Unit, Section, Lesson, Practice, Question, QuestionOption, PracticeAttempt,
+    LessonProgress, CourseProgress
+)
 
 
-class QuestionOptionSerializer(serializers.ModelSerializer):
+def hides_answers(context):
+    """Students never receive answer keys; they submit attempts for grading instead."""
+    request = context.get('request')
+    return request is not None and getattr(request.user, 'role', None) == 'student'
+
+
+class QuestionOptionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = QuestionOption
         fields = ['id', 'option_text', 'is_correct', 'order', 'created_at', 'updated_at']
 
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        if hides_answers(self.context):
+            representation.pop('is_correct', None)
+        return representation
 
-class QuestionSerializer(serializers.ModelSerializer):
+
+class QuestionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     options = QuestionOptionSerializer(many=True, read_only=True)
     
     class Meta:
         model = Question
         fields = ['id', 'question_text', 'question_type', 'points', 'order', 
-                 'explanation', 'options', 'created_at', 'updated_at']
+                 'explanation', 'options', 'attempt_count', 'correct_count',
+                 'created_at', 'updated_at']
+        read_only_fields = ['attempt_count', 'correct_count']
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = ['id', 'title', 'lesson_type', 'text_content', 'video_url', 
@@ -27,14 +47,67 @@ class LessonSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         # Handle cloudinary PDF file URL
-        if instance.pdf_file and hasattr(instance.pdf_file, 'url'):
+        if 'pdf_file' in representation and instance.pdf_file and hasattr(instance.pdf_file, 'url'):
             representation['pdf_file'] = instance.pdf_file.url
         elif 'pdf_file' in representation:
             representation['pdf_file'] = None
         return representation
 
 
-class PracticeSerializer(serializers.ModelSerializer):
+class PracticeAnswerInputSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    options = serializers.ListField(child=serializers.IntegerField(), required=False)
+    text = serializers.CharField(required=False, allow_blank=True)
+
+
+class PracticeAttemptSubmitSerializer(serializers.Serializer):
+    """`{"answers": [{"question": 1, "options": [3]}, {"question": 2, "text": "..."}]}`"""
+    answers = PracticeAnswerInputSerializer(many=True)
+
+
+class PracticeAttemptSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = PracticeAttempt
+        fields = ['id', 'practice', 'earned_points', 'total_points', 'score', 'created_at']
+
+
+class CourseSearchQuerySerializer(serializers.Serializer):
+    """Query parameters of `GET /api/courses/search/` besides `q`."""
+    course = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class ProgressEventSerializer(serializers.Serializer):
+    EVENT_TYPES = ['open', 'heartbeat', 'complete']
+
+    lesson = serializers.IntegerField()
+    type = serializers.ChoiceField(choices=EVENT_TYPES)
+    progress = serializers.IntegerField(min_value=0, max_value=100, required=False)
+    position = serializers.IntegerField(min_value=0, required=False)
+    elapsed = serializers.IntegerField(min_value=0, required=False, help_text="Seconds since the previous event")
+
+
+class ProgressEventBatchSerializer(serializers.Serializer):
+    events = ProgressEventSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class LessonProgressSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = LessonProgress
+        fields = ['id', 'lesson', 'progress_percent', 'position_seconds', 'time_spent_seconds',
+                  'completed_at', 'first_opened_at', 'last_seen_at']
+
+
+class CourseProgressSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    course_name = serializers.CharField(source='course.name', read_only=True)
+
+    class Meta:
+        model = CourseProgress
+        fields = ['course', 'course_name', 'completed_lessons', 'total_lessons', 'percent',
+                  'last_activity_at', 'updated_at']
+
+
+class PracticeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
     
     class Meta:
@@ -42,7 +115,7 @@ class PracticeSerializer(serializers.ModelSerializer):
         fields = ['id', 'instructions', 'questions', 'created_at', 'updated_at']
 
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     lessons = LessonSerializer(many=True, read_only=True)
     practice = PracticeSerializer(read_only=True)
     
@@ -52,7 +125,7 @@ class SectionSerializer(serializers.ModelSerializer):
                  'created_at', 'updated_at']
 
 
-class UnitSerializer(serializers.ModelSerializer):
+class UnitSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     sections = SectionSerializer(many=True, read_only=True)
     
     class Meta:
@@ -61,18 +134,18 @@ class UnitSerializer(serializers.ModelSerializer):
                  'created_at', 'updated_at']
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     units = UnitSerializer(many=True, read_only=True)
     
     class Meta:
         model = Course
         fields = ['id', 'name', 'description', 'cover_image', 'is_active', 
-                 'order', 'units', 'created_at', 'updated_at']
+                 'order', 'lesson_count', 'total_minutes', 'units', 'created_at', 'updated_at']
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         # Handle cloudinary cover image URL
-        if instance.cover_image and hasattr(instance.cover_image, 'url'):
+        if 'cover_image' in representation and instance.cover_image and hasattr(instance.cover_image, 'url'):
             representation['cover_image'] = instance.cover_image.url
         elif 'cover_image' in representation:
             representation['cover_image'] = None
@@ -80,14 +153,14 @@ class CourseSerializer(serializers.ModelSerializer):
 
 
 # Simplified serializers for list views (without nested data)
-class CourseListSerializer(serializers.ModelSerializer):
+class CourseListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     units_count = serializers.SerializerMethodField()
     program = serializers.PrimaryKeyRelatedField(read_only=True)
     
     class Meta:
         model = Course
         fields = ['id', 'name', 'description', 'cover_image', 'is_active', 
-                 'order', 'units_count', 'created_at', 'updated_at', 'program']
+                 'order', 'units_count', 'lesson_count', 'total_minutes', 'created_at', 'updated_at', 'program']
     
     def get_units_count(self, obj):
         return obj.units.count()
@@ -95,14 +168,14 @@ class CourseListSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         # Handle cloudinary cover image URL
-        if instance.cover_image and hasattr(instance.cover_image, 'url'):
+        if 'cover_image' in representation and instance.cover_image and hasattr(instance.cover_image, 'url'):
             representation['cover_image'] = instance.cover_image.url
         elif 'cover_image' in representation:
             representation['cover_image'] = None
         return representation
 
 
-class UnitListSerializer(serializers.ModelSerializer):
+class UnitListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     course_name = serializers.CharField(source='course.name', read_only=True)
     sections_count = serializers.SerializerMethodField()
     
@@ -115,7 +188,7 @@ class UnitListSerializer(serializers.ModelSerializer):
         return obj.sections.count()
 
 
-class SectionListSerializer(serializers.ModelSerializer):
+class SectionListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     unit_name = serializers.CharField(source='unit.name', read_only=True)
     course_name = serializers.CharField(source='unit.course.name', read_only=True)
     lessons_count = serializers.SerializerMethodField()
@@ -140,6 +213,17 @@ class CourseCreateUpdateSerializer(serializers.ModelSerializer):
         fields = ['name', 'description', 'cover_image', 'is_active', 'order']
 
 
+class CourseCloneSerializer(serializers.Serializer):
+    program = serializers.PrimaryKeyRelatedField(queryset=TrainingPrograme.objects.all())
+    name = serializers.CharField(max_length=255, validators=[UniqueValidator(queryset=Course.objects.all())])
+
+
+class CourseBundleImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    program = serializers.PrimaryKeyRelatedField(queryset=TrainingPrograme.objects.all(), required=False)
+    name = serializers.CharField(max_length=255, required=False)
+
+
 class UnitCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Unit
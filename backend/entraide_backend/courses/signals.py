@@ -0,0 +1,124 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Unit, Lesson, Section, Practice, Question
+from .outline import schedule_outline_rebuild
+from .search import update_lesson_search_vectors
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_lesson_search_vectors(Lesson.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Section)
+def section_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    update_lesson_search_vectors(Lesson.objects.filter(section_id=instance.pk))
+
+
+def _stored_value(instance, field, update_fields):
+    """`field`'s value in the database before this save, or None for new rows and saves that leave it out."""
+    if instance._state.adding or (update_fields is not None and not {field, f'{field}_id'} & update_fields):
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values_list(f'{field}_id', flat=True).first()
+
+
+# Questions and practices moved to another section take their text out of
+# that section's lessons too: their previous parent is read in pre_save.
+
+@receiver(pre_save, sender=Question)
+def question_moving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._previous_practice_id = _stored_value(instance, 'practice', update_fields)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    practice_ids = {instance.practice_id, getattr(instance, '_previous_practice_id', None)} - {None}
+    update_lesson_search_vectors(Lesson.objects.filter(section__practice__id__in=practice_ids))
+
+
+@receiver(pre_save, sender=Practice)
+def practice_moving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._previous_section_id = _stored_value(instance, 'section', update_fields)
+
+
+@receiver(post_save, sender=Practice)
+def practice_saved(sender, instance, raw=False, **kwargs):
+    # Only the questions' text is indexed: nothing changes until the practice moves
+    previous = getattr(instance, '_previous_section_id', None)
+    if not raw and previous not in (None, instance.section_id):
+        update_lesson_search_vectors(Lesson.objects.filter(section_id__in=[previous, instance.section_id]))
+
+
+@receiver(post_delete, sender=Practice)
+def practice_deleted(sender, instance, **kwargs):
+    update_lesson_search_vectors(Lesson.objects.filter(section_id=instance.section_id))
+
+
+# Outline: creating, deleting or moving a unit, section or lesson, or changing
+# a field the outline is built from, rebuilds the course's outline after
+# commit; a move also rebuilds the course it left. Edits that leave those
+# fields alone (titles, text content) do not. On cascade deletes the parent
+# may already be gone; the deleted ancestor's own handler then covers the
+# course.
+
+# Per model: the fields the outline depends on, and the lookup of its course
+OUTLINE_FIELDS = {
+    Unit: (('course', 'order'), 'course_id'),
+    Section: (('unit', 'order'), 'unit__course_id'),
+    Lesson: (('section', 'order', 'duration_minutes'), 'section__unit__course_id'),
+}
+
+
+def _course_id(instance):
+    if isinstance(instance, Unit):
+        return instance.course_id
+    if isinstance(instance, Section):
+        return Unit.objects.filter(pk=instance.unit_id).values_list('course_id', flat=True).first()
+    return Section.objects.filter(pk=instance.section_id).values_list('unit__course_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Unit)
+@receiver(pre_save, sender=Section)
+@receiver(pre_save, sender=Lesson)
+def outline_node_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Record on the instance whether this save changes the outline, and the course it was in."""
+    instance._outline_change = None  # new row: post_save rebuilds its course
+    if raw or instance._state.adding:
+        return
+    fields, course_lookup = OUTLINE_FIELDS[sender]
+    attnames = [sender._meta.get_field(name).attname for name in fields]
+    if update_fields is not None and not (set(fields) | set(attnames)) & update_fields:
+        instance._outline_change = (False, None)
+        return
+    stored = sender.objects.filter(pk=instance.pk).values_list(*attnames, course_lookup).first()
+    if stored is None:
+        return
+    instance._outline_change = (stored[:-1] != tuple(getattr(instance, name) for name in attnames), stored[-1])
+
+
+@receiver(post_save, sender=Unit)
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Lesson)
+def outline_node_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    changed, previous_course_id = getattr(instance, '_outline_change', None) or (True, None)
+    if created or changed:
+        schedule_outline_rebuild(_course_id(instance), previous_course_id)
+
+
+@receiver(post_delete, sender=Unit)
+@receiver(post_delete, sender=Section)
+@receiver(post_delete, sender=Lesson)
+def outline_node_deleted(sender, instance, **kwargs):
+    schedule_outline_rebuild(_course_id(instance))
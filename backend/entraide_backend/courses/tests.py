@@ -1,3 +1,529 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+from programs.models import TrainingPrograme
+from .models import (
+    Course, Unit, Section, Lesson, Practice, Question, QuestionOption, PracticeAnswer, LessonProgress
+)
+from .cloning import clone_course
+from .grading import get_answer_key
+from .progress import progress_buffer
+
+User = get_user_model()
+
+
+class AsyncLessonPdfProxyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='trainer@example.com', password='password', first_name='T', last_name='R', role='trainer'
+        )
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        course = Course.objects.create(name='Photoshop', description='d', program=program)
+        unit = Unit.objects.create(course=course, name='Intro', order=0)
+        section = Section.objects.create(unit=unit, name='Layers', order=0)
+        self.text_lesson = Lesson.objects.create(section=section, title='Read me', lesson_type='text', order=0)
+        self.url = f'/api/courses/lessons/{self.text_lesson.id}/pdf/'
+
+    def test_requires_authentication(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_non_pdf_lesson_returns_404(self):
+        token = AccessToken.for_user(self.user)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 404)
+
+
+class CourseSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='student@example.com', password=None, first_name='S', last_name='T'
+        )
+        self.client.force_authenticate(user=self.user)
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        course = Course.objects.create(name='Photoshop', description='d', program=program)
+        unit = Unit.objects.create(course=course, name='Basics', order=0)
+        self.section = Section.objects.create(unit=unit, name='Layers', order=0, about='Working with masks')
+        self.layers = Lesson.objects.create(
+            section=self.section, title='Layer basics', lesson_type='text', order=0,
+            text_content='A layer holds pixels. Blending modes combine layers.'
+        )
+        self.shortcuts = Lesson.objects.create(
+            section=self.section, title='Shortcuts', lesson_type='text', order=1,
+            text_content='Keyboard shortcuts for every layer tool.'
+        )
+
+    def search(self, q):
+        response = self.client.get('/api/courses/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_ranked_hits_with_snippet_and_path(self):
+        results = self.search('layer')
+        self.assertEqual([hit['id'] for hit in results], [self.layers.id, self.shortcuts.id])
+        self.assertIn('<mark>', results[0]['snippet'])
+        self.assertEqual(results[0]['path']['course']['name'], 'Photoshop')
+        self.assertEqual(results[0]['path']['section']['id'], self.section.id)
+
+    def test_vector_follows_section_and_question_changes(self):
+        self.assertEqual(self.search('gradient'), [])
+        practice = Practice.objects.create(section=self.section)
+        Question.objects.create(practice=practice, question_text='Which tool draws a gradient?')
+        self.assertEqual(len(self.search('gradient')), 2)
+
+        self.section.about = 'Clipping paths'
+        self.section.save()
+        self.assertEqual(len(self.search('clipping')), 2)
+        self.assertEqual(self.search('masks'), [])
+
+    def test_vector_follows_questions_and_practices_that_move(self):
+        other = Section.objects.create(unit=self.section.unit, name='Type', order=1)
+        Lesson.objects.create(section=other, title='Text tool', lesson_type='text', order=0)
+        practice = Practice.objects.create(section=self.section)
+        question = Question.objects.create(practice=practice, question_text='Which tool draws a gradient?')
+        other_practice = Practice.objects.create(section=other)
+
+        question.practice = other_practice
+        question.save()
+        self.assertEqual([hit['title'] for hit in self.search('gradient')], ['Text tool'])
+
+        question.practice = practice
+        question.save()
+        other_practice.delete()
+        practice.section = other
+        practice.save()
+        self.assertEqual([hit['title'] for hit in self.search('gradient')], ['Text tool'])
+        practice.delete()
+        self.assertEqual(self.search('gradient'), [])
+
+    def test_invalid_limit_and_course_are_rejected(self):
+        for params in ({'limit': -5}, {'limit': 0}, {'limit': 101}, {'limit': 'x'}, {'course': 'abc'}):
+            response = self.client.get('/api/courses/search/', {'q': 'layer', **params})
+            self.assertEqual(response.status_code, 400, params)
+        response = self.client.get('/api/courses/search/', {'q': 'layer', 'limit': 1, 'course': ''})
+        self.assertEqual([hit['id'] for hit in response.data['results']], [self.layers.id])
+
+
+class PracticeAttemptTests(APITestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email='student@example.com', password=None, first_name='S', last_name='T', role='student'
+        )
+        self.client.force_authenticate(user=self.student)
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        course = Course.objects.create(name='Photoshop', description='d', program=program)
+        unit = Unit.objects.create(course=course, name='Basics', order=0)
+        section = Section.objects.create(unit=unit, name='Layers', order=0)
+        self.practice = Practice.objects.create(section=section)
+        self.mcq = Question.objects.create(practice=self.practice, question_text='Shortcut?', points=2, order=0)
+        self.right = QuestionOption.objects.create(question=self.mcq, option_text='Ctrl+J', is_correct=True, order=0)
+        self.wrong = QuestionOption.objects.create(question=self.mcq, option_text='Ctrl+K', order=1)
+        self.short = Question.objects.create(
+            practice=self.practice, question_text='Tool name?', question_type='short_answer', order=1
+        )
+        QuestionOption.objects.create(question=self.short, option_text='Magic Wand', is_correct=True, order=0)
+        self.url = f'/api/courses/practice/{self.practice.id}/'
+
+    def submit(self, answers):
+        return self.client.post(self.url + 'submit/', {'answers': answers}, format='json')
+
+    def test_students_do_not_receive_the_answer_key(self):
+        response = self.client.get(self.url + 'questions/')
+        self.assertNotIn('is_correct', response.data[0]['options'][0])
+        response = self.client.get('/api/courses/question-options/', {'is_correct': 'true'})
+        self.assertEqual(response.data['count'], 3)
+
+    def test_attempt_is_graded_stored_and_counted(self):
+        response = self.submit([
+            {'question': self.mcq.id, 'options': [self.right.id]},
+            {'question': self.short.id, 'text': '  magic   wand '},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['score'], 100)
+
+        response = self.submit([{'question': self.mcq.id, 'options': [self.wrong.id]}])
+        self.assertEqual((response.data['earned_points'], response.data['total_points']), (0, 3))
+        self.assertEqual(response.data['results'][0]['correct_options'], [self.right.id])
+        self.assertEqual(PracticeAnswer.objects.count(), 4)
+
+        self.mcq.refresh_from_db()
+        self.assertEqual((self.mcq.attempt_count, self.mcq.correct_count), (2, 1))
+        self.assertEqual(self.mcq.correctness_rate, 0.5)
+
+    def test_answer_key_cache_follows_edits(self):
+        self.assertIs(get_answer_key(self.practice.id), get_answer_key(self.practice.id))
+        self.wrong.is_correct = True
+        self.wrong.save()
+        self.assertEqual(get_answer_key(self.practice.id)[self.mcq.id]['options'], {self.right.id, self.wrong.id})
+
+
+@override_settings(LESSON_PROGRESS_BUFFER={'FLUSH_INTERVAL': 0, 'MAX_PENDING': 1000})
+class LessonProgressTests(APITestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email='student@example.com', password=None, first_name='S', last_name='T', role='student'
+        )
+        self.client.force_authenticate(user=self.student)
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        self.course = Course.objects.create(name='Photoshop', description='d', program=program)
+        unit = Unit.objects.create(course=self.course, name='Basics', order=0)
+        section = Section.objects.create(unit=unit, name='Layers', order=0)
+        self.video, self.text, _, _ = [
+            Lesson.objects.create(section=section, title=f'L{i}', lesson_type='text', order=i) for i in range(4)
+        ]
+
+    def post(self, events):
+        return self.client.post('/api/courses/progress/events/', {'events': events}, format='json')
+
+    def test_events_are_coalesced_into_one_row_per_lesson(self):
+        with override_settings(LESSON_PROGRESS_BUFFER={'FLUSH_INTERVAL': 3600, 'MAX_PENDING': 1000}):
+            for position in (10, 20, 30):
+                response = self.post([{'lesson': self.video.id, 'type': 'heartbeat', 'progress': position,
+                                       'position': position, 'elapsed': 10}])
+                self.assertEqual(response.status_code, 202)
+            self.assertFalse(LessonProgress.objects.exists())
+        self.assertEqual(progress_buffer.flush(), 1)
+
+        row = LessonProgress.objects.get()
+        self.assertEqual((row.progress_percent, row.position_seconds, row.time_spent_seconds), (30, 30, 30))
+
+    def test_course_summary_tracks_completed_lessons(self):
+        self.post([
+            {'lesson': self.video.id, 'type': 'heartbeat', 'progress': 100},
+            {'lesson': self.text.id, 'type': 'complete'},
+            {'lesson': 999999, 'type': 'open'},
+        ])
+        self.post([{'lesson': self.video.id, 'type': 'heartbeat', 'progress': 10}])
+
+        self.assertEqual(LessonProgress.objects.filter(completed_at__isnull=False).count(), 2)
+        response = self.client.get('/api/courses/progress/courses/')
+        self.assertEqual(response.data[0]['course'], self.course.id)
+        self.assertEqual((response.data[0]['completed_lessons'], response.data[0]['percent']), (2, 50.0))
+
+    @override_settings(LESSON_PROGRESS_BUFFER={'FLUSH_INTERVAL': 0, 'MAX_PENDING': 1000})
+    def test_failed_flush_keeps_events_and_merges_newer_ones(self):
+        progress_buffer.pending.clear()
+        with mock.patch('courses.progress.flush_progress', side_effect=OperationalError), \
+                self.assertLogs('courses.progress', 'ERROR'):
+            response = self.post([{'lesson': self.video.id, 'type': 'heartbeat', 'progress': 40,
+                                   'position': 40, 'elapsed': 10}])
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(LessonProgress.objects.exists())
+
+        def fail_while_an_event_arrives(pending):
+            now = timezone.now()
+            with progress_buffer.lock:
+                progress_buffer._merge((self.student.id, self.video.id), {
+                    'progress': 20, 'position': 50, 'elapsed': 5, 'completed': False,
+                    'first_seen': now, 'last_seen': now,
+                })
+            raise OperationalError
+
+        with mock.patch('courses.progress.flush_progress', side_effect=fail_while_an_event_arrives):
+            with self.assertRaises(OperationalError):
+                progress_buffer.flush()
+        self.assertEqual(progress_buffer.flush(), 1)
+        row = LessonProgress.objects.get()
+        self.assertEqual((row.progress_percent, row.position_seconds, row.time_spent_seconds), (40, 50, 15))
+
+
+class CourseOutlineTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='student@example.com', password=None, first_name='S', last_name='T', role='student'
+        ))
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(name='Photoshop', description='d', program=program)
+            # Created out of order on purpose: the outline follows the `order` fields
+            second_unit = Unit.objects.create(course=self.course, name='Advanced', order=1)
+            first_unit = Unit.objects.create(course=self.course, name='Basics', order=0)
+            self.later = Lesson.objects.create(
+                section=Section.objects.create(unit=second_unit, name='Masks', order=0),
+                title='Masks', lesson_type='text', order=0, duration_minutes=30
+            )
+            section = Section.objects.create(unit=first_unit, name='Layers', order=0)
+            self.second = Lesson.objects.create(section=section, title='Blending', lesson_type='text', order=1,
+                                                duration_minutes=20)
+            self.first = Lesson.objects.create(section=section, title='Intro', lesson_type='text', order=0,
+                                               duration_minutes=10)
+
+    def test_navigation_from_outline_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/courses/lessons/{self.second.id}/navigation/')
+        self.assertEqual(response.data['previous']['id'], self.first.id)
+        self.assertEqual(response.data['next']['id'], self.later.id)
+        self.assertEqual(response.data['position']['cumulative_minutes'], 30)
+        self.assertEqual(response.data['position']['percent_by_time'], 50.0)
+
+    def test_outline_is_rebuilt_when_the_tree_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+        response = self.client.get(f'/api/courses/courses/{self.course.id}/outline/')
+        self.assertEqual([entry['lesson'] for entry in response.data], [self.second.id, self.later.id])
+        self.assertEqual(response.data[-1]['cumulative_minutes'], 50)
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.lesson_count, self.course.total_minutes), (2, 50))
+
+    def outline(self, course):
+        return [entry['lesson'] for entry in self.client.get(f'/api/courses/courses/{course.id}/outline/').data]
+
+    def test_moving_a_lesson_rebuilds_both_courses(self):
+        other = Course.objects.create(name='Illustrator', description='d', program=self.course.program)
+        with self.captureOnCommitCallbacks(execute=True):
+            unit = Unit.objects.create(course=other, name='Basics', order=0)
+            section = Section.objects.create(unit=unit, name='Paths', order=0)
+            Lesson.objects.create(section=section, title='Pen', lesson_type='text', order=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.section = section
+            self.first.order = 1
+            self.first.save()
+        self.assertEqual(self.outline(self.course), [self.second.id, self.later.id])
+        self.assertEqual(self.outline(other)[1:], [self.first.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unit.course = self.course
+            unit.order = 2
+            unit.save()
+        self.assertEqual(self.outline(other), [])
+        self.assertEqual(len(self.outline(self.course)), 4)
+
+    def test_each_course_is_rebuilt_once_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for order, lesson in enumerate((self.later, self.second, self.first)):
+                lesson.order = order + 5
+                lesson.save()
+            Unit.objects.filter(course=self.course).delete()
+        self.assertEqual(len(callbacks), 1)
+        with CaptureQueriesContext(connection) as queries:
+            callbacks[0]()
+        self.assertEqual(len([q for q in queries if q['sql'].endswith('FOR UPDATE')]), 1)
+        self.assertEqual(self.outline(self.course), [])
+
+    def test_only_tree_changes_rebuild_the_outline(self):
+        self.first.title = 'Introduction'
+        self.first.text_content = 'Welcome'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.first.save()
+        self.assertEqual(callbacks, [])
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            self.first.save(update_fields=['title'])
+        self.assertEqual(callbacks, [])
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT')])  # not even the pre_save read
+
+        self.first.duration_minutes = 15
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.first.save()
+        self.assertEqual(len(callbacks), 1)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.total_minutes, 65)
+
+    def test_non_numeric_ids_are_not_found(self):
+        self.assertEqual(self.client.get('/api/courses/courses/abc/outline/').status_code, 404)
+        self.assertEqual(self.client.get('/api/courses/lessons/abc/navigation/').status_code, 404)
+
+
+class ReorderTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='trainer@example.com', password=None, first_name='T', last_name='R', role='trainer'
+        ))
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(name='Photoshop', description='d', program=program)
+            unit = Unit.objects.create(course=self.course, name='Basics', order=0)
+            self.section = Section.objects.create(unit=unit, name='Layers', order=0)
+            self.lessons = [
+                Lesson.objects.create(section=self.section, title=f'L{i}', lesson_type='text', order=i)
+                for i in range(5)
+            ]
+
+    def test_permutation_is_applied_in_one_update(self):
+        new_order = [lesson.id for lesson in reversed(self.lessons)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/courses/lessons/reorder/', {'parent': self.section.id, 'ids': new_order}, format='json'
+            )
+        self.assertEqual(response.data, {'reordered': 5})
+        self.assertEqual(list(self.section.lessons.order_by('order').values_list('id', flat=True)), new_order)
+        outline = self.client.get(f'/api/courses/courses/{self.course.id}/outline/').data
+        self.assertEqual([entry['lesson'] for entry in outline], new_order)
+
+    def test_ids_must_cover_every_child(self):
+        response = self.client.post(
+            '/api/courses/lessons/reorder/',
+            {'parent': self.section.id, 'ids': [lesson.id for lesson in self.lessons[:4]]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing'], [self.lessons[4].id])
+
+
+
+class CourseCloneTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='admin@example.com', password=None, first_name='A', last_name='D', role='admin'
+        ))
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        self.target = TrainingPrograme.objects.create(name='Web design', description='d', duration_years=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(name='Photoshop', description='d', program=program)
+            unit = Unit.objects.create(course=self.course, name='Basics', order=0)
+            section = Section.objects.create(unit=unit, name='Layers', order=0)
+            for order in range(2):
+                Lesson.objects.create(section=section, title=f'Blending {order}', lesson_type='text', order=order,
+                                      duration_minutes=15)
+            question = Question.objects.create(
+                practice=Practice.objects.create(section=section), question_text='Which mode darkens?',
+                attempt_count=4, correct_count=1
+            )
+            QuestionOption.objects.create(question=question, option_text='Multiply', is_correct=True, order=0)
+            QuestionOption.objects.create(question=question, option_text='Screen', order=1)
+
+    def test_clone_copies_the_whole_tree(self):
+        response = self.client.post(
+            f'/api/courses/courses/{self.course.id}/clone/',
+            {'program': self.target.id, 'name': 'Photoshop (web)'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['copied'], {
+            'units': 1, 'sections': 1, 'lessons': 2, 'practices': 1, 'questions': 1, 'options': 2
+        })
+        clone = Course.objects.get(pk=response.data['course']['id'])
+        self.assertEqual(clone.program, self.target)
+        self.assertEqual((clone.lesson_count, clone.total_minutes), (2, 30))
+
+        question = Question.objects.get(practice__section__unit__course=clone)
+        self.assertEqual((question.attempt_count, question.correct_count), (0, 0))
+        self.assertEqual(list(question.options.values_list('option_text', 'is_correct')),
+                         [('Multiply', True), ('Screen', False)])
+        self.assertTrue(Lesson.objects.filter(section__unit__course=clone, search_vector__isnull=False).exists())
+        self.assertEqual(Lesson.objects.filter(section__unit__course=self.course).count(), 2)
+
+    def test_cloudinary_files_are_shared(self):
+        Course.objects.filter(pk=self.course.pk).update(cover_image='image/upload/v1/covers/ps.png')
+        Lesson.objects.filter(section__unit__course=self.course).update(pdf_file='raw/upload/v1/docs/blend.pdf')
+        self.course.refresh_from_db()
+        clone, _ = clone_course(self.course, self.target, 'Photoshop (web)')
+        self.assertEqual(clone.cover_image.get_prep_value(), self.course.cover_image.get_prep_value())
+        self.assertEqual(
+            {lesson.pdf_file.public_id for lesson in Lesson.objects.filter(section__unit__course=clone)},
+            {'docs/blend'}
+        )
+
+    def test_name_must_be_unique(self):
+        response = self.client.post(
+            f'/api/courses/courses/{self.course.id}/clone/',
+            {'program': self.target.id, 'name': 'Photoshop'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class CourseBundleTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='admin@example.com', password=None, first_name='A', last_name='D', role='admin'
+        ))
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        self.target = TrainingPrograme.objects.create(name='Web design', description='d', duration_years=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(name='Photoshop', description='d', program=program)
+            unit = Unit.objects.create(course=self.course, name='Basics', order=0)
+            section = Section.objects.create(unit=unit, name='Layers', order=0)
+            Lesson.objects.create(section=section, title='Blending modes', lesson_type='text', order=0,
+                                  duration_minutes=15)
+            question = Question.objects.create(practice=Practice.objects.create(section=section),
+                                               question_text='Which mode darkens?')
+            QuestionOption.objects.create(question=question, option_text='Multiply', is_correct=True, order=0)
+            QuestionOption.objects.create(question=question, option_text='Screen', order=1)
+
+    def export(self):
+        response = self.client.get(f'/api/courses/courses/{self.course.id}/export/')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        return b''.join(response.streaming_content)
+
+    def upload(self, archive, **data):
+        return self.client.post('/api/courses/courses/import/', {
+            'file': SimpleUploadedFile('course.jsonl.gz', archive), 'program': self.target.id, **data
+        }, format='multipart')
+
+    def test_round_trip_is_idempotent(self):
+        archive = self.export()
+        response = self.upload(archive, name='Photoshop (web)')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported'], {
+            'course': 1, 'unit': 1, 'section': 1, 'lesson': 1, 'practice': 1, 'question': 1, 'option': 2
+        })
+        course = Course.objects.get(pk=response.data['course']['id'])
+        self.assertEqual((course.program, course.lesson_count, course.total_minutes), (self.target, 1, 15))
+        self.assertEqual(
+            list(QuestionOption.objects.filter(question__practice__section__unit__course=course)
+                 .values_list('option_text', 'is_correct')),
+            [('Multiply', True), ('Screen', False)]
+        )
+        self.assertTrue(Lesson.objects.filter(search_vector__isnull=False, section__unit__course=course).exists())
+
+        # Same content again (a fresh export has the same hash): nothing is written
+        response = self.upload(self.export(), name='Photoshop (again)')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['course']['id'], course.id)
+        self.assertEqual(Course.objects.count(), 2)
+
+    def test_concurrent_import_of_the_same_bundle_returns_the_first_course(self):
+        archive = self.export()
+        first = self.upload(archive, name='Photoshop (web)').data['course']['id']
+        filter_courses = Course.objects.filter
+        lookups = []
+
+        def miss_the_first_lookup(*args, **kwargs):
+            # The other import has not committed yet when this one checks
+            lookups.append(kwargs)
+            return Course.objects.none() if len(lookups) == 1 else filter_courses(*args, **kwargs)
+
+        with mock.patch.object(Course.objects, 'filter', side_effect=miss_the_first_lookup):
+            response = self.upload(archive, name='Photoshop (again)')
+        self.assertEqual((response.status_code, response.data['course']['id']), (200, first))
+        self.assertEqual(Course.objects.count(), 2)
+
+    def test_tampered_archive_is_rejected(self):
+        lines = gzip.decompress(self.export()).replace(b'Multiply', b'Overlay')
+        response = self.upload(gzip.compress(lines), name='Photoshop (web)')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Course.objects.count(), 1)
+
+    def rehashed(self, edit):
+        """An archive whose node lines went through `edit`, with a matching hash: it passes the hash check."""
+        lines = gzip.decompress(self.export()).splitlines(keepends=True)
+        nodes = edit([json.loads(line) for line in lines[1:-1]])
+        body = [line if isinstance(line, bytes) else json.dumps(line).encode() + b'\n' for line in nodes]
+        trailer = json.loads(lines[-1])
+        trailer['sha256'] = hashlib.sha256(b''.join(body)).hexdigest()
+        return gzip.compress(b''.join([lines[0], *body, json.dumps(trailer).encode() + b'\n']))
+
+    def test_malformed_records_are_rejected(self):
+        def without_fields(nodes):
+            del nodes[1]['fields']
+            return nodes
+
+        def duplicate_unit_order(nodes):
+            return [nodes[0], nodes[1], {**nodes[1], 'ref': 2}, *nodes[2:]]
+
+        def bad_value(nodes):
+            nodes[1]['fields']['order'] = 'first'
+            return nodes
+
+        edits = [without_fields, lambda nodes: [nodes[0], b'[1, 2]\n', *nodes[1:]], duplicate_unit_order, bad_value]
+        for edit in edits:
+            response = self.upload(self.rehashed(edit), name='Photoshop (web)')
+            self.assertEqual(response.status_code, 400, response.data)
+        self.assertEqual(Course.objects.count(), 1)
@@ -7,8 +7,11 @@ from .views import (
     LessonViewSet,
     PracticeViewSet,
     QuestionViewSet,
-    QuestionOptionViewSet
+    QuestionOptionViewSet,
+    CourseSearchViewSet,
+    LessonProgressViewSet
 )
+from .async_views import lesson_pdf_proxy
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet, basename='course')
@@ -18,7 +21,10 @@ router.register(r'lessons', LessonViewSet, basename='lesson')
 router.register(r'practice', PracticeViewSet, basename='practice')
 router.register(r'questions', QuestionViewSet, basename='question')
 router.register(r'question-options', QuestionOptionViewSet, basename='questionoption')
+router.register(r'search', CourseSearchViewSet, basename='course-search')
+router.register(r'progress', LessonProgressViewSet, basename='lesson-progress')
 
 urlpatterns = [
+    path('lessons/<int:pk>/pdf/', lesson_pdf_proxy, name='lesson-pdf-async'),
     path('', include(router.urls)),
 ] 
\ No newline at end of file
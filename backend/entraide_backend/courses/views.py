@@ -1,25 +1,42 @@
 from django.shortcuts import render
-from django.http import HttpResponse, Http404
-from rest_framework import viewsets, filters
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.contrib.postgres.search import SearchHeadline, SearchRank
+from django.db.models import F
+from rest_framework import viewsets, filters, permissions, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-import requests
 import mimetypes
-from .models import Course, Unit, Section, Lesson, Practice, Question, QuestionOption
+from api.mixins import ReorderMixin, SparseFieldsetViewMixin
+from api.permissions import IsAdminOrCenterSupervisor
+from api.filters import FullTextSearchFilter, prefix_search_query, SEARCH_CONFIG
+from .models import (
+    Course, Unit, Section, Lesson, Practice, Question, QuestionOption, LessonProgress, CourseProgress,
+    CourseOutlineEntry
+)
 from .serializers import (
-    CourseSerializer, CourseListSerializer, CourseCreateUpdateSerializer,
+    CourseSerializer, CourseListSerializer, CourseCreateUpdateSerializer, CourseCloneSerializer,
+    CourseBundleImportSerializer, CourseSearchQuerySerializer,
     UnitSerializer, UnitListSerializer, UnitCreateUpdateSerializer,
     SectionSerializer, SectionListSerializer, SectionCreateUpdateSerializer,
     LessonSerializer, LessonCreateUpdateSerializer,
     PracticeSerializer, PracticeCreateUpdateSerializer,
     QuestionSerializer, QuestionCreateUpdateSerializer,
-    QuestionOptionSerializer, QuestionOptionCreateUpdateSerializer
+    QuestionOptionSerializer, QuestionOptionCreateUpdateSerializer,
+    PracticeAttemptSerializer, PracticeAttemptSubmitSerializer,
+    ProgressEventBatchSerializer, LessonProgressSerializer, CourseProgressSerializer
 )
+from .bundles import export_course_bundle, import_course_bundle, BundleError
+from .cloning import clone_course
+from .grading import submit_attempt
+from .progress import progress_buffer
+from .outline import lesson_neighbourhood, schedule_outline_rebuild
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
+    lookup_value_regex = r'\d+'  # outline/navigation query by pk: a non-numeric one is a 404
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active']
     search_fields = ['name', 'description']
@@ -33,22 +50,98 @@ class CourseViewSet(viewsets.ModelViewSet):
             return CourseCreateUpdateSerializer
         return CourseSerializer
 
+    def get_permissions(self):
+        if self.action in ['clone', 'export', 'import_bundle']:
+            self.permission_classes = [IsAdminOrCenterSupervisor]
+        else:
+            self.permission_classes = [permissions.IsAuthenticated]
+        return super().get_permissions()
+
     @action(detail=True, methods=['get'])
     def units(self, request, pk=None):
         """Get all units for a specific course"""
         course = self.get_object()
         units = course.units.all()
-        serializer = UnitSerializer(units, many=True)
+        serializer = UnitSerializer(units, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def outline(self, request, pk=None):
+        """All lessons of the course in reading order, from the precomputed outline"""
+        entries = CourseOutlineEntry.objects.filter(course_id=pk).order_by('sequence').values(
+            'sequence', 'lesson_id', 'lesson__title', 'lesson__lesson_type', 'path',
+            'duration_minutes', 'cumulative_minutes'
+        )
+        return Response([
+            {
+                'sequence': entry['sequence'],
+                'lesson': entry['lesson_id'],
+                'title': entry['lesson__title'],
+                'lesson_type': entry['lesson__lesson_type'],
+                'path': entry['path'],
+                'duration_minutes': entry['duration_minutes'],
+                'cumulative_minutes': entry['cumulative_minutes'],
+            }
+            for entry in entries
+        ])
+
+    @action(detail=True, methods=['post'], serializer_class=CourseCloneSerializer)
+    def clone(self, request, pk=None):
+        """
+        Copy the course and its whole tree into another program, with one bulk
+        insert per level. Cloudinary files are shared, not re-uploaded.
+        """
+        course = self.get_object()
+        serializer = CourseCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clone, counts = clone_course(course, **serializer.validated_data)
+        return Response(
+            {'course': CourseListSerializer(clone, context=self.get_serializer_context()).data, 'copied': counts},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Stream the course tree as a gzip-compressed JSON-lines bundle"""
+        course = self.get_object()
+        response = StreamingHttpResponse(export_course_bundle(course), content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="course-{course.pk}.jsonl.gz"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+            serializer_class=CourseBundleImportSerializer)
+    def import_bundle(self, request):
+        """
+        Import a bundle produced by `export`. Importing the same content
+        twice returns the course created the first time (200 instead of 201).
+        """
+        serializer = CourseBundleImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            course, created, counts = import_course_bundle(
+                data['file'], program=data.get('program'), name=data.get('name')
+            )
+        except BundleError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'course': CourseListSerializer(course, context=self.get_serializer_context()).data,
+             'created': created, 'imported': counts},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(SparseFieldsetViewMixin, ReorderMixin, viewsets.ModelViewSet):
     queryset = Unit.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['course']
     search_fields = ['name', 'description']
     ordering_fields = ['order', 'name', 'created_at']
     ordering = ['order', 'name']
+    reorder_parent_field = 'course'
+
+    def after_reorder(self, parent_id):
+        schedule_outline_rebuild(parent_id)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -62,17 +155,21 @@ class UnitViewSet(viewsets.ModelViewSet):
         """Get all sections for a specific unit"""
         unit = self.get_object()
         sections = unit.sections.all()
-        serializer = SectionSerializer(sections, many=True)
+        serializer = SectionSerializer(sections, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(SparseFieldsetViewMixin, ReorderMixin, viewsets.ModelViewSet):
     queryset = Section.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['unit', 'unit__course']
     search_fields = ['name', 'description', 'about']
     ordering_fields = ['order', 'name', 'created_at']
     ordering = ['order', 'name']
+    reorder_parent_field = 'unit'
+
+    def after_reorder(self, parent_id):
+        schedule_outline_rebuild(Unit.objects.filter(pk=parent_id).values_list('course_id', flat=True).first())
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -86,26 +183,70 @@ class SectionViewSet(viewsets.ModelViewSet):
         """Get all lessons for a specific section"""
         section = self.get_object()
         lessons = section.lessons.all()
-        serializer = LessonSerializer(lessons, many=True)
+        serializer = LessonSerializer(lessons, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(SparseFieldsetViewMixin, ReorderMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.all()
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    lookup_value_regex = r'\d+'  # outline/navigation query by pk: a non-numeric one is a 404
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['section', 'lesson_type', 'section__unit', 'section__unit__course']
     search_fields = ['title', 'text_content']
     ordering_fields = ['order', 'title', 'created_at', 'duration_minutes']
     ordering = ['order', 'title']
+    reorder_parent_field = 'section'
+
+    def after_reorder(self, parent_id):
+        schedule_outline_rebuild(
+            Section.objects.filter(pk=parent_id).values_list('unit__course_id', flat=True).first()
+        )
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return LessonCreateUpdateSerializer
         return LessonSerializer
 
+    @action(detail=True, methods=['get'])
+    def navigation(self, request, pk=None):
+        """
+        Previous/next lesson and position in the course, resolved with one
+        query on the precomputed course outline.
+        """
+        entries = lesson_neighbourhood(pk)
+        current = next((entry for entry in entries if str(entry.lesson_id) == str(pk)), None)
+        if current is None:
+            raise Http404("Lesson not found in any course outline")
+
+        def describe(entry):
+            if entry is None:
+                return None
+            return {'id': entry.lesson_id, 'title': entry.lesson.title, 'sequence': entry.sequence, 'path': entry.path}
+
+        by_sequence = {entry.sequence: entry for entry in entries}
+        course = current.course
+        return Response({
+            'lesson': describe(current),
+            'previous': describe(by_sequence.get(current.sequence - 1)),
+            'next': describe(by_sequence.get(current.sequence + 1)),
+            'course': {'id': course.id, 'name': course.name, 'lesson_count': course.lesson_count,
+                       'total_minutes': course.total_minutes},
+            'position': {
+                'sequence': current.sequence,
+                'cumulative_minutes': current.cumulative_minutes,
+                'percent_by_lessons': round(current.sequence / course.lesson_count * 100, 2),
+                'percent_by_time': (
+                    round(current.cumulative_minutes / course.total_minutes * 100, 2)
+                    if course.total_minutes else None
+                ),
+            },
+        })
+
     @action(detail=True, methods=['get'])
     def pdf_proxy(self, request, pk=None):
         """Proxy PDF files to handle authentication and CORS issues"""
+        import requests  # only needed here; keeps it out of worker startup
+
         lesson = self.get_object()
         
         if lesson.lesson_type != 'pdf' or not lesson.pdf_file:
@@ -135,7 +276,107 @@ class LessonViewSet(viewsets.ModelViewSet):
             raise Http404(f"Could not fetch PDF file: {str(e)}")
 
 
-class PracticeViewSet(viewsets.ModelViewSet):
+class CourseSearchViewSet(viewsets.GenericViewSet):
+    """
+    Full-text search over lesson content.
+
+    `GET /api/courses/search/?q=<terms>` returns lessons ranked by relevance,
+    each with highlighted title/content snippets and its course -> unit ->
+    section path, in a single query. Optional params: `course` (course id)
+    and `limit` (default 20, max 100).
+    """
+    queryset = Lesson.objects.all()
+    headline_options = {
+        'config': SEARCH_CONFIG,
+        'start_sel': '<mark>',
+        'stop_sel': '</mark>',
+    }
+
+    def list(self, request):
+        terms = request.query_params.get('q', '').replace(',', ' ').split()
+        if not terms:
+            return Response({'error': 'q is required'}, status=400)
+        params = CourseSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        limit = params.validated_data['limit']
+
+        query = prefix_search_query(terms)
+        queryset = self.get_queryset().filter(search_vector=query)
+        course_id = params.validated_data.get('course')
+        if course_id:
+            queryset = queryset.filter(section__unit__course_id=course_id)
+
+        # ts_headline is only evaluated for the rows that survive ORDER BY ... LIMIT
+        hits = queryset.annotate(
+            rank=SearchRank(F('search_vector'), query),
+            title_highlight=SearchHeadline('title', query, highlight_all=True, **self.headline_options),
+            snippet=SearchHeadline(
+                'text_content', query, max_fragments=2, max_words=20, min_words=8,
+                fragment_delimiter=' ... ', **self.headline_options
+            ),
+        ).order_by('-rank', 'id').values(
+            'id', 'title', 'lesson_type', 'rank', 'title_highlight', 'snippet',
+            'section_id', 'section__name',
+            'section__unit_id', 'section__unit__name',
+            'section__unit__course_id', 'section__unit__course__name',
+        )[:limit]
+
+        results = [
+            {
+                'id': hit['id'],
+                'title': hit['title'],
+                'lesson_type': hit['lesson_type'],
+                'rank': hit['rank'],
+                'title_highlight': hit['title_highlight'],
+                'snippet': hit['snippet'],
+                'path': {
+                    'course': {'id': hit['section__unit__course_id'], 'name': hit['section__unit__course__name']},
+                    'unit': {'id': hit['section__unit_id'], 'name': hit['section__unit__name']},
+                    'section': {'id': hit['section_id'], 'name': hit['section__name']},
+                },
+            }
+            for hit in hits
+        ]
+        return Response({'query': ' '.join(terms), 'results': results})
+
+
+class LessonProgressViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    The current user's lesson progress.
+
+    Progress is written from batched client events (`events` action), which
+    are buffered in process and flushed in bulk every few seconds, so reads
+    may lag the latest events by up to one flush interval.
+    """
+    serializer_class = LessonProgressSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['lesson', 'lesson__section', 'lesson__section__unit__course']
+
+    def get_queryset(self):
+        return LessonProgress.objects.filter(student=self.request.user).order_by('lesson_id')
+
+    @action(detail=False, methods=['post'], serializer_class=ProgressEventBatchSerializer)
+    def events(self, request):
+        """
+        Ingest a batch of progress events:
+        `{"events": [{"lesson": 5, "type": "heartbeat", "progress": 40, "position": 312, "elapsed": 15}]}`.
+        `type` is `open`, `heartbeat` or `complete`; a lesson is complete on a
+        `complete` event or at 100% progress.
+        """
+        serializer = ProgressEventBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        progress_buffer.add(request.user.id, serializer.validated_data['events'])
+        return Response({'accepted': len(serializer.validated_data['events'])}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def courses(self, request):
+        """Precomputed completion summary per course for the current user"""
+        summaries = CourseProgress.objects.filter(student=request.user).select_related('course').order_by('course_id')
+        serializer = CourseProgressSerializer(summaries, many=True)
+        return Response(serializer.data)
+
+
+class PracticeViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Practice.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['section', 'section__unit', 'section__unit__course']
@@ -151,17 +392,62 @@ class PracticeViewSet(viewsets.ModelViewSet):
         """Get all questions for a specific practice"""
         practice = self.get_object()
         questions = practice.questions.all()
-        serializer = QuestionSerializer(questions, many=True)
+        serializer = QuestionSerializer(questions, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'], serializer_class=PracticeAttemptSubmitSerializer)
+    def submit(self, request, pk=None):
+        """
+        Grade a whole practice attempt server-side and store it.
+
+        Body: `{"answers": [{"question": 1, "options": [3]}, {"question": 2, "text": "..."}]}`.
+        Choice questions take option ids, short answers take text; questions
+        left out count as wrong. The response holds the score and, per
+        question, whether it was right, the correct option ids and the
+        explanation.
+        """
+        practice = self.get_object()
+        serializer = PracticeAttemptSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        answers = {item['question']: item for item in serializer.validated_data['answers']}
+        try:
+            attempt, key = submit_attempt(request.user, practice, answers)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        explanations = dict(practice.questions.values_list('id', 'explanation'))
+        results = [
+            {
+                'question': answer.question_id,
+                'is_correct': answer.is_correct,
+                'points': answer.points,
+                'correct_options': sorted(key[answer.question_id]['options']),
+                'explanation': explanations.get(answer.question_id, ''),
+            }
+            for answer in attempt.answers.all()
+        ]
+        return Response(
+            {**PracticeAttemptSerializer(attempt).data, 'results': results},
+            status=status.HTTP_201_CREATED
+        )
 
-class QuestionViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def attempts(self, request, pk=None):
+        """The current user's attempts at this practice, newest first"""
+        practice = self.get_object()
+        attempts = practice.attempts.filter(student=request.user)
+        serializer = PracticeAttemptSerializer(attempts, many=True)
+        return Response(serializer.data)
+
+
+class QuestionViewSet(SparseFieldsetViewMixin, ReorderMixin, viewsets.ModelViewSet):
     queryset = Question.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['practice', 'question_type', 'practice__section', 'practice__section__unit', 'practice__section__unit__course']
     search_fields = ['question_text', 'explanation']
     ordering_fields = ['order', 'points', 'created_at']
     ordering = ['order']
+    reorder_parent_field = 'practice'
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -173,17 +459,25 @@ class QuestionViewSet(viewsets.ModelViewSet):
         """Get all options for a specific question"""
         question = self.get_object()
         options = question.options.all()
-        serializer = QuestionOptionSerializer(options, many=True)
+        serializer = QuestionOptionSerializer(options, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
 
-class QuestionOptionViewSet(viewsets.ModelViewSet):
+class QuestionOptionViewSet(SparseFieldsetViewMixin, ReorderMixin, viewsets.ModelViewSet):
     queryset = QuestionOption.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['question', 'is_correct']
     search_fields = ['option_text']
     ordering_fields = ['order', 'created_at']
     ordering = ['order']
+    reorder_parent_field = 'question'
+
+    @property
+    def filterset_fields(self):
+        # Filtering on is_correct would leak the answer key to students
+        request = getattr(self, 'request', None)
+        if request is not None and getattr(request.user, 'role', None) == 'student':
+            return ['question']
+        return ['question', 'is_correct']
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'entraide_backend.settings')
+# Connections kept per thread leak under ASGI; use DB_POOL=1 to reuse them here
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -10,10 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.translation import gettext_lazy as _
 
 
@@ -108,21 +110,61 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'entraide_backend.wsgi.application'
 
+# ASGI entry point (e.g. `uvicorn entraide_backend.asgi:application`); lets the async
+# views (PDF proxy, picture upload, CSV export) wait on I/O without pinning a worker.
+ASGI_APPLICATION = 'entraide_backend.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse. By default each worker keeps its connection open for
+# DB_CONN_MAX_AGE seconds and health-checks it before reuse. DB_POOL=1 uses
+# psycopg 3's pool instead (pip install "psycopg[binary,pool]"), which is
+# what to use under ASGI; pooled connections are not also kept per thread.
+DB_POOL = os.getenv('DB_POOL', '').lower() in ('1', 'true', 'yes')
+if DB_POOL and not (importlib.util.find_spec('psycopg') and importlib.util.find_spec('psycopg_pool')):
+    # requirements.txt pins psycopg2, which Django cannot pool
+    raise ImproperlyConfigured('DB_POOL=1 needs psycopg 3 and its pool: pip install "psycopg[binary,pool]"')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Django's PostgreSQL backend plus connection checkout metrics
+        'ENGINE': 'api.backends.postgresql',
         'NAME': os.getenv('DB_NAME', 'entraide_db'),
         'USER': os.getenv('DB_USER', 'postgres'),
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            },
+        } if DB_POOL else {},
     }
 }
 
+# Optional read replica for reporting and analytics reads (api.db_router).
+# Locally, DB_REPLICA_NAME can name a second database on the same server.
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        # Tests read the primary's test database through this alias
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -185,12 +227,21 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ScopedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OptInCursorPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -221,6 +272,10 @@ SIMPLE_JWT = {
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 
     'JTI_CLAIM': 'jti',
+
+    # Access tokens carry role/center/group scope claims (see api.scope)
+    'TOKEN_OBTAIN_SERIALIZER': 'api.tokens.ScopedTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'api.tokens.ScopedTokenRefreshSerializer',
 }
 
 AUTHENTICATION_BACKENDS = [
@@ -262,4 +317,55 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-]
\ No newline at end of file
+]
+# Lesson progress events are coalesced in process and written in bulk
+# (courses.progress). FLUSH_INTERVAL in seconds; 0 writes on every request.
+LESSON_PROGRESS_BUFFER = {
+    'FLUSH_INTERVAL': int(os.getenv('LESSON_PROGRESS_FLUSH_INTERVAL', 5)),
+    'MAX_PENDING': int(os.getenv('LESSON_PROGRESS_MAX_PENDING', 1000)),
+}
+
+# /api/batch/ limits (api.batch). Parallel batches use one database
+# connection per worker thread.
+API_BATCH = {
+    'MAX_REQUESTS': int(os.getenv('API_BATCH_MAX_REQUESTS', 20)),
+    'MAX_WORKERS': int(os.getenv('API_BATCH_MAX_WORKERS', 4)),
+}
+
+# Cache shared by every worker when REDIS_URL is set (pip install redis).
+# Without it each process has its own LocMemCache.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+
+# Authenticated user lookups (api.user_cache), in seconds: a process-local
+# copy (at most LOCAL_MAX_ENTRIES users), then the shared cache, which is
+# skipped while CACHES is process-local. 0 disables a level.
+AUTH_USER_CACHE = {
+    'LOCAL_TTL': int(os.getenv('AUTH_USER_CACHE_LOCAL_TTL', 5)),
+    'LOCAL_MAX_ENTRIES': int(os.getenv('AUTH_USER_CACHE_LOCAL_MAX_ENTRIES', 1000)),
+    'SHARED_TTL': int(os.getenv('AUTH_USER_CACHE_SHARED_TTL', 300)),
+}
+
+# OpenAPI schema (api.schema): built once per code version, from the artifact
+# written at deploy by `manage.py build_api_schema` when it matches. VERSION
+# defaults to a hash of the project's sources.
+API_SCHEMA = {
+    'PATH': os.getenv('API_SCHEMA_PATH', os.path.join(BASE_DIR, 'openapi.json')),
+    'VERSION': os.getenv('API_SCHEMA_VERSION', ''),
+    'MAX_AGE': int(os.getenv('API_SCHEMA_MAX_AGE', 3600)),
+}
+
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'entraide_backend.urls.api_info',
+    'SPEC_URL': 'schema-json',
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
@@ -19,14 +19,14 @@ from django.urls import path, include, re_path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
-from api.views import DecoratedTokenObtainPairView, DecoratedTokenRefreshView
+from api.schema import CachedSchemaGenerator
+from api.views import DecoratedTokenObtainPairView, DecoratedTokenRefreshView, BatchView, MetricsView, schema_json
 
 # Generated by Copilot
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Entraide National API",
-        default_version='v1',
-        description="""
+api_info = openapi.Info(
+    title="Entraide National API",
+    default_version='v1',
+    description="""
 # Entraide National Platform API
 
 ## Overview
@@ -49,13 +49,18 @@ API requests are subject to rate limiting to ensure fair usage.
 - 2: Teacher
 - 3: Admin
 - 4: Staff
-        """,
-        terms_of_service="https://www.entraide-national.ma/terms/",
-        contact=openapi.Contact(email="contact@entraide-national.ma"),
-        license=openapi.License(name="Proprietary License"),
-    ),
+    """,
+    terms_of_service="https://www.entraide-national.ma/terms/",
+    contact=openapi.Contact(email="contact@entraide-national.ma"),
+    license=openapi.License(name="Proprietary License"),
+)
+
+# The schema is introspected once per code version (api.schema), not per request
+schema_view = get_schema_view(
+    api_info,
     public=True,
     permission_classes=(permissions.AllowAny,),
+    generator_class=CachedSchemaGenerator,
 )
 
 urlpatterns = [
@@ -69,13 +74,18 @@ urlpatterns = [
     path('api/courses/', include('courses.urls')),
     path('api/schedule/', include('schedule.urls')),
     path('api/attendance/', include('attendance.urls')),
+    path('api/exams/', include('exams.urls')),
+    path('api/batch/', BatchView.as_view(), name='api_batch'),
+    path('api/metrics/', MetricsView.as_view(), name='api_metrics'),
     
     # Use decorated token views with enhanced documentation
     path('api/token/', DecoratedTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', DecoratedTokenRefreshView.as_view(), name='token_refresh'),
     
     # API documentation
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    # JSON is served prebuilt with ETag/Cache-Control; the UIs load it (SPEC_URL)
+    path('swagger.json', schema_json, name='schema-json'),
+    re_path(r'^swagger(?P<format>\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-yaml'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]
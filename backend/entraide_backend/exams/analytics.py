@@ -0,0 +1,175 @@
+import json
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Question, Submission
+
+ANALYSIS_CACHE_TIMEOUT = 60 * 60 * 24
+DISTRACTOR_TYPES = ('MCQ', 'TF')
+
+
+def _scope(training, exam_type):
+    return Submission.objects.filter(
+        exam__training=training, exam__exam_type=exam_type, points__isnull=False
+    )
+
+
+def load_score_matrix(training, exam_type):
+    """
+    Load every graded submission of a program's exams of one type in one query.
+
+    Returns `(exam_ids, question_ids, scores, mask, answers)`: `scores` is an
+    exams x questions array of the share of the question's points earned,
+    `mask` marks the cells the exam actually contains (exams may be
+    randomized per student), and `answers` holds the raw answers of
+    MCQ/TF questions as `(question_index, answer)` pairs.
+    """
+    rows = list(_scope(training, exam_type).values_list(
+        'exam_id', 'question_id', 'points', 'question__points', 'question__type', 'student_answer'
+    ))
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty((0, 0)), np.empty((0, 0), dtype=bool), []
+
+    exam_col, question_col, points, max_points, types, raw_answers = zip(*rows)
+    exam_ids, exam_index = np.unique(np.array(exam_col), return_inverse=True)
+    question_ids, question_index = np.unique(np.array(question_col), return_inverse=True)
+
+    points = np.array(points, dtype=float)
+    max_points = np.array(max_points, dtype=float)
+    share = np.divide(points, max_points, out=np.zeros_like(points), where=max_points > 0)
+
+    scores = np.zeros((len(exam_ids), len(question_ids)))
+    mask = np.zeros(scores.shape, dtype=bool)
+    scores[exam_index, question_index] = share
+    mask[exam_index, question_index] = True
+
+    answers = [
+        (index, json.dumps(answer) if not isinstance(answer, str) else answer)
+        for index, question_type, answer in zip(question_index, types, raw_answers)
+        if question_type in DISTRACTOR_TYPES
+    ]
+    return exam_ids, question_ids, scores, mask, answers
+
+
+def item_statistics(scores, mask):
+    """
+    Per-question difficulty and discrimination, vectorized over the matrix.
+
+    - difficulty (p-value): mean share of points earned by the exams that
+      contain the question.
+    - discrimination: point-biserial (Pearson) correlation between the item
+      score and the mean score on the exam's other questions.
+
+    Undefined values (no responses, no variance) are NaN.
+    """
+    counts = mask.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        difficulty = scores.sum(axis=0) / counts
+
+        totals = scores.sum(axis=1, keepdims=True)
+        lengths = mask.sum(axis=1, keepdims=True)
+        rest_mask = mask & (lengths > 1)
+        rest = np.where(rest_mask, (totals - scores) / (lengths - 1), 0.0)
+        rest_counts = rest_mask.sum(axis=0)
+
+        item_mean = (scores * rest_mask).sum(axis=0) / rest_counts
+        rest_mean = rest.sum(axis=0) / rest_counts
+        item_dev = np.where(rest_mask, scores - item_mean, 0.0)
+        rest_dev = np.where(rest_mask, rest - rest_mean, 0.0)
+        covariance = (item_dev * rest_dev).sum(axis=0)
+        spread = np.sqrt((item_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0))
+        discrimination = np.where(spread > 0, covariance / spread, np.nan)
+    return counts, difficulty, discrimination
+
+
+def kr20(scores, mask):
+    """
+    KR-20 reliability over the questions every exam contains (Cronbach's
+    alpha when items carry partial credit). None with fewer than two such
+    questions or no variance in total scores.
+    """
+    common = mask.all(axis=0)
+    k = int(common.sum())
+    if k < 2 or scores.shape[0] < 2:
+        return None
+    items = scores[:, common]
+    total_variance = items.sum(axis=1).var()
+    if total_variance == 0:
+        return None
+    return round(float(k / (k - 1) * (1 - items.var(axis=0).sum() / total_variance)), 4)
+
+
+def distractor_frequencies(answers, question_count):
+    """`[{answer: count}]` per question index, most frequent first."""
+    frequencies = [{} for _ in range(question_count)]
+    if not answers:
+        return frequencies
+    question_index, raw = zip(*answers)
+    labels, answer_index = np.unique(np.array(raw, dtype=str), return_inverse=True)
+    pairs, counts = np.unique(
+        np.array(question_index) * len(labels) + answer_index, return_counts=True
+    )
+    for pair, count in sorted(zip(pairs, counts), key=lambda item: -item[1]):
+        index, label = divmod(int(pair), len(labels))
+        frequencies[index][str(labels[label])] = int(count)
+    return frequencies
+
+
+def _nullable(value):
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def analyze_items(training, exam_type, use_cache=True):
+    """
+    Run item analysis for a program's exams of one type and store the
+    per-question results on `exams.Question`.
+
+    Results are cached under the latest submission timestamp (and count) of
+    the scope, so repeated calls are free until an answer is added, regraded
+    or deleted.
+    Returns `{'exams', 'kr20', 'questions': [...]}`.
+    """
+    state = _scope(training, exam_type).aggregate(latest=Max('updated_at'), count=Count('id'))
+    latest = state['latest'].isoformat() if state['latest'] else 'none'
+    training_id = getattr(training, 'pk', training)
+    cache_key = f"exams:item-analysis:{training_id}:{exam_type}:{latest}:{state['count']}"
+    if use_cache:
+        result = cache.get(cache_key)
+        if result is not None:
+            return result
+
+    exam_ids, question_ids, scores, mask, answers = load_score_matrix(training, exam_type)
+    counts, difficulty, discrimination = item_statistics(scores, mask)
+    frequencies = distractor_frequencies(answers, len(question_ids))
+
+    now = timezone.now()
+    questions = Question.objects.only('id', 'type').in_bulk([int(question_id) for question_id in question_ids])
+    results = []
+    for index, question_id in enumerate(question_ids):
+        question = questions[int(question_id)]
+        question.response_count = int(counts[index])
+        question.difficulty = _nullable(difficulty[index])
+        question.discrimination = _nullable(discrimination[index])
+        question.distractor_stats = frequencies[index] or None
+        question.analyzed_at = now
+        results.append({
+            'question': question.pk,
+            'type': question.type,
+            'responses': question.response_count,
+            'difficulty': question.difficulty,
+            'discrimination': question.discrimination,
+            'distractors': question.distractor_stats,
+        })
+    Question.objects.bulk_update(
+        questions.values(),
+        ['response_count', 'difficulty', 'discrimination', 'distractor_stats', 'analyzed_at'],
+        batch_size=500
+    )
+
+    result = {'exams': len(exam_ids), 'kr20': kr20(scores, mask), 'questions': results}
+    cache.set(cache_key, result, ANALYSIS_CACHE_TIMEOUT)
+    return result
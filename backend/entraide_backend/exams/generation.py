@@ -0,0 +1,136 @@
+import random
+from collections import defaultdict
+
+from django.db import transaction
+
+from students.models import Student
+from .models import Exam, Question
+
+GENERATION_BATCH_SIZE = 500
+
+
+class SamplingError(ValueError):
+    """A sampling rule asks for more questions than the pool holds."""
+
+
+def _load_pools(training, weeks, rules):
+    """
+    Candidate question ids per rule, loaded in one query.
+
+    Each rule is a dict with `type`, `count` and an optional `points` value
+    restricting the pool to questions worth exactly that many points.
+    """
+    rows = Question.objects.filter(
+        training=training, week__in=weeks, type__in={rule['type'] for rule in rules}
+    ).order_by('id').values_list('id', 'type', 'points')
+    by_type = defaultdict(list)
+    for question_id, question_type, points in rows:
+        by_type[question_type].append((question_id, points))
+
+    pools = []
+    for rule in rules:
+        points = rule.get('points')
+        pool = [
+            (question_id, question_points) for question_id, question_points in by_type[rule['type']]
+            if points is None or question_points == points
+        ]
+        if len(pool) < rule['count']:
+            raise SamplingError(
+                f"Rule {rule['type']}"
+                f"{'' if points is None else f' ({points} pts)'} needs {rule['count']} questions, "
+                f"only {len(pool)} available"
+            )
+        pools.append((pool, rule['count']))
+    return pools
+
+
+def _sample(pools, rng):
+    """Draw one exam's questions; the same question is never drawn twice."""
+    drawn = {}
+    for pool, count in pools:
+        available = [item for item in pool if item[0] not in drawn]
+        if len(available) < count:
+            raise SamplingError("Overlapping rules leave too few distinct questions")
+        drawn.update(rng.sample(available, count))
+    return drawn
+
+
+def students_in_scope(training, center=None, group=None, academic_year=None, center_ids=None):
+    """
+    User ids of the program's students, optionally narrowed to a
+    center/group/year. `center_ids` limits them to those centers, e.g. the
+    ones a center supervisor supervises.
+    """
+    students = Student.objects.filter(program=training)
+    if center_ids is not None:
+        students = students.filter(center__in=center_ids)
+    if center is not None:
+        students = students.filter(center=center)
+    if group is not None:
+        students = students.filter(group=group)
+    if academic_year:
+        students = students.filter(academic_year=academic_year)
+    return students.order_by('user_id').values_list('user_id', flat=True)
+
+
+def generate_cohort_exams(training, exam_type, weeks, rules, student_ids, randomize=False,
+                          seed=None, skip_existing=True, batch_size=GENERATION_BATCH_SIZE):
+    """
+    Create one `Exam` of `exam_type` per student with questions sampled from `weeks`.
+
+    Without `randomize` every student gets the same draw. With it each
+    student gets their own draw from `Random(f"{seed}:{student_id}")`, so a
+    given seed always reproduces the same exams. Students who already have an
+    exam of this type for the program are skipped unless `skip_existing` is
+    False.
+
+    Exams and `Exam.questions` through rows are inserted with `bulk_create`
+    in batches of `batch_size` students. Returns a dict with the number of
+    `exams` created, `questions` per exam, `skipped` students and the `seed`
+    used (a random one is picked if none is given).
+    """
+    pools = _load_pools(training, weeks, rules)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    student_ids = list(student_ids)
+    skipped = 0
+    if skip_existing:
+        existing = set(
+            Exam.objects.filter(training=training, exam_type=exam_type, student_id__in=student_ids)
+            .values_list('student_id', flat=True)
+        )
+        skipped = len(existing)
+        student_ids = [student_id for student_id in student_ids if student_id not in existing]
+
+    shared_draw = None if randomize else _sample(pools, random.Random(seed))
+    through = Exam.questions.through
+    created = 0
+
+    with transaction.atomic():
+        for start in range(0, len(student_ids), batch_size):
+            chunk = student_ids[start:start + batch_size]
+            draws = [
+                shared_draw or _sample(pools, random.Random(f'{seed}:{student_id}'))
+                for student_id in chunk
+            ]
+            exams = Exam.objects.bulk_create([
+                Exam(
+                    exam_type=exam_type, student_id=student_id, training=training,
+                    total_points=sum(draw.values())
+                )
+                for student_id, draw in zip(chunk, draws)
+            ])
+            through.objects.bulk_create([
+                through(exam_id=exam.pk, question_id=question_id)
+                for exam, draw in zip(exams, draws)
+                for question_id in draw
+            ], batch_size=batch_size * 10)
+            created += len(exams)
+
+    return {
+        'exams': created,
+        'questions': sum(count for _, count in pools),
+        'skipped': skipped,
+        'seed': seed,
+    }
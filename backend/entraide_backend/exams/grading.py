@@ -0,0 +1,171 @@
+import json
+
+from django.db import transaction
+from django.db.models import Case, OuterRef, Subquery, Sum, Value, When, FloatField
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import Exam, Question, Submission
+
+# Question types graded automatically; SA/LA answers keep `points=None` and
+# stay in the manual grading queue.
+AUTO_GRADED_TYPES = ('MCQ', 'TF', 'FIB', 'MA')
+MANUAL_GRADED_TYPES = ('SA', 'LA')
+
+GRADING_BATCH_SIZE = 1000
+
+
+def parse_answer_key(question_type, correct_answer):
+    """`correct_answer` is a TextField; FIB/MA keys may be stored as JSON."""
+    if correct_answer is None or question_type not in ('FIB', 'MA'):
+        return correct_answer
+    try:
+        return json.loads(correct_answer)
+    except (TypeError, ValueError):
+        return correct_answer
+
+
+def _normalize_text(value):
+    return ' '.join(str(value).split()).lower()
+
+
+def _blank_matches(expected, given):
+    """A blank's key may list several accepted answers."""
+    accepted = expected if isinstance(expected, list) else [expected]
+    return _normalize_text(given) in {_normalize_text(answer) for answer in accepted}
+
+
+def grade_answer(question_type, key, answer, points):
+    """
+    Points earned for one answer, or None if the question needs manual grading.
+
+    `key` is the parsed answer key (see `load_answer_key`):
+    - MCQ: compared as strings.
+    - TF: compared case-insensitively.
+    - FIB: a single accepted answer, or a list with one entry per blank
+      (each entry a string or list of accepted strings). Partial credit per blank.
+    - MA: a `{left: right}` mapping. Partial credit per correct pair.
+    """
+    if question_type in MANUAL_GRADED_TYPES:
+        return None
+    if key is None or answer is None:
+        return 0
+    if question_type == 'MCQ':
+        return points if str(answer) == str(key) else 0
+    if question_type == 'TF':
+        return points if str(answer).lower() == str(key).lower() else 0
+    if question_type == 'FIB':
+        if isinstance(key, list):
+            if not isinstance(answer, list) or not key:
+                return 0
+            correct = sum(
+                1 for expected, given in zip(key, answer) if _blank_matches(expected, given)
+            )
+            return points * correct / len(key)
+        return points if _blank_matches(key, answer) else 0
+    if question_type == 'MA':
+        if not isinstance(key, dict) or not isinstance(answer, dict) or not key:
+            return 0
+        correct = sum(
+            1 for left, right in key.items() if str(answer.get(left, '')) == str(right)
+        )
+        return points * correct / len(key)
+    return 0
+
+
+def load_answer_key(question_ids):
+    """Load `{question_id: (type, parsed_key, points)}` in one query."""
+    rows = Question.objects.filter(pk__in=question_ids).values_list('id', 'type', 'correct_answer', 'points')
+    return {
+        question_id: (question_type, parse_answer_key(question_type, correct_answer), points)
+        for question_id, question_type, correct_answer, points in rows
+    }
+
+
+def update_exam_scores(exams):
+    """
+    Recompute `score` and `total_points` for the given exams in one UPDATE.
+
+    Same result as `Exam.calculate_score`: earned submission points over the
+    sum of the exam's question points, as a percentage.
+    """
+    through = Exam.questions.through
+    possible = Coalesce(
+        Subquery(
+            through.objects.filter(exam_id=OuterRef('pk'))
+            .values('exam_id')
+            .annotate(total=Sum('question__points'))
+            .values('total')
+        ),
+        Value(0.0),
+        output_field=FloatField()
+    )
+    earned = Coalesce(
+        Subquery(
+            Submission.objects.filter(exam_id=OuterRef('pk'))
+            .values('exam_id')
+            .annotate(total=Sum('points'))
+            .values('total')
+        ),
+        Value(0.0),
+        output_field=FloatField()
+    )
+    return exams.update(
+        total_points=possible,
+        score=Case(
+            When(GreaterThan(possible, 0), then=earned * 100.0 / possible),
+            default=Value(0.0),
+            output_field=FloatField()
+        ),
+        updated_at=timezone.now()
+    )
+
+
+def manual_grading_queue(exams):
+    """Submissions of the given exams still waiting for a grader."""
+    return Submission.objects.filter(
+        exam__in=exams, question__type__in=MANUAL_GRADED_TYPES, points__isnull=True
+    )
+
+
+def grade_exams(exams, regrade=False, batch_size=GRADING_BATCH_SIZE):
+    """
+    Auto-grade every pending submission of `exams` (an `Exam` queryset).
+
+    The answer key is loaded once, answers are graded in memory and written
+    back with `bulk_update` in batches, then all scores are recomputed with
+    `update_exam_scores`. Pending means `points` is null, unless `regrade`.
+
+    Returns a dict with the number of `graded` submissions, submissions left
+    for `manual` grading and `exams` rescored.
+    """
+    submissions = Submission.objects.filter(exam__in=exams, question__type__in=AUTO_GRADED_TYPES)
+    if not regrade:
+        submissions = submissions.filter(points__isnull=True)
+
+    with transaction.atomic():
+        answer_key = load_answer_key(submissions.values('question_id'))
+        now = timezone.now()
+        graded = 0
+        batch = []
+        for submission in submissions.only('id', 'question_id', 'student_answer').iterator(chunk_size=batch_size):
+            question_type, key, points = answer_key[submission.question_id]
+            submission.points = grade_answer(question_type, key, submission.student_answer, points)
+            submission.updated_at = now
+            batch.append(submission)
+            if len(batch) >= batch_size:
+                Submission.objects.bulk_update(batch, ['points', 'updated_at'])
+                graded += len(batch)
+                batch = []
+        if batch:
+            Submission.objects.bulk_update(batch, ['points', 'updated_at'])
+            graded += len(batch)
+
+        rescored = update_exam_scores(exams)
+
+    return {
+        'graded': graded,
+        'manual': manual_grading_queue(exams).count(),
+        'exams': rescored,
+    }
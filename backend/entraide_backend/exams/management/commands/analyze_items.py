@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.analytics import analyze_items
+from exams.models import Exam
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute difficulty, discrimination and answer frequencies for the questions of a training "
+        "program's exams of one type, store them on each question and print the exam's KR-20."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('training', type=int, help="TrainingPrograme id")
+        parser.add_argument('exam_type', choices=[choice for choice, _ in Exam.EXAM_TYPE_CHOICES])
+        parser.add_argument('--no-cache', action='store_true', help="Recompute even if nothing changed")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = analyze_items(options['training'], options['exam_type'], use_cache=not options['no_cache'])
+        elapsed = time.perf_counter() - started
+
+        for item in result['questions']:
+            self.stdout.write(
+                f"Q{item['question']:<6} {item['type']:<3} n={item['responses']:<6} "
+                f"p={item['difficulty']} r_pb={item['discrimination']}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Analyzed {len(result['questions'])} questions over {result['exams']} exams in {elapsed:.2f}s "
+            f"(KR-20: {result['kr20']})"
+        ))
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.generation import generate_cohort_exams, students_in_scope, SamplingError
+from exams.models import Exam, Question
+from programs.models import TrainingPrograme, WeeklyCoursePlan
+
+
+def parse_rule(value):
+    """`TYPE:COUNT[:POINTS]`, e.g. `MCQ:20` or `LA:2:5`."""
+    parts = value.split(':')
+    if len(parts) not in (2, 3) or parts[0] not in dict(Question.TYPE_CHOICES):
+        raise ValueError(value)
+    rule = {'type': parts[0], 'count': int(parts[1])}
+    if len(parts) == 3:
+        rule['points'] = float(parts[2])
+    return rule
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate one exam per student of a training program from questions of the given weeks, "
+        "inserting exams and their questions in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('training', type=int, help="TrainingPrograme id")
+        parser.add_argument('exam_type', choices=[choice for choice, _ in Exam.EXAM_TYPE_CHOICES])
+        parser.add_argument('--week', type=int, action='append', dest='weeks', required=True,
+                            help="WeeklyCoursePlan id (repeatable)")
+        parser.add_argument('--rule', type=parse_rule, action='append', dest='rules', required=True,
+                            help="Sampling rule TYPE:COUNT[:POINTS] (repeatable), e.g. MCQ:20")
+        parser.add_argument('--center', type=int, help="Only students of this center")
+        parser.add_argument('--group', type=int, help="Only students of this group")
+        parser.add_argument('--academic-year', help="Only students of this academic year, e.g. 2024-2025")
+        parser.add_argument('--randomize', action='store_true', help="Draw a different question set per student")
+        parser.add_argument('--seed', type=int, help="Seed for reproducible draws")
+        parser.add_argument('--include-existing', action='store_true',
+                            help="Also generate for students who already have an exam of this type")
+
+    def handle(self, *args, **options):
+        try:
+            training = TrainingPrograme.objects.get(pk=options['training'])
+        except TrainingPrograme.DoesNotExist:
+            raise CommandError(f"TrainingPrograme {options['training']} does not exist")
+        weeks = WeeklyCoursePlan.objects.filter(
+            pk__in=options['weeks'], annual_distribution__programe=training
+        )
+        if weeks.count() != len(set(options['weeks'])):
+            raise CommandError("Some weeks do not exist or do not belong to this training program")
+
+        student_ids = students_in_scope(
+            training, center=options['center'], group=options['group'],
+            academic_year=options['academic_year']
+        )
+        started = time.perf_counter()
+        try:
+            result = generate_cohort_exams(
+                training, options['exam_type'], weeks, options['rules'], student_ids,
+                randomize=options['randomize'], seed=options['seed'],
+                skip_existing=not options['include_existing']
+            )
+        except SamplingError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['exams']} exams of {result['questions']} questions in {elapsed:.2f}s "
+            f"(seed {result['seed']}, {result['skipped']} students skipped)"
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.grading import grade_exams
+from exams.models import Exam
+
+
+class Command(BaseCommand):
+    help = (
+        "Auto-grade pending MCQ/TF/FIB/MA submissions and recompute exam scores in bulk. "
+        "Short and long answers are left for manual grading."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, action='append', dest='exam_ids', help="Exam id (repeatable)")
+        parser.add_argument('--training', type=int, help="TrainingPrograme id")
+        parser.add_argument('--exam-type', choices=[choice for choice, _ in Exam.EXAM_TYPE_CHOICES])
+        parser.add_argument('--status', choices=[choice for choice, _ in Exam.STATUS_CHOICES])
+        parser.add_argument('--regrade', action='store_true', help="Also regrade submissions that already have points")
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.all()
+        if options['exam_ids']:
+            exams = exams.filter(pk__in=options['exam_ids'])
+        if options['training']:
+            exams = exams.filter(training_id=options['training'])
+        if options['exam_type']:
+            exams = exams.filter(exam_type=options['exam_type'])
+        if options['status']:
+            exams = exams.filter(status=options['status'])
+
+        started = time.perf_counter()
+        result = grade_exams(exams, regrade=options['regrade'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Graded {result['graded']} submissions and rescored {result['exams']} exams in {elapsed:.2f}s"
+        ))
+        if result['manual']:
+            self.stdout.write(f"{result['manual']} short/long answers waiting for manual grading")
@@ -19,6 +19,12 @@ class Question(models.Model):
     options = models.JSONField(null=True, blank=True)  # For MCQ options
     correct_answer = models.TextField(null=True, blank=True)  # For MCQ correct answer
     points = models.FloatField(default=1.0)  # Add points field with default value
+    # Item analysis, refreshed by exams.analytics.analyze_items
+    difficulty = models.FloatField(null=True, blank=True)  # p-value: mean share of points earned
+    discrimination = models.FloatField(null=True, blank=True)  # point-biserial vs. rest of the exam
+    response_count = models.PositiveIntegerField(default=0)
+    distractor_stats = models.JSONField(null=True, blank=True)  # MCQ/TF: {answer: count}
+    analyzed_at = models.DateTimeField(null=True, blank=True)
     added_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='added_questions')
     created_at = models.DateTimeField(auto_now_add=True)   
     updated_at = models.DateTimeField(auto_now=True)
@@ -50,17 +56,9 @@ class Exam(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def calculate_score(self):
-        submissions = self.submissions.all()
-        earned_points = sum(submission.points or 0 for submission in submissions)
-        possible_points = sum(question.points for question in self.questions.all())
-        
-        if possible_points > 0:
-            self.score = (earned_points / possible_points) * 100
-        else:
-            self.score = 0
-            
-        self.total_points = possible_points
-        self.save()
+        from .grading import update_exam_scores
+        update_exam_scores(Exam.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['score', 'total_points', 'updated_at'])
         return self.score
     
     def __str__(self):
@@ -86,25 +84,17 @@ class Submission(models.Model):
         return f"Submission by {self.student.first_name} {self.student.last_name} for {self.exam.exam_type}"
     
     def check_answer(self):
-        if self.question.type == 'MCQ':
-            # For MCQ, compare selected option(s) with correct answer
-            if str(self.student_answer) == str(self.question.correct_answer):
-                self.points = self.question.points
-            else:
-                self.points = 0
-        elif self.question.type == 'TF':
-            # For True/False, direct comparison should work
-            if str(self.student_answer).lower() == str(self.question.correct_answer).lower():
-                self.points = self.question.points
-            else:
-                self.points = 0
-        elif self.question.type in ['SA', 'LA']:
-            # For text answers, potentially need manual grading
-            # Set to null to indicate manual grading needed
-            pass
-        else:
-            self.points = 0
-            
+        # Same rules as the bulk engine (exams.grading.grade_exams).
+        # SA/LA answers return None: they are left as is for manual grading
+        from .grading import grade_answer, parse_answer_key
+        question = self.question
+        points = grade_answer(
+            question.type,
+            parse_answer_key(question.type, question.correct_answer),
+            self.student_answer,
+            question.points
+        )
+        if points is not None:
+            self.points = points
         self.save()
         return self.points
-
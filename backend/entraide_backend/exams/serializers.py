@@ -0,0 +1,69 @@
+from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
+
+from centers.models import Center, Group
+from programs.models import TrainingPrograme, WeeklyCoursePlan
+from .models import Question, Exam
+
+
+class ExamSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    question_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Exam
+        fields = ['id', 'exam_type', 'student', 'training', 'score', 'status', 'total_points',
+                  'question_count', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class ExamQuestionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Question as shown to the student taking the exam (no answer key)."""
+    class Meta:
+        model = Question
+        fields = ['id', 'type', 'question_text', 'options', 'points']
+
+
+class AnswerSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    answer = serializers.JSONField()
+
+
+class ExamAnswersSerializer(serializers.Serializer):
+    """
+    A batch of answers. Autosaves send only the answers changed since the last
+    save; `final` submits the exam for grading.
+    """
+    answers = AnswerSerializer(many=True, allow_empty=True)
+    final = serializers.BooleanField(default=False)
+
+
+class SamplingRuleSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=Question.TYPE_CHOICES)
+    count = serializers.IntegerField(min_value=1)
+    points = serializers.FloatField(required=False, allow_null=True,
+                                    help_text="Only sample questions worth exactly this many points")
+
+
+class ExamGenerationSerializer(serializers.Serializer):
+    """
+    Input of the cohort exam generator (see `exams.generation.generate_cohort_exams`).
+    """
+    training = serializers.PrimaryKeyRelatedField(queryset=TrainingPrograme.objects.all())
+    exam_type = serializers.ChoiceField(choices=Exam.EXAM_TYPE_CHOICES)
+    weeks = serializers.PrimaryKeyRelatedField(queryset=WeeklyCoursePlan.objects.select_related('annual_distribution'), many=True, allow_empty=False)
+    rules = SamplingRuleSerializer(many=True, allow_empty=False)
+    center = serializers.PrimaryKeyRelatedField(queryset=Center.objects.all(), required=False, allow_null=True)
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), required=False, allow_null=True)
+    academic_year = serializers.CharField(required=False, allow_blank=True)
+    randomize = serializers.BooleanField(default=False, help_text="Draw a different question set per student")
+    seed = serializers.IntegerField(required=False, allow_null=True)
+    skip_existing = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        foreign_weeks = [
+            week.pk for week in data['weeks']
+            if week.annual_distribution.programe_id != data['training'].pk
+        ]
+        if foreign_weeks:
+            raise serializers.ValidationError({'weeks': f"Weeks {foreign_weeks} do not belong to this training program"})
+        return data
@@ -1,3 +1,274 @@
+import datetime
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from centers.models import Center
+from programs.models import TrainingPrograme, AnnualCourseDistribution, WeeklyCoursePlan
+from students.models import Student
+from .analytics import analyze_items
+from .grading import grade_exams, manual_grading_queue
+from .models import Question, Exam, Submission
+
+User = get_user_model()
+
+
+class GradeExamsTests(TestCase):
+    def setUp(self):
+        trainer = User.objects.create_user(
+            email='trainer@example.com', password=None, first_name='T', last_name='R', role='trainer'
+        )
+        self.training = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        distribution = AnnualCourseDistribution.objects.create(programe=self.training, academic_year='2024-2025')
+        week = WeeklyCoursePlan.objects.create(
+            annual_distribution=distribution, month=1, week_number=1, title='W1', description='d'
+        )
+
+        def question(type, correct_answer, points=1.0):
+            return Question.objects.create(
+                training=self.training, week=week, type=type, question_text=type,
+                correct_answer=correct_answer, points=points, added_by=trainer
+            )
+
+        self.mcq = question('MCQ', 'B')
+        self.tf = question('TF', 'True')
+        self.fib = question('FIB', '["layer", ["mask", "masks"]]', points=2.0)
+        self.ma = question('MA', '{"Ctrl+J": "Duplicate", "Ctrl+T": "Transform"}', points=2.0)
+        self.sa = question('SA', None, points=4.0)
+        self.questions = [self.mcq, self.tf, self.fib, self.ma, self.sa]
+
+    def make_exam(self, email, answers):
+        student = User.objects.create_user(email=email, password=None, first_name='S', last_name='T')
+        exam = Exam.objects.create(exam_type='term1_theory', student=student, training=self.training)
+        exam.questions.set(self.questions)
+        for question, answer in answers.items():
+            Submission.objects.create(student=student, exam=exam, question=question, student_answer=answer)
+        return exam
+
+    def test_grades_pending_submissions_and_rescores_exams(self):
+        perfect = self.make_exam('a@example.com', {
+            self.mcq: 'B', self.tf: 'true', self.fib: ['Layer', 'masks'],
+            self.ma: {'Ctrl+J': 'Duplicate', 'Ctrl+T': 'Transform'}, self.sa: 'Free text',
+        })
+        partial = self.make_exam('b@example.com', {
+            self.mcq: 'A', self.tf: 'True', self.fib: ['layer', 'brush'],
+            self.ma: {'Ctrl+J': 'Duplicate', 'Ctrl+T': 'Free transform'},
+        })
+
+        result = grade_exams(Exam.objects.all())
+
+        self.assertEqual(result, {'graded': 8, 'manual': 1, 'exams': 2})
+        points = dict(Submission.objects.filter(exam=partial).values_list('question_id', 'points'))
+        self.assertEqual(points, {self.mcq.id: 0, self.tf.id: 1.0, self.fib.id: 1.0, self.ma.id: 1.0})
+        self.assertEqual(manual_grading_queue(Exam.objects.all()).get().exam, perfect)
+
+        perfect.refresh_from_db()
+        partial.refresh_from_db()
+        self.assertEqual(perfect.total_points, 10.0)
+        self.assertEqual(perfect.score, 60.0)
+        self.assertEqual(partial.score, 30.0)
+
+    def test_manual_points_are_kept_on_regrade(self):
+        exam = self.make_exam('c@example.com', {self.mcq: 'B', self.sa: 'Free text'})
+        Submission.objects.filter(question=self.sa).update(points=3.0)
+
+        grade_exams(Exam.objects.filter(pk=exam.pk), regrade=True)
+
+        self.assertEqual(exam.calculate_score(), 40.0)
+
+
+class ExamGenerationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password=None, first_name='A', last_name='D', role='admin'
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.training = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        distribution = AnnualCourseDistribution.objects.create(programe=self.training, academic_year='2024-2025')
+        self.week = WeeklyCoursePlan.objects.create(
+            annual_distribution=distribution, month=1, week_number=1, title='W1', description='d'
+        )
+        for i in range(6):
+            Question.objects.create(
+                training=self.training, week=self.week, type='MCQ', question_text=f'Q{i}',
+                correct_answer='A', points=1.0 if i < 4 else 2.0, added_by=self.admin
+            )
+        Question.objects.create(
+            training=self.training, week=self.week, type='LA', question_text='Essay', points=5.0, added_by=self.admin
+        )
+        self.center = center = Center.objects.create(name='Larache', description='d')
+        for i in range(5):
+            user = User.objects.create_user(email=f's{i}@example.com', password=None, first_name='S', last_name=str(i))
+            Student.objects.create(
+                user=user, exam_id=f'C1/{i}', center=center, program=self.training,
+                academic_year='2024-2025', joining_date=datetime.date(2024, 9, 1)
+            )
+
+    def generate(self, **extra):
+        payload = {
+            'training': self.training.id, 'exam_type': 'term1_theory', 'weeks': [self.week.id],
+            'rules': [{'type': 'MCQ', 'count': 3, 'points': 1.0}, {'type': 'LA', 'count': 1}],
+            **extra,
+        }
+        return self.client.post('/api/exams/exams/generate/', payload, format='json')
+
+    def draws(self):
+        return {
+            exam.student_id: sorted(exam.questions.values_list('id', flat=True))
+            for exam in Exam.objects.all()
+        }
+
+    def test_generates_randomized_exams_reproducibly(self):
+        response = self.generate(randomize=True, seed=42)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['exams'], 5)
+        for exam in Exam.objects.all():
+            self.assertEqual(exam.total_points, 8.0)
+            self.assertEqual(exam.questions.filter(type='MCQ', points=1.0).count(), 3)
+        first = self.draws()
+
+        Exam.objects.all().delete()
+        self.generate(randomize=True, seed=42)
+        self.assertEqual(self.draws(), first)
+
+    def test_skips_students_with_an_exam_and_rejects_short_pools(self):
+        self.generate()
+        response = self.generate()
+        self.assertEqual((response.data['exams'], response.data['skipped']), (0, 5))
+
+        response = self.generate(rules=[{'type': 'MCQ', 'count': 3, 'points': 2.0}], skip_existing=False)
+        self.assertEqual(response.status_code, 400)
+
+    def test_center_supervisors_are_limited_to_their_centers(self):
+        other = Center.objects.create(name='Tetouan', description='d')
+        for i in range(2):
+            user = User.objects.create_user(email=f'o{i}@example.com', password=None, first_name='O', last_name=str(i))
+            Student.objects.create(
+                user=user, exam_id=f'C2/{i}', center=other, program=self.training,
+                academic_year='2024-2025', joining_date=datetime.date(2024, 9, 1)
+            )
+        supervisor = User.objects.create_user(
+            email='sup@example.com', password=None, first_name='S', last_name='U', role='center_supervisor'
+        )
+        self.center.supervisor = supervisor
+        self.center.save()
+        self.client.force_authenticate(user=supervisor)
+
+        self.assertEqual(self.generate(center=other.id).status_code, 403)
+        response = self.generate()
+        self.assertEqual(response.data['exams'], 5)
+        self.assertEqual(set(Exam.objects.values_list('student__student_profile__center', flat=True)), {self.center.id})
+
+        self.client.force_authenticate(user=self.admin)
+        self.generate()
+        self.client.force_authenticate(user=supervisor)
+        response = self.client.get('/api/exams/exams/')
+        self.assertEqual(response.data['count'], 5)
+
+
+class ExamSessionTests(APITestCase):
+    def setUp(self):
+        trainer = User.objects.create_user(
+            email='trainer@example.com', password=None, first_name='T', last_name='R', role='trainer'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com', password=None, first_name='S', last_name='T', role='student'
+        )
+        training = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        distribution = AnnualCourseDistribution.objects.create(programe=training, academic_year='2024-2025')
+        week = WeeklyCoursePlan.objects.create(
+            annual_distribution=distribution, month=1, week_number=1, title='W1', description='d'
+        )
+        self.questions = [
+            Question.objects.create(
+                training=training, week=week, type='MCQ', question_text=f'Q{i}',
+                options=['A', 'B'], correct_answer='A', added_by=trainer
+            )
+            for i in range(3)
+        ]
+        self.exam = Exam.objects.create(
+            exam_type='term1_theory', student=self.student, training=training, status='published'
+        )
+        self.exam.questions.set(self.questions)
+        self.client.force_authenticate(user=self.student)
+        self.url = f'/api/exams/exams/{self.exam.id}/'
+
+    def save(self, answers, final=False):
+        return self.client.post(self.url + 'answers/', {
+            'answers': [{'question': question.id, 'answer': answer} for question, answer in answers],
+            'final': final,
+        }, format='json')
+
+    def test_session_hides_answer_key(self):
+        response = self.client.get(self.url + 'session/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['questions']), 3)
+        self.assertNotIn('correct_answer', response.data['questions'][0])
+
+    def test_autosave_deltas_upsert_then_final_submit_grades(self):
+        q1, q2, q3 = self.questions
+        self.assertEqual(self.save([(q1, 'B'), (q2, 'A')]).data['saved'], 2)
+        with self.assertNumQueries(3):  # exam, question check, upsert
+            self.save([(q1, 'A')])
+        session = self.client.get(self.url + 'session/').data
+        self.assertEqual(session['answers'], {q1.id: 'A', q2.id: 'A'})
+
+        response = self.save([(q3, 'B')], final=True)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertAlmostEqual(response.data['score'], 200 / 3)
+        self.assertEqual(self.save([(q3, 'A')]).status_code, 409)
+
+    def test_rejects_foreign_questions(self):
+        other = Question.objects.create(
+            training=self.exam.training, week=self.questions[0].week, type='TF', question_text='X',
+            added_by=self.student
+        )
+        response = self.save([(other, 'True')])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Submission.objects.exists())
+
+
+class ItemAnalysisTests(TestCase):
+    def setUp(self):
+        trainer = User.objects.create_user(
+            email='trainer@example.com', password=None, first_name='T', last_name='R', role='trainer'
+        )
+        self.training = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+        distribution = AnnualCourseDistribution.objects.create(programe=self.training, academic_year='2024-2025')
+        week = WeeklyCoursePlan.objects.create(
+            annual_distribution=distribution, month=1, week_number=1, title='W1', description='d'
+        )
+        self.easy, self.hard, self.mid = [
+            Question.objects.create(
+                training=self.training, week=week, type='MCQ', question_text=name,
+                correct_answer='A', added_by=trainer
+            )
+            for name in ('easy', 'hard', 'mid')
+        ]
+        # Everybody gets the easy question; the two strong students also get
+        # the hard and mid ones, the two weak students miss both.
+        answers = [
+            ('A', 'A', 'A'), ('A', 'A', 'A'), ('A', 'B', 'B'), ('A', 'C', 'B'),
+        ]
+        for i, row in enumerate(answers):
+            student = User.objects.create_user(email=f's{i}@example.com', password=None, first_name='S', last_name=str(i))
+            exam = Exam.objects.create(exam_type='term1_theory', student=student, training=self.training)
+            exam.questions.set([self.easy, self.hard, self.mid])
+            for question, answer in zip((self.easy, self.hard, self.mid), row):
+                Submission.objects.create(student=student, exam=exam, question=question, student_answer=answer)
+        grade_exams(Exam.objects.all())
+
+    def test_statistics_are_stored_and_cached(self):
+        result = analyze_items(self.training, 'term1_theory')
+        self.assertEqual((result['exams'], result['kr20']), (4, 0.75))
+
+        self.easy.refresh_from_db()
+        self.hard.refresh_from_db()
+        self.assertEqual((self.easy.difficulty, self.easy.response_count), (1.0, 4))
+        self.assertIsNone(self.easy.discrimination)  # no variance
+        self.assertEqual((self.hard.difficulty, self.hard.discrimination), (0.5, 1.0))
+        self.assertEqual(self.hard.distractor_stats, {'A': 2, 'B': 1, 'C': 1})
 
-# Create your tests here.
+        with self.assertNumQueries(1):
+            self.assertEqual(analyze_items(self.training, 'term1_theory'), result)
@@ -1,3 +1,172 @@
-from django.shortcuts import render
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter
+from api.mixins import ReplicaReadMixin, SparseFieldsetViewMixin
 
-# Create your views here.
+from api.permissions import IsAdminOrCenterSupervisor
+from api.scope import get_scope
+from .models import Exam, Submission
+from .serializers import (
+    ExamSerializer, ExamGenerationSerializer, ExamQuestionSerializer, ExamAnswersSerializer
+)
+from .generation import generate_cohort_exams, students_in_scope, SamplingError
+from .grading import grade_exams
+
+
+class ExamViewSet(ReplicaReadMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint to list exams. Admins see every exam, center supervisors
+    those of their centers' students, trainers those of their groups'
+    students and anyone else their own.
+    """
+    queryset = Exam.objects.annotate(question_count=Count('questions'))
+    serializer_class = ExamSerializer
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['training', 'exam_type', 'status', 'student']
+    ordering_fields = ['created_at', 'score']
+    ordering = ['-created_at']
+    replica_actions = ('item_analysis',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.role == 'admin':
+            return queryset
+        if self.request.user.role == 'student':
+            return queryset.filter(student=self.request.user)
+        return get_scope(self.request).filter(
+            queryset, center='student__student_profile__center', group='student__student_profile__group',
+            own='student'
+        )
+
+    def get_permissions(self):
+        if self.action in ['generate', 'item_analysis']:
+            self.permission_classes = [IsAdminOrCenterSupervisor]
+        else:
+            self.permission_classes = [permissions.IsAuthenticated]
+        return super().get_permissions()
+
+    @action(detail=True, methods=['get'])
+    def session(self, request, pk=None):
+        """
+        Everything needed to take an exam in one response: the exam, its
+        questions (without answer keys) and the answers saved so far, keyed by
+        question id.
+        """
+        exam = self.get_object()
+        questions = exam.questions.order_by('id').only('id', 'type', 'question_text', 'options', 'points')
+        answers = dict(exam.submissions.filter(student_id=exam.student_id).values_list('question_id', 'student_answer'))
+        return Response({
+            'exam': ExamSerializer(exam).data,
+            'questions': ExamQuestionSerializer(questions, many=True).data,
+            'answers': answers,
+        })
+
+    @action(detail=True, methods=['post'], serializer_class=ExamAnswersSerializer)
+    def answers(self, request, pk=None):
+        """
+        Save a batch of answers for the exam's student:
+        `{"answers": [{"question": 12, "answer": "B"}, ...], "final": false}`.
+
+        Send only the answers changed since the last save; they are upserted
+        in a single statement on the (student, exam, question) unique key.
+        With `final: true` the exam is marked completed and auto-graded.
+        Only published exams accept answers.
+        """
+        exam = self.get_object()
+        if exam.student_id != request.user.id:
+            return Response({'error': 'Only the student taking the exam can answer it'}, status=status.HTTP_403_FORBIDDEN)
+        if exam.status != 'published':
+            return Response({'error': f'Exam is {exam.status}'}, status=status.HTTP_409_CONFLICT)
+
+        serializer = ExamAnswersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Last answer wins if a question appears twice in the batch
+        answers = {item['question']: item['answer'] for item in serializer.validated_data['answers']}
+
+        unknown = set(answers) - set(exam.questions.filter(pk__in=answers).values_list('id', flat=True))
+        if unknown:
+            return Response({'error': f'Questions {sorted(unknown)} are not part of this exam'}, status=status.HTTP_400_BAD_REQUEST)
+
+        Submission.objects.bulk_create(
+            [
+                Submission(
+                    student_id=exam.student_id, exam=exam, question_id=question_id,
+                    student_answer=answer, points=None
+                )
+                for question_id, answer in answers.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['student', 'exam', 'question'],
+            update_fields=['student_answer', 'points', 'updated_at'],
+        )
+
+        response = {'saved': len(answers), 'status': exam.status}
+        if serializer.validated_data['final']:
+            Exam.objects.filter(pk=exam.pk).update(status='completed', updated_at=timezone.now())
+            grade_exams(Exam.objects.filter(pk=exam.pk))
+            exam.refresh_from_db(fields=['status', 'score'])
+            response.update(status=exam.status, score=exam.score)
+        return Response(response)
+
+    @action(detail=False, methods=['post'], serializer_class=ExamGenerationSerializer)
+    def generate(self, request):
+        """
+        Generate one exam per student of a training program (optionally one
+        center, group or academic year) from questions of the given weeks.
+
+        `rules` is a list of `{"type": "MCQ", "count": 10, "points": 1.0}`
+        (`points` optional). Set `randomize` to draw a different question set
+        per student; pass the returned `seed` again to reproduce a draw.
+        """
+        serializer = ExamGenerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # Center supervisors only generate exams for the students of their centers
+        center_ids = None
+        if request.user.role != 'admin':
+            scope = get_scope(request)
+            center_ids = scope.center_ids
+            if data.get('center') and not scope.has_center(data['center'].pk):
+                return Response({'error': 'You do not supervise this center'}, status=status.HTTP_403_FORBIDDEN)
+            if data.get('group') and not scope.has_center(data['group'].center_id):
+                return Response({'error': "This group is not in one of your centers"}, status=status.HTTP_403_FORBIDDEN)
+
+        student_ids = students_in_scope(
+            data['training'], center=data.get('center'), group=data.get('group'),
+            academic_year=data.get('academic_year'), center_ids=center_ids
+        )
+        try:
+            result = generate_cohort_exams(
+                data['training'], data['exam_type'], data['weeks'], data['rules'], student_ids,
+                randomize=data['randomize'], seed=data.get('seed'), skip_existing=data['skip_existing']
+            )
+        except SamplingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='item-analysis')
+    def item_analysis(self, request):
+        """
+        Item analysis for a training program's exams of one type
+        (`?training=<id>&exam_type=<type>`): per-question difficulty (p-value),
+        point-biserial discrimination and MCQ/TF answer frequencies, plus the
+        KR-20 reliability of the exam. Results are also stored on each question.
+        """
+        training = request.query_params.get('training')
+        exam_type = request.query_params.get('exam_type')
+        if not training or not exam_type:
+            return Response({'error': 'training and exam_type are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if exam_type not in dict(Exam.EXAM_TYPE_CHOICES):
+            return Response({'error': f'Invalid exam_type: {exam_type}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            training = int(training)
+        except ValueError:
+            return Response({'error': 'training must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        from .analytics import analyze_items  # loads numpy, which other endpoints do not need
+
+        return Response(analyze_items(training, exam_type))
@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from .models import TrainingPrograme, AnnualCourseDistribution, WeeklyCoursePlan, TrainingCourse
 from accounts.serializers import UserSerializer
 from centers.serializers import CenterSerializer
 
-class TrainingProgrameSerializer(serializers.ModelSerializer):
+class TrainingProgrameSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TrainingPrograme
         fields = '__all__'
@@ -11,27 +12,27 @@ class TrainingProgrameSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         # Check if the logo exists and has a URL attribute
-        if instance.logo and hasattr(instance.logo, 'url'):
+        if 'logo' in representation and instance.logo and hasattr(instance.logo, 'url'):
             representation['logo'] = instance.logo.url
         elif 'logo' in representation: # Ensure 'logo' key exists even if no logo
             representation['logo'] = None
         return representation
 
-class AnnualCourseDistributionSerializer(serializers.ModelSerializer):
+class AnnualCourseDistributionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     programe = TrainingProgrameSerializer(read_only=True)
 
     class Meta:
         model = AnnualCourseDistribution
         fields = '__all__'
 
-class WeeklyCoursePlanSerializer(serializers.ModelSerializer):
+class WeeklyCoursePlanSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     annual_distribution = AnnualCourseDistributionSerializer(read_only=True)
 
     class Meta:
         model = WeeklyCoursePlan
         fields = '__all__'
 
-class TrainingCourseSerializer(serializers.ModelSerializer):
+class TrainingCourseSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only nested serializers for detailed output
     program = TrainingProgrameSerializer(read_only=True)
     center = CenterSerializer(read_only=True)
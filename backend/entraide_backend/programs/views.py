@@ -1,5 +1,6 @@
 from django.shortcuts import render
 from rest_framework import viewsets
+from api.mixins import SparseFieldsetViewMixin
 from .models import TrainingPrograme, AnnualCourseDistribution, WeeklyCoursePlan, TrainingCourse
 from .serializers import (
     TrainingProgrameSerializer, 
@@ -11,19 +12,19 @@ from .serializers import (
 
 # Create your views here.
 
-class TrainingProgrameViewSet(viewsets.ModelViewSet):
+class TrainingProgrameViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = TrainingPrograme.objects.all()
     serializer_class = TrainingProgrameSerializer
 
-class AnnualCourseDistributionViewSet(viewsets.ModelViewSet):
+class AnnualCourseDistributionViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = AnnualCourseDistribution.objects.all()
     serializer_class = AnnualCourseDistributionSerializer
 
-class WeeklyCoursePlanViewSet(viewsets.ModelViewSet):
+class WeeklyCoursePlanViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = WeeklyCoursePlan.objects.all()
     serializer_class = WeeklyCoursePlanSerializer
 
-class TrainingCourseViewSet(viewsets.ModelViewSet):
+class TrainingCourseViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = TrainingCourse.objects.all()
     serializer_class = TrainingCourseSerializer
 
@@ -0,0 +1,7 @@
+from api.projections import Computed, Projection
+
+# TrainerSerializer
+trainer_projection = Projection(
+    'id', 'first_name', 'last_name', 'email',
+    full_name=Computed(lambda first, last: f"{first} {last}".strip(), 'first_name', 'last_name'),
+)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from .models import Schedule_session, SessionInstance
 from accounts.models import User
 from centers.models import Room, Group
@@ -7,7 +8,7 @@ from centers.serializers import RoomSerializer, GroupSerializer
 from programs.serializers import TrainingCourseSerializer
 
 
-class TrainerSerializer(serializers.ModelSerializer):
+class TrainerSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Lightweight trainer serializer for schedule"""
     full_name = serializers.SerializerMethodField()
     
@@ -19,7 +20,7 @@ class TrainerSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
 
-class ScheduleSessionSerializer(serializers.ModelSerializer):
+class ScheduleSessionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for weekly schedule templates"""
     trainer_details = TrainerSerializer(source='trainer', read_only=True)
     room_details = RoomSerializer(source='room', read_only=True)
@@ -88,7 +89,7 @@ class ScheduleSessionSerializer(serializers.ModelSerializer):
         return data
 
 
-class SessionInstanceSerializer(serializers.ModelSerializer):
+class SessionInstanceSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for specific session instances"""
     schedule_template_details = ScheduleSessionSerializer(source='schedule_template', read_only=True)
     custom_trainer_details = TrainerSerializer(source='custom_trainer', read_only=True)
@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from api.mixins import ProjectionViewMixin, ReplicaReadMixin, SparseFieldsetViewMixin
 from django.shortcuts import get_object_or_404
 from datetime import datetime, timedelta
 from django.utils import timezone
@@ -27,9 +28,11 @@ from .utils import (
 from accounts.models import User
 from centers.models import Group
 from centers.serializers import GroupSerializer
+from centers.projections import group_projection
+from .projections import trainer_projection
 
 
-class ScheduleSessionViewSet(viewsets.ModelViewSet):
+class ScheduleSessionViewSet(SparseFieldsetViewMixin, ProjectionViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing weekly schedule templates
     """
@@ -38,6 +41,7 @@ class ScheduleSessionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['trainer', 'academic_year', 'day', 'group', 'room', 'training_course', 'is_active']
+    projections = {'trainers_by_center': trainer_projection, 'groups_by_center': group_projection}
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -98,6 +102,9 @@ class ScheduleSessionViewSet(viewsets.ModelViewSet):
         trainer_ids = schedule_query.values_list('trainer', flat=True).distinct()
         trainers = User.objects.filter(id__in=trainer_ids)
         
+        projection = self.get_projection()
+        if projection is not None:
+            return Response(list(projection.apply(trainers)))
         serializer = TrainerSerializer(trainers, many=True)
         return Response(serializer.data)
     
@@ -122,6 +129,9 @@ class ScheduleSessionViewSet(viewsets.ModelViewSet):
         group_ids = schedule_query.values_list('group', flat=True).distinct()
         groups = Group.objects.filter(id__in=group_ids)
         
+        projection = self.get_projection()
+        if projection is not None:
+            return Response(list(projection.apply(groups)))
         serializer = GroupSerializer(groups, many=True)
         return Response(serializer.data)
     
@@ -256,13 +266,14 @@ class ScheduleSessionViewSet(viewsets.ModelViewSet):
         })
 
 
-class SessionInstanceViewSet(viewsets.ModelViewSet):
+class SessionInstanceViewSet(ReplicaReadMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing specific session instances
     """
     queryset = SessionInstance.objects.all()
     serializer_class = SessionInstanceSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = ('weekly_summary',)
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['schedule_template', 'specific_date', 'status']
     
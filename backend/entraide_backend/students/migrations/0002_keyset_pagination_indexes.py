@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-19 17:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0002_center_affiliated_to_center_association_and_more'),
+        ('programs', '0004_trainingcourse_academic_year'),
+        ('students', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['-created_at', 'id'], name='student_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 17:36
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_search_indexes'),
+        ('centers', '0002_center_affiliated_to_center_association_and_more'),
+        ('programs', '0004_trainingcourse_academic_year'),
+        ('students', '0002_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('exam_id'), name='gin_trgm_ops'), name='student_exam_id_trgm_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from accounts.models import User
 from centers.models import Center, Group
 from programs.models import TrainingCourse, TrainingPrograme
@@ -20,6 +22,13 @@ class Student(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (see StudentViewSet.cursor_ordering)
+            models.Index(fields=['-created_at', 'id'], name='student_created_at_id_idx'),
+            GinIndex(OpClass(Upper('exam_id'), name='gin_trgm_ops'), name='student_exam_id_trgm_idx'),
+        ]
+
     def __str__(self):
         return f'{self.user.first_name} {self.user.last_name} - {self.exam_id}'
 
@@ -0,0 +1,11 @@
+from accounts.projections import user_profile_projection
+from api.projections import Nested, Projection
+
+# StudentSerializer
+student_projection = Projection(
+    'id', 'exam_id', 'center_code', 'program', 'academic_year', 'joining_date', 'training_course', 'group',
+    'created_at', 'updated_at',
+    user=Nested('user', user_profile_projection),
+    center='center__name',
+    program_name='program__name',
+)
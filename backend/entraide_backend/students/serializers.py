@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from django.db import transaction
 import datetime # Added import for datetime
 from .models import Student
@@ -9,7 +10,7 @@ from accounts.serializers import UserProfileSerializer, UserIsActiveUpdateSerial
 # from centers.models import Center, Group
 # from programs.models import TrainingCourse, TrainingPrograme
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Student model.
     Returns detailed information about related objects for better frontend display.
@@ -1,3 +1,53 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from centers.models import Center
+from programs.models import TrainingPrograme
+from .models import Student
+
+User = get_user_model()
+
+
+class StudentSearchTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password', first_name='A', last_name='D', role='admin'
+        )
+        self.client.force_authenticate(user=self.admin)
+        center = Center.objects.create(name='Larache', description='d')
+        program = TrainingPrograme.objects.create(name='Infography', description='d', duration_years=1)
+
+        def make_student(exam_id, first_name, last_name, arabic_first_name=None):
+            user = User.objects.create_user(
+                email=f'{exam_id}@student.com', password=None, first_name=first_name, last_name=last_name,
+                Arabic_first_name=arabic_first_name
+            )
+            return Student.objects.create(
+                user=user, exam_id=exam_id, center=center, program=program,
+                academic_year='2024-2025', joining_date=datetime.date(2024, 9, 1)
+            )
+
+        self.ahmed = make_student('C1/001/24', 'Ahmed', 'Alaoui', 'أحمد')
+        self.ahmadou = make_student('C1/002/24', 'Ahmadou', 'Diallo')
+        self.sara = make_student('C1/003/24', 'Sara', 'Bennani', 'سارة')
+
+    def search(self, term):
+        response = self.client.get('/api/students/students/', {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_substring_match_on_related_user_fields(self):
+        self.assertCountEqual(self.search('ahm'), [self.ahmed.id, self.ahmadou.id])
+
+    def test_exact_word_ranks_first(self):
+        self.assertEqual(self.search('ahmed')[0], self.ahmed.id)
+
+    def test_arabic_name_matches_search_vector(self):
+        self.assertEqual(self.search('سارة'), [self.sara.id])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('ahm diallo'), [self.ahmadou.id])
+
+    def test_local_field_match(self):
+        self.assertEqual(self.search('003'), [self.sara.id])
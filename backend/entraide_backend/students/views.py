@@ -3,34 +3,38 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from api.mixins import ProjectionViewMixin, SparseFieldsetViewMixin
 from django.db import transaction
-import pandas as pd
 import io
 from .models import Student
 from .serializers import StudentSerializer, StudentCreateUpdateSerializer
+from .projections import student_projection
 from api.permissions import IsAdminOrCenterSupervisor
-from rest_framework.pagination import PageNumberPagination
-from teachers.models import Teacher
+from api.pagination import OptInCursorPagination
+from api.scope import get_scope
+from api.filters import TrigramSearchFilter
 
 # Create your views here.
 
-class StudentPagination(PageNumberPagination):
+class StudentPagination(OptInCursorPagination):
     """Allow client to set page_size via ?page_size while keeping sane limits."""
     page_size_query_param = 'page_size'
     max_page_size = 1000
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(SparseFieldsetViewMixin, ProjectionViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows students to be viewed or edited.
     """
     queryset = Student.objects.select_related('user', 'center', 'program', 'training_course', 'group').all() # Default queryset with optimized queries
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TrigramSearchFilter]
     filterset_fields = ['center', 'program', 'group', 'academic_year']
     search_fields = ['user__first_name', 'user__last_name', 'user__email', 'exam_id']
     ordering_fields = ['created_at', 'joining_date', 'user__first_name', 'user__last_name']
     ordering = ['-created_at']
+    cursor_ordering = ('-created_at', 'id')  # used by ?pagination=cursor
     pagination_class = StudentPagination
+    projections = {'list': student_projection}
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -92,22 +96,21 @@ class StudentViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Program ID is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
+            # pandas is only needed here; importing it lazily keeps it out of every worker
+            import pandas as pd
+
             # Read Excel file
             df = pd.read_excel(file)
             
             # Get current user's supervised center (for center supervisors)
             user = request.user
-            current_center = None
+            current_center_id = None
             
             if user.role == 'center_supervisor':
-                if hasattr(user, 'supervised_centers'):
-                    supervised_centers = user.supervised_centers.all()
-                    if supervised_centers.exists():
-                        current_center = supervised_centers.first()
-                    else:
-                        return Response({'error': 'No center assigned to this supervisor'}, status=status.HTTP_400_BAD_REQUEST)
-                else:
-                    return Response({'error': 'Center supervisor has no centers assigned'}, status=status.HTTP_400_BAD_REQUEST)
+                center_ids = get_scope(request).center_ids
+                if not center_ids:
+                    return Response({'error': 'No center assigned to this supervisor'}, status=status.HTTP_400_BAD_REQUEST)
+                current_center_id = center_ids[0]
             
             # Utility to safely fetch a value considering headers that may end with '*',
             # then convert to a cleaned string
@@ -149,8 +152,8 @@ class StudentViewSet(viewsets.ModelViewSet):
                         }
                         
                         # Add center for center supervisors
-                        if current_center:
-                            student_data['center'] = current_center.id
+                        if current_center_id:
+                            student_data['center'] = current_center_id
                         elif 'center' in row and pd.notna(row.get('center')):
                             student_data['center'] = row.get('center')
                         else:
@@ -191,38 +194,12 @@ class StudentViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         if user.is_authenticated:
-            # Assuming User model has a 'role' attribute
-            if hasattr(user, 'role'):
-                if user.role == 'admin':
-                    # Admin can see all students
-                    return Student.objects.select_related('user', 'center', 'program', 'training_course', 'group').all()
-                elif user.role == 'center_supervisor':
-                    # Center supervisor can only see students from their supervised centers
-                    # Use the related_name 'supervised_centers' from the Center model
-                    if hasattr(user, 'supervised_centers'):
-                        supervised_centers = user.supervised_centers.all()
-                        if supervised_centers.exists():
-                            return Student.objects.select_related('user', 'center', 'program', 'training_course', 'group').filter(center__in=supervised_centers)
-                    # If supervisor has no centers assigned, return empty queryset
-                    return Student.objects.none()
-                elif user.role == 'trainer':
-                    # Trainer can see students belonging to the groups they teach
-                    try:
-                        teacher_profile = user.teacher  # OneToOne relation from Teacher to User
-                        teacher_groups = teacher_profile.groups.all()
-                        if teacher_groups.exists():
-                            return Student.objects.select_related('user', 'center', 'program', 'training_course', 'group').filter(group__in=teacher_groups)
-                        # If trainer has no groups assigned, return empty queryset
-                        return Student.objects.none()
-                    except Teacher.DoesNotExist:
-                        # If no Teacher profile linked, return empty queryset
-                        return Student.objects.none()
-                else:
-                    # For any other authenticated user (e.g., student, trainer),
-                    # return their own student record if it exists.
-                    # The Student model has a OneToOneField to User named 'user'.
-                    return Student.objects.select_related('user', 'center', 'program', 'training_course', 'group').filter(user=user)
-            else:
-                # If user has no role attribute, return their own student record if exists
-                return Student.objects.select_related('user', 'center', 'program', 'training_course', 'group').filter(user=user)
+            queryset = Student.objects.select_related('user', 'center', 'program', 'training_course', 'group')
+            if getattr(user, 'role', None) == 'admin':
+                # Admin can see all students
+                return queryset.all()
+            # Center supervisors see the students of their supervised centers,
+            # trainers those of the groups they teach, anyone else their own
+            # student record (ids from the token's scope claims, see api.scope)
+            return get_scope(self.request).filter(queryset, group='group', own='user')
         return Student.objects.none() # No students for unauthenticated users
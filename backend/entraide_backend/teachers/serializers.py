@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.mixins import SparseFieldsetSerializerMixin
 from django.db import transaction
 from .models import Teacher
 from accounts.models import User, UserRole # Assuming UserRole.TEACHER exists
@@ -7,7 +8,7 @@ from centers.serializers import GroupSerializer # Import GroupSerializer for det
 # from programs.models import TrainingPrograme # Import if explicit queryset needed for PrimaryKeyRelatedField
 # from centers.models import Center # Import if explicit queryset needed for PrimaryKeyRelatedField
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Teacher model.
     Returns detailed information about related objects.
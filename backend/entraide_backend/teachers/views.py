@@ -1,17 +1,20 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from api.mixins import SparseFieldsetViewMixin
+from api.filters import TrigramSearchFilter
+from api.scope import get_scope
 from .models import Teacher
 from .serializers import TeacherSerializer, TeacherCreateUpdateSerializer
 from api.permissions import IsAdminOrCenterSupervisor # Assuming this permission class is appropriate
 
-class TeacherViewSet(viewsets.ModelViewSet):
+class TeacherViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows teachers to be viewed or edited.
     """
     queryset = Teacher.objects.select_related('user', 'center', 'program').prefetch_related('groups').all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TrigramSearchFilter]
     filterset_fields = ['center', 'program', 'contarct_with', 'user']
     search_fields = ['user__first_name', 'user__last_name', 'user__email', 'center__name', 'program__name']
     ordering_fields = ['user__first_name', 'user__last_name', 'contract_start_date', 'created_at']
@@ -53,25 +56,11 @@ class TeacherViewSet(viewsets.ModelViewSet):
         if hasattr(user, 'role'):
             if user.role == 'admin':
                 return qs.all()
-            elif user.role == 'center_supervisor':
-                # Assuming 'supervised_centers' is the related_name from User to Center
-                # or that the Center model has a supervisor field that links back to user.
-                # This logic needs to align with your User-Center-Supervisor relationship.
-                if hasattr(user, 'supervised_centers'): # From StudentViewSet example
-                    supervised_centers = user.supervised_centers.all()
-                    if supervised_centers.exists():
-                        return qs.filter(center__in=supervised_centers)
-                # Fallback or alternative: if center has a direct supervisor link
-                # elif hasattr(user, 'center_set'): # if User is a FK in Center as supervisor
-                #     return qs.filter(center__supervisor=user) # Example, adjust field name
-                return Teacher.objects.none() # No centers supervised, no teachers to show
-            elif user.role == 'trainer':
-                # A trainer sees their own profile
-                return qs.filter(user=user)
-            else:
-                # Other authenticated roles (e.g. student, association_supervisor) might not see any teachers by default
-                # or you might want them to see all teachers. For now, restricting.
-                return Teacher.objects.none()
+            # Center supervisors see the teachers of their supervised centers
+            # (ids from the token's scope claims, see api.scope) and a trainer
+            # their own profile; other roles (e.g. student, association_supervisor)
+            # have no teacher profile, so they see none
+            return get_scope(self.request).filter(qs, own='user')
         else:
             # If user has no role attribute, behavior might be undefined or restricted.
             # For safety, returning none, but this case should ideally not happen with a well-defined User model.